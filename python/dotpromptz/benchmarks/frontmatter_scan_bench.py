@@ -0,0 +1,70 @@
+# Copyright 2025 Google LLC
+# SPDX-License-Identifier: Apache-2.0
+
+"""Benchmark splitting off frontmatter on adversarial documents.
+
+Compares `scan_frontmatter` with matching `FRONTMATTER_AND_BODY_REGEX` on
+documents the regex handles badly: a large body without a closing marker,
+many blank lines after the opening marker, and many lines that look like
+closing markers but are not.
+
+Usage:
+
+    python benchmarks/frontmatter_scan_bench.py [--lines N] [--repeat N]
+"""
+
+import argparse
+import functools
+import timeit
+
+from dotpromptz.parse import FRONTMATTER_AND_BODY_REGEX, scan_frontmatter
+
+
+def make_documents(num_lines: int) -> dict[str, str]:
+    """Build adversarial documents.
+
+    Args:
+        num_lines: Number of lines in each document.
+
+    Returns:
+        Documents by label.
+    """
+    return {
+        'no closing marker': '---\nname: x\n' + 'Body text.\n' * num_lines,
+        'blank lines': '---' + '\n' * num_lines + 'x',
+        'fake markers': '---\n' + '\n--- x' * num_lines,
+        'valid': '---\nname: x\n---\n' + 'Body text.\n' * num_lines,
+    }
+
+
+def main() -> None:
+    """Run the benchmark and print per-document timings."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--lines', type=int, default=10_000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    print(f'lines: {args.lines}, repeat: {args.repeat}')
+    for label, source in make_documents(args.lines).items():
+        regex = min(
+            timeit.repeat(
+                functools.partial(FRONTMATTER_AND_BODY_REGEX.match, source),
+                number=args.repeat,
+                repeat=3,
+            )
+        )
+        scanner = min(
+            timeit.repeat(
+                functools.partial(scan_frontmatter, source),
+                number=args.repeat,
+                repeat=3,
+            )
+        )
+        print(
+            f'{label:>17}: regex {regex / args.repeat * 1e3:10.3f} ms, '
+            f'scanner {scanner / args.repeat * 1e3:8.3f} ms'
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+# Copyright 2025 Google LLC
+# SPDX-License-Identifier: Apache-2.0
+
+"""Benchmark parsing prompts with large frontmatter.
+
+Parses prompts whose input and output picoschemas have many fields with the
+pure Python YAML loader and with the libyaml loader, bypassing the parse
+cache.
+
+Usage:
+
+    python benchmarks/parse_frontmatter_bench.py [--fields N] [--repeat N]
+"""
+
+import argparse
+import functools
+import timeit
+
+import yaml
+from dotpromptz.parse import _parse_document
+
+
+def make_source(num_fields: int) -> str:
+    """Build a prompt with large input and output schemas.
+
+    Args:
+        num_fields: Number of fields in each schema.
+
+    Returns:
+        Prompt source.
+    """
+    lines = ['---', 'name: large', 'model: test/model', 'input:', '  schema:']
+    for i in range(num_fields):
+        lines.append(f'    field{i}?: string, Description of field {i}.')
+    lines += ['output:', '  format: json', '  schema:']
+    for i in range(num_fields):
+        lines.append(f'    item{i}(array):')
+        lines.append('      name: string')
+        lines.append(f'      score(enum, Score {i}): [LOW, MEDIUM, HIGH]')
+    lines += ['---', 'Summarize {{field0}}.']
+    return '\n'.join(lines)
+
+
+def main() -> None:
+    """Run the benchmark and print per-parse timings."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--fields', type=int, default=200)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    source = make_source(args.fields)
+    loaders = [('python', yaml.SafeLoader)]
+    if yaml.__with_libyaml__:
+        loaders.append(('libyaml', yaml.CSafeLoader))
+    results = [_parse_document(source, loader) for _, loader in loaders]
+    assert all(result == results[0] for result in results)
+
+    print(f'fields: {args.fields}, repeat: {args.repeat}')
+    for label, loader in loaders:
+        best = min(
+            timeit.repeat(
+                functools.partial(_parse_document, source, loader),
+                number=args.repeat,
+                repeat=5,
+            )
+        )
+        print(f'{label:>8}: {best / args.repeat * 1e3:8.3f} ms/parse')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,467 @@
+# Copyright 2025 Google LLC
+# SPDX-License-Identifier: Apache-2.0
+
+"""Dotprompt engine: compiles and renders dotprompt templates."""
+
+import hashlib
+import itertools
+import threading
+import weakref
+from collections import OrderedDict
+from collections.abc import Callable
+from typing import Any
+
+from pydantic import BaseModel, ConfigDict, Field
+
+from dotpromptz.helpers import register_all_helpers
+from dotpromptz.parse import parse_document, to_messages
+from dotpromptz.picoschema import PicoschemaOptions, picoschema
+from dotpromptz.typing import (
+    DataArgument,
+    JsonSchema,
+    ParsedPrompt,
+    PromptFunction,
+    PromptMetadata,
+    RenderedPrompt,
+    SchemaResolver,
+    ToolDefinition,
+    ToolResolver,
+)
+from dotpromptz.util import remove_undefined_fields
+from handlebarrz import Handlebars
+
+# Type alias
+HelperFn = Callable[[list[Any], dict[str, Any], dict[str, Any]], str]
+
+# Type alias
+PartialResolver = Callable[[str], str | None]
+
+DEFAULT_COMPILE_CACHE_SIZE = 256
+"""Default number of compiled prompts kept by a `Dotprompt` engine."""
+
+_TEMPLATE_NAME_PREFIX = 'dotprompt:'
+
+
+class DotpromptOptions(BaseModel):
+    """
+    Dotprompt engine options.
+
+    Attributes:
+        default_model: A default model to use if none is supplied.
+        model_configs: Default configuration options to use with a particular
+            model, by model name.
+        helpers: Helpers to pre-register, by name.
+        partials: Partials to pre-register, by name.
+        tools: Tool definitions used when resolving tool names, by name.
+        tool_resolver: Resolves tool names that are not in `tools`.
+        schemas: JSON schemas used when resolving schema names, by name.
+        schema_resolver: Resolves schema names that are not in `schemas`.
+        partial_resolver: Resolves partials that are not registered.
+        compile_cache_size: Maximum number of compiled prompts to keep; the
+            least recently used are evicted first.
+    """
+
+    model_config = ConfigDict(
+        arbitrary_types_allowed=True,
+    )
+
+    default_model: str | None = None
+    model_configs: dict[str, Any] = Field(default_factory=dict)
+    helpers: dict[str, HelperFn] = Field(default_factory=dict)
+    partials: dict[str, str] = Field(default_factory=dict)
+    tools: dict[str, ToolDefinition] = Field(default_factory=dict)
+    tool_resolver: ToolResolver | None = None
+    schemas: dict[str, JsonSchema] = Field(default_factory=dict)
+    schema_resolver: SchemaResolver | None = None
+    partial_resolver: PartialResolver | None = None
+    compile_cache_size: int = Field(default=DEFAULT_COMPILE_CACHE_SIZE, ge=1)
+
+
+def _rendered_fields(metadata: PromptMetadata[Any]) -> dict[str, Any]:
+    """Get the fields of resolved metadata that a rendered prompt carries.
+
+    The input schema and defaults only apply to rendering, so they are left
+    out.
+    """
+    return {
+        name: getattr(metadata, name)
+        for name in metadata.model_fields_set
+        if name != 'input'
+    }
+
+
+class _CompiledPrompt:
+    """A prompt function for a template registered with the engine.
+
+    The metadata of the prompt is resolved when it is compiled, so calling it
+    only renders the template and splits the output into messages. The
+    template stays registered for as long as the prompt function is alive,
+    even after the engine evicts it from its cache.
+    """
+
+    def __init__(
+        self,
+        engine: 'Dotprompt',
+        prompt: ParsedPrompt[Any],
+        template_name: str,
+        metadata: PromptMetadata[Any],
+    ) -> None:
+        self.prompt = prompt
+        self._engine = engine
+        self._template_name = template_name
+        finalizer = weakref.finalize(
+            self, engine._handlebars.unregister_template, template_name
+        )
+        finalizer.atexit = False
+        self._fields = _rendered_fields(metadata)
+
+    def __call__(
+        self,
+        data: DataArgument[Any],
+        options: PromptMetadata[Any] | None = None,
+    ) -> RenderedPrompt[Any]:
+        """Render the prompt.
+
+        Args:
+            data: The input variables, documents and message history.
+            options: Metadata overriding the compiled metadata for this call.
+                Default input variables are taken from `options.input`.
+
+        Returns:
+            The rendered prompt.
+        """
+        defaults = (options.input or {}).get('default') if options else None
+        variables = {**(defaults or {}), **(data.input or {})}
+        rendered = self._engine._handlebars.render(
+            self._template_name, variables
+        )
+        messages = to_messages(rendered, data)
+        if options is None:
+            return RenderedPrompt[Any].model_construct(
+                **self._fields, messages=messages
+            )
+
+        # Merge the options over the metadata of the prompt itself, under the
+        # configuration of the model the options may select instead.
+        engine = self._engine
+        own = PromptMetadata[Any].model_construct(
+            **{**self._fields, 'config': self.prompt.config}
+        )
+        metadata = engine._resolve_metadata(
+            engine._model_metadata(options.model or self.prompt.model),
+            own,
+            options,
+        )
+        return RenderedPrompt[Any].model_construct(
+            **_rendered_fields(metadata), messages=messages
+        )
+
+
+class Dotprompt:
+    """Compiles and renders dotprompt templates.
+
+    Compiled prompts are cached by a hash of their source. Compiling a prompt
+    registers its template with the engine and resolves its tools and
+    schemas once, so rendering a cached prompt repeatedly does none of that
+    work again.
+    """
+
+    def __init__(self, options: DotpromptOptions | None = None) -> None:
+        """Initialize the engine.
+
+        Args:
+            options: Engine options.
+        """
+        options = options or DotpromptOptions()
+        self._handlebars = Handlebars()
+        self._default_model = options.default_model
+        self._model_configs = dict(options.model_configs)
+        self._tools = dict(options.tools)
+        self._tool_resolver = options.tool_resolver
+        self._schemas = dict(options.schemas)
+        self._schema_resolver = options.schema_resolver
+        self._cache_size = options.compile_cache_size
+        self._compiled: OrderedDict[str, _CompiledPrompt] = OrderedDict()
+        self._template_ids = itertools.count()
+        self._lock = threading.Lock()
+
+        register_all_helpers(self._handlebars)
+        for name, fn in options.helpers.items():
+            self.define_helper(name, fn)
+        for name, source in options.partials.items():
+            self.define_partial(name, source)
+        if options.partial_resolver is not None:
+            self._handlebars.set_partial_resolver(options.partial_resolver)
+
+    def define_helper(self, name: str, fn: HelperFn) -> 'Dotprompt':
+        """Register a helper function.
+
+        Args:
+            name: The name of the helper.
+            fn: The helper function, see `Handlebars.register_helper`.
+
+        Returns:
+            The engine.
+        """
+        self._handlebars.register_helper(name, fn)
+        return self
+
+    def define_partial(self, name: str, source: str) -> 'Dotprompt':
+        """Register a partial template.
+
+        Args:
+            name: The name of the partial.
+            source: The template source of the partial.
+
+        Returns:
+            The engine.
+        """
+        self._handlebars.register_partial(name, source)
+        return self
+
+    def define_tool(self, definition: ToolDefinition) -> 'Dotprompt':
+        """Register a tool definition.
+
+        Compiled prompts are discarded, since they may refer to the tool.
+
+        Args:
+            definition: The tool definition.
+
+        Returns:
+            The engine.
+        """
+        self._tools[definition.name] = definition
+        self.clear_cache()
+        return self
+
+    def parse(self, source: str) -> ParsedPrompt[Any]:
+        """Parse a dotprompt source.
+
+        Args:
+            source: The source document.
+
+        Returns:
+            The parsed prompt.
+        """
+        return parse_document(source)
+
+    def render(
+        self,
+        source: str,
+        data: DataArgument[Any] | None = None,
+        options: PromptMetadata[Any] | None = None,
+    ) -> RenderedPrompt[Any]:
+        """Compile and render a dotprompt source.
+
+        Args:
+            source: The source document.
+            data: The input variables, documents and message history.
+            options: Metadata overriding the metadata of the prompt.
+
+        Returns:
+            The rendered prompt.
+        """
+        return self.compile(source)(data or DataArgument[Any](), options)
+
+    def compile(
+        self,
+        source: str | ParsedPrompt[Any],
+        additional_metadata: PromptMetadata[Any] | None = None,
+    ) -> PromptFunction[Any]:
+        """Compile a dotprompt source into a prompt function.
+
+        Compiled prompts are cached by a hash of the source and the
+        additional metadata, so compiling the same source again returns the
+        same prompt function.
+
+        Args:
+            source: The source document, or an already parsed prompt.
+            additional_metadata: Metadata overriding the metadata of the
+                prompt.
+
+        Returns:
+            The prompt function.
+
+        Raises:
+            ValueError: If the template does not compile or a tool or schema
+                cannot be resolved.
+        """
+        key = self._cache_key(source, additional_metadata)
+        with self._lock:
+            compiled = self._compiled.get(key)
+            if compiled is not None:
+                self._compiled.move_to_end(key)
+                return compiled
+
+        prompt = self.parse(source) if isinstance(source, str) else source
+        if additional_metadata is not None:
+            prompt = ParsedPrompt[Any].model_validate(
+                {
+                    **prompt.model_dump(exclude_none=True),
+                    **additional_metadata.model_dump(exclude_none=True),
+                }
+            )
+        metadata = self.render_metadata(prompt)
+        # Every compiled prompt registers its own template, so a prompt that
+        # was evicted and compiled again never shares a template with a prompt
+        # function a caller still holds.
+        template_name = (
+            f'{_TEMPLATE_NAME_PREFIX}{key}:{next(self._template_ids)}'
+        )
+        self._handlebars.register_template(template_name, prompt.template)
+        compiled = _CompiledPrompt(self, prompt, template_name, metadata)
+
+        with self._lock:
+            self._compiled[key] = compiled
+            self._compiled.move_to_end(key)
+            while len(self._compiled) > self._cache_size:
+                self._compiled.popitem(last=False)
+        return compiled
+
+    def clear_cache(self) -> None:
+        """Discard all compiled prompts.
+
+        Prompt functions that are still referenced keep working; their
+        templates are unregistered once they are garbage collected.
+        """
+        with self._lock:
+            self._compiled.clear()
+
+    def cache_info(self) -> dict[str, int]:
+        """Get the size and capacity of the compiled prompt cache.
+
+        Returns:
+            Dictionary with `size` and `capacity`.
+        """
+        with self._lock:
+            return {'size': len(self._compiled), 'capacity': self._cache_size}
+
+    def render_metadata(
+        self,
+        source: str | ParsedPrompt[Any],
+        additional_metadata: PromptMetadata[Any] | None = None,
+    ) -> PromptMetadata[Any]:
+        """Resolve the metadata of a prompt.
+
+        The configuration of the selected model is merged under the metadata,
+        tool names are resolved to tool definitions, and picoschema input and
+        output schemas are expanded to JSON schemas.
+
+        Args:
+            source: The source document, or an already parsed prompt.
+            additional_metadata: Metadata overriding the metadata of the
+                prompt.
+
+        Returns:
+            The resolved metadata.
+        """
+        prompt = self.parse(source) if isinstance(source, str) else source
+        return self._resolve_metadata(
+            self._model_metadata(
+                (additional_metadata and additional_metadata.model)
+                or prompt.model
+            ),
+            prompt,
+            additional_metadata,
+        )
+
+    def _model_metadata(self, model: str | None) -> dict[str, Any]:
+        """Get metadata with the configuration of a model.
+
+        Falls back to the default model if `model` is not set.
+        """
+        config = self._model_configs.get(model or self._default_model or '')
+        return {'config': config} if config else {}
+
+    def _cache_key(
+        self,
+        source: str | ParsedPrompt[Any],
+        additional_metadata: PromptMetadata[Any] | None,
+    ) -> str:
+        """Hash a prompt source and its additional metadata."""
+        digest = hashlib.sha256()
+        if isinstance(source, str):
+            digest.update(source.encode())
+        else:
+            digest.update(source.model_dump_json().encode())
+        if additional_metadata is not None:
+            digest.update(b'\0')
+            digest.update(additional_metadata.model_dump_json().encode())
+        return digest.hexdigest()
+
+    def _resolve_metadata(
+        self,
+        base: dict[str, Any],
+        *merges: PromptMetadata[Any] | None,
+    ) -> PromptMetadata[Any]:
+        """Merge metadata and resolve its tools and schemas.
+
+        Later metadata overrides earlier metadata, except for the model
+        configuration, which is merged.
+        """
+        out = dict(base)
+        for merge in merges:
+            if merge is None:
+                continue
+            config = out.get('config') or {}
+            fields = merge.model_dump(exclude_none=True)
+            out.update(fields)
+            out['config'] = {**config, **(fields.get('config') or {})}
+        out.pop('template', None)
+        out = remove_undefined_fields(out)
+        out = self._resolve_tools(out)
+        out = self._render_picoschema(out)
+        return PromptMetadata[Any].model_validate(out)
+
+    def _resolve_tools(self, meta: dict[str, Any]) -> dict[str, Any]:
+        """Resolve registered tool names to tool definitions.
+
+        Tool names that are neither registered nor resolved are kept.
+
+        Raises:
+            ValueError: If the tool resolver does not know a tool.
+        """
+        if not meta.get('tools'):
+            return meta
+
+        tools: list[str] = []
+        tool_defs: list[Any] = list(meta.get('tool_defs') or [])
+        for name in meta['tools']:
+            if name in self._tools:
+                tool_defs.append(self._tools[name])
+            elif self._tool_resolver is not None:
+                resolved = self._tool_resolver(name)
+                if resolved is None:
+                    raise ValueError(
+                        f"Dotprompt: Unable to resolve tool '{name}' to a "
+                        'recognized tool definition.'
+                    )
+                tool_defs.append(resolved)
+            else:
+                tools.append(name)
+        return {**meta, 'tools': tools, 'tool_defs': tool_defs}
+
+    def _render_picoschema(self, meta: dict[str, Any]) -> dict[str, Any]:
+        """Expand picoschema input and output schemas to JSON schemas."""
+        options = PicoschemaOptions(
+            schema_resolver=self._wrapped_schema_resolver
+        )
+        for key in ('input', 'output'):
+            section = meta.get(key)
+            if section and section.get('schema'):
+                meta = {
+                    **meta,
+                    key: {
+                        **section,
+                        'schema': picoschema(section['schema'], options),
+                    },
+                }
+        return meta
+
+    def _wrapped_schema_resolver(self, name: str) -> JsonSchema | None:
+        """Resolve a schema name from the registered schemas first."""
+        if name in self._schemas:
+            return self._schemas[name]
+        if self._schema_resolver is not None:
+            return self._schema_resolver(name)
+        return None
@@ -273,10 +273,10 @@ def register_all_helpers(handlebars: Handlebars) -> None:
     Returns:
         None.
     """
-    handlebars.register_helper('history', history_helper)
+    # The marker helpers (`history`, `media`, `role` and `section`) have native
+    # implementations that produce the same output as the Python helpers in
+    # this module without calling back into Python.
+    handlebars.register_dotprompt_helpers()
     handlebars.register_helper('ifEquals', if_equals_helper)
-    handlebars.register_helper('json', json_helper)
-    handlebars.register_helper('media', media_helper)
-    handlebars.register_helper('role', role_helper)
-    handlebars.register_helper('section', section_helper)
+    handlebars.register_helper('json', json_helper, needs_context=False)
     handlebars.register_helper('unlessEquals', unless_equals_helper)
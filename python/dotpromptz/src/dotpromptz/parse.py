@@ -3,7 +3,10 @@
 
 """Parse dotprompt templates and extract metadata."""
 
+import hashlib
 import re
+import threading
+from collections import OrderedDict
 from dataclasses import dataclass, field
 from typing import Any, TypeVar
 
@@ -50,10 +53,20 @@ SECTION_MARKER_PREFIX = '<<<dotprompt:section'
 
 # Regular expression to match YAML frontmatter delineated by `---` markers at
 # the start of a .prompt content block.
+#
+# Documents are split with `scan_frontmatter`, which accepts the same documents
+# without backtracking; this expression is kept as the reference definition.
 FRONTMATTER_AND_BODY_REGEX = re.compile(
     r'^---\s*\n([\s\S]*?)\n---\s*\n([\s\S]*)$'
 )
 
+# Regular expression to match a marker that closes the YAML frontmatter:
+# `---` at the start of a line followed by whitespace up to the end of the line.
+FRONTMATTER_CLOSING_REGEX = re.compile(r'\n---[^\S\n]*\n')
+
+# Regular expression to match a possibly empty run of whitespace.
+WHITESPACE_REGEX = re.compile(r'\s*')
+
 # Regular expression to match <<<dotprompt:role:xxx>>> and
 # <<<dotprompt:history>>> markers in the template.
 #
@@ -78,6 +91,17 @@ MEDIA_AND_SECTION_MARKER_REGEX = re.compile(
     r'(<<<dotprompt:(?:media:url|section).*?)>>>'
 )
 
+# Regular expression to match role, history, media and section markers in one
+# pass over a rendered template. The `marker` group holds the marker without
+# the closing `>>>`. Media and section markers never contain a role or history
+# marker, as if the template had been split by ROLE_AND_HISTORY_MARKER_REGEX
+# before MEDIA_AND_SECTION_MARKER_REGEX.
+MARKER_REGEX = re.compile(
+    r'(?P<marker><<<dotprompt:(?:role:(?P<role>[a-z]+)|history|'
+    r'(?P<part>(?:media:url|section)(?:[^<>\n]++|>(?!>>)|'
+    r'<(?!<<dotprompt:(?:role:[a-z]+|history)>>>))*+)))>>>'
+)
+
 # List of reserved keywords that are handled specially in the metadata of a
 # .prompt file. These keys are processed differently from extension metadata.
 RESERVED_METADATA_KEYWORDS = [
@@ -97,6 +121,110 @@ RESERVED_METADATA_KEYWORDS = [
 ]
 
 
+# YAML loader used for frontmatter: the libyaml-based loader when PyYAML was
+# built with libyaml, which is much faster on large schemas, or else the pure
+# Python loader. Both construct the same safe subset of YAML.
+YAML_LOADER: Any = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+
+# Default number of parsed documents kept by the parse cache.
+DEFAULT_PARSE_CACHE_SIZE = 256
+
+
+class _ParseCache:
+    """A bounded, thread-safe LRU cache of parsed documents.
+
+    Documents are keyed by a BLAKE2 digest of their source, so the cache does
+    not keep the sources alive. Cached prompts are never handed out; readers
+    get a deep copy they are free to modify.
+    """
+
+    def __init__(self, capacity: int = DEFAULT_PARSE_CACHE_SIZE) -> None:
+        self._capacity = capacity
+        self._entries: OrderedDict[bytes, ParsedPrompt[Any]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def get(self, key: bytes) -> ParsedPrompt[Any] | None:
+        with self._lock:
+            parsed = self._entries.get(key)
+            if parsed is None:
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+        return parsed.model_copy(deep=True)
+
+    def put(self, key: bytes, parsed: ParsedPrompt[Any]) -> None:
+        if self._capacity == 0:
+            return
+        stored = parsed.model_copy(deep=True)
+        with self._lock:
+            self._entries[key] = stored
+            self._entries.move_to_end(key)
+            self._evict()
+
+    def set_capacity(self, capacity: int) -> None:
+        with self._lock:
+            self._capacity = capacity
+            self._evict()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._hits = self._misses = self._evictions = 0
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                'hits': self._hits,
+                'misses': self._misses,
+                'evictions': self._evictions,
+                'size': len(self._entries),
+                'capacity': self._capacity,
+            }
+
+    def _evict(self) -> None:
+        while len(self._entries) > self._capacity:
+            self._entries.popitem(last=False)
+            self._evictions += 1
+
+
+_parse_cache = _ParseCache()
+
+
+def parse_cache_stats() -> dict[str, int]:
+    """Get statistics of the parse cache used by `parse_document`.
+
+    Returns:
+        Dictionary with `hits`, `misses`, `evictions`, `size` and `capacity`.
+    """
+    return _parse_cache.stats()
+
+
+def set_parse_cache_capacity(capacity: int) -> None:
+    """Set how many parsed documents the parse cache keeps.
+
+    The least recently used documents are evicted first. A capacity of 0
+    disables the cache.
+
+    Args:
+        capacity: Maximum number of cached documents.
+
+    Raises:
+        ValueError: If `capacity` is negative.
+    """
+    if capacity < 0:
+        raise ValueError('Parse cache capacity must not be negative.')
+    _parse_cache.set_capacity(capacity)
+
+
+def clear_parse_cache() -> None:
+    """Discard all cached parsed documents and reset the statistics."""
+    _parse_cache.clear()
+
+
 def split_by_regex(source: str, regex: re.Pattern[str]) -> list[str]:
     """Splits a string by a regular expression while filtering out
     empty/whitespace-only pieces.
@@ -172,6 +300,58 @@ def convert_namespaced_entry_to_nested_object(
     return obj
 
 
+def scan_frontmatter(source: str) -> tuple[int, int, int] | None:
+    """Finds the YAML frontmatter and body of a document.
+
+    Accepts the same documents as `FRONTMATTER_AND_BODY_REGEX` and splits them
+    the same way, but never backtracks and copies nothing, so it takes linear
+    time even on large documents without a closing marker.
+
+    Args:
+        source: The source document containing frontmatter and template
+
+    Returns:
+        The offsets at which the frontmatter starts and ends and the body
+        starts, or None if the document has no frontmatter. The body extends
+        to the end of the document.
+    """
+    if not source.startswith('---'):
+        return None
+    opening_end = _whitespace_end(source, 3)
+    newline = source.rfind('\n', 3, opening_end)
+    if newline < 0:
+        return None
+
+    # The frontmatter starts after the last newline following the opening
+    # marker and ends at the first closing marker after that.
+    start = newline + 1
+    closing = FRONTMATTER_CLOSING_REGEX.search(source, start)
+    if closing is not None:
+        return start, closing.start(), _body_start(source, closing.end())
+
+    # A closing marker right after the opening one ends an empty frontmatter
+    # that starts after the previous newline, if there is one.
+    previous = source.rfind('\n', 3, newline)
+    closing = FRONTMATTER_CLOSING_REGEX.match(source, newline)
+    if previous >= 0 and closing is not None:
+        return previous + 1, newline, _body_start(source, closing.end())
+    return None
+
+
+def _body_start(source: str, pos: int) -> int:
+    """Finds where the body starts after the closing marker ending at `pos`.
+
+    Blank lines after the closing marker are not part of the body.
+    """
+    return source.rfind('\n', pos - 1, _whitespace_end(source, pos)) + 1
+
+
+def _whitespace_end(source: str, pos: int) -> int:
+    """Finds where the run of whitespace starting at `pos` ends."""
+    match = WHITESPACE_REGEX.match(source, pos)
+    return match.end() if match else pos
+
+
 def extract_frontmatter_and_body(source: str) -> tuple[str, str]:
     """Extracts the YAML frontmatter and body from a document.
 
@@ -182,11 +362,11 @@ def extract_frontmatter_and_body(source: str) -> tuple[str, str]:
         A tuple containing the frontmatter and body If the pattern does not
         match, both the values returned will be empty.
     """
-    match = FRONTMATTER_AND_BODY_REGEX.match(source)
-    if match:
-        frontmatter, body = match.groups()
-        return frontmatter, body
-    return '', ''
+    offsets = scan_frontmatter(source)
+    if offsets is None:
+        return '', ''
+    start, end, body_start = offsets
+    return source[start:end], source[body_start:]
 
 
 def parse_document(source: str) -> ParsedPrompt[T]:
@@ -195,16 +375,40 @@ def parse_document(source: str) -> ParsedPrompt[T]:
 
     The frontmatter contains metadata and configuration for the prompt.
 
+    Parsed documents are cached by a hash of their source, so parsing the
+    same source again returns a copy of the cached prompt. See
+    `parse_cache_stats`.
+
     Args:
         source: The source document containing frontmatter and template
 
+    Returns:
+        Parsed prompt with metadata and template content
+    """
+    key = hashlib.blake2b(source.encode(), digest_size=16).digest()
+    parsed = _parse_cache.get(key)
+    if parsed is None:
+        parsed = _parse_document(source)
+        _parse_cache.put(key, parsed)
+    return parsed
+
+
+def _parse_document(
+    source: str, loader: Any = YAML_LOADER
+) -> ParsedPrompt[Any]:
+    """Parses a document without going through the parse cache.
+
+    Args:
+        source: The source document containing frontmatter and template
+        loader: The YAML loader class used for the frontmatter.
+
     Returns:
         Parsed prompt with metadata and template content
     """
     frontmatter, body = extract_frontmatter_and_body(source)
     if frontmatter:
         try:
-            parsed_metadata = yaml.safe_load(frontmatter)
+            parsed_metadata = yaml.load(frontmatter, Loader=loader)
             if parsed_metadata is None:
                 parsed_metadata = {}
 
@@ -262,6 +466,21 @@ def parse_document(source: str) -> ParsedPrompt[T]:
     )
 
 
+@dataclass
+class _MessageBuilder:
+    """A message whose parts are collected by `to_messages`."""
+
+    role: Role
+    parts: list[Part] = field(default_factory=list)
+    metadata: dict[str, Any] | None = None
+
+    def add_text(self, source: str, start: int, end: int) -> None:
+        """Adds the text between two markers unless it is only whitespace."""
+        piece = source[start:end]
+        if piece and not piece.isspace():
+            self.parts.append(parse_part(piece))
+
+
 def to_messages(
     rendered_string: str,
     data: DataArgument[Any] | None = None,
@@ -270,6 +489,10 @@ def to_messages(
     Converts a rendered template string into an array of messages. Processes
     role markers and history placeholders to structure the conversation.
 
+    The rendered string is tokenized in a single pass: the text between
+    markers and the media and section markers become parts of the current
+    message, without splitting the messages again.
+
     Args:
         rendered_string: The rendered template string to convert
         data: Optional data containing message history
@@ -277,48 +500,50 @@ def to_messages(
     Returns:
         List of structured messages
     """
-    current_message = MessageSource(role=Role.USER, source='')
-    message_sources = [current_message]
+    current = _MessageBuilder(role=Role.USER)
+    builders = [current]
+    pos = 0
 
-    for piece in split_by_role_and_history_markers(rendered_string):
-        if piece.startswith(ROLE_MARKER_PREFIX):
-            role = piece[len(ROLE_MARKER_PREFIX) :]
+    for match in MARKER_REGEX.finditer(rendered_string):
+        current.add_text(rendered_string, pos, match.start())
+        pos = match.end()
 
-            if current_message.source and current_message.source.strip():
+        role = match['role']
+        if role is not None:
+            if current.parts:
                 # If the current message has content, create a new message
-                current_message = MessageSource(role=Role(role), source='')
-                message_sources.append(current_message)
+                current = _MessageBuilder(role=Role(role))
+                builders.append(current)
             else:
                 # Otherwise, update the role of the current message
-                current_message.role = Role(role)
+                current.role = Role(role)
 
-        elif piece.startswith(HISTORY_MARKER_PREFIX):
-            # Add the history messages to the message sources
+        elif match['part'] is not None:
+            current.parts.append(parse_part(match['marker']))
+
+        else:
+            # Add the history messages, then a new message for the model
             msgs: list[Message] = []
             if data and data.messages:
                 msgs = data.messages
-            history_messages = transform_messages_to_history(msgs)
-            if history_messages:
-                message_sources.extend(
-                    [
-                        MessageSource(
-                            role=msg.role,
-                            content=msg.content,
-                            metadata=msg.metadata,
-                        )
-                        for msg in history_messages
-                    ]
+            builders.extend(
+                _MessageBuilder(
+                    role=msg.role, parts=msg.content, metadata=msg.metadata
                 )
+                for msg in transform_messages_to_history(msgs)
+            )
+            current = _MessageBuilder(role=Role.MODEL)
+            builders.append(current)
 
-            # Add a new message source for the model
-            current_message = MessageSource(role=Role.MODEL, source='')
-            message_sources.append(current_message)
+    current.add_text(rendered_string, pos, len(rendered_string))
 
-        else:
-            # Otherwise, add the piece to the current message source
-            current_message.source = (current_message.source or '') + piece
-
-    messages = message_sources_to_messages(message_sources)
+    messages: list[Message] = []
+    for builder in builders:
+        if builder.parts:
+            message = Message(role=builder.role, content=builder.parts)
+            if builder.metadata:
+                message.metadata = builder.metadata
+            messages.append(message)
     return insert_history(messages, data.messages if data else None)
 
 
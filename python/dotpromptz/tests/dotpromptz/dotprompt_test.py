@@ -0,0 +1,213 @@
+# Copyright 2025 Google LLC
+# SPDX-License-Identifier: Apache-2.0
+
+"""Tests for the Dotprompt engine."""
+
+import unittest
+from typing import Any
+
+import pytest
+from dotpromptz.dotprompt import Dotprompt, DotpromptOptions
+from dotpromptz.typing import (
+    DataArgument,
+    JsonSchema,
+    PromptMetadata,
+    RenderedPrompt,
+    TextPart,
+    ToolDefinition,
+)
+
+SOURCE = """---
+tools: [search]
+output:
+  schema:
+    answer: Answer
+---
+Hello {{name}}!"""
+
+
+class DotpromptTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tool_calls: list[str] = []
+        self.schema_calls: list[str] = []
+        self.dotprompt = Dotprompt(
+            DotpromptOptions(
+                tool_resolver=self.resolve_tool,
+                schema_resolver=self.resolve_schema,
+            )
+        )
+
+    def resolve_tool(self, tool_name: str) -> ToolDefinition | None:
+        self.tool_calls.append(tool_name)
+        if tool_name == 'search':
+            return ToolDefinition.model_validate(
+                {'name': 'search', 'description': 'Search.'}
+            )
+        return None
+
+    def resolve_schema(self, name: str) -> JsonSchema | None:
+        self.schema_calls.append(name)
+        return {'type': 'string'} if name == 'Answer' else None
+
+    def render(self, prompt: Any, **variables: Any) -> Any:
+        return prompt(DataArgument[Any](input=variables))
+
+    def text(self, rendered: RenderedPrompt[Any]) -> str:
+        part = rendered.messages[0].content[0]
+        assert isinstance(part, TextPart)
+        return part.text
+
+    def test_compile_is_cached(self) -> None:
+        """Test that compiling the same source returns the same function."""
+        first = self.dotprompt.compile(SOURCE)
+        second = self.dotprompt.compile(SOURCE)
+
+        self.assertIs(first, second)
+        self.assertEqual(self.dotprompt.cache_info()['size'], 1)
+
+    def test_metadata_is_resolved_once(self) -> None:
+        """Test that tools and schemas are resolved on compile only."""
+        prompt = self.dotprompt.compile(SOURCE)
+
+        first = self.render(prompt, name='Ada')
+        second = self.render(prompt, name='Grace')
+
+        self.assertEqual(self.text(first), 'Hello Ada!')
+        self.assertEqual(self.text(second), 'Hello Grace!')
+        self.assertEqual(self.tool_calls, ['search'])
+        self.assertEqual(self.schema_calls, ['Answer'])
+        self.assertEqual(second.tools, [])
+        self.assertEqual(
+            [tool.name for tool in second.tool_defs or []], ['search']
+        )
+        self.assertEqual(
+            (second.output or {})['schema']['properties']['answer'],
+            {'type': 'string'},
+        )
+
+    def test_render(self) -> None:
+        """Test rendering a source with default input variables."""
+        result = self.dotprompt.render(
+            'Hello {{name}}!',
+            DataArgument[Any](input={}),
+            PromptMetadata[Any].model_validate(
+                {'input': {'default': {'name': 'User'}}}
+            ),
+        )
+
+        self.assertEqual(self.text(result), 'Hello User!')
+        self.assertIsNone(result.input)
+
+    def test_options_keep_the_rendered_fields(self) -> None:
+        """Test that calls with and without options return the same fields."""
+        prompt = self.dotprompt.compile(
+            '---\ninput:\n  schema:\n    name: string\n---\nHi {{name}}'
+        )
+        data = DataArgument[Any](input={'name': 'Ada'})
+
+        plain = prompt(data)
+        with_options = prompt(
+            data,
+            PromptMetadata[Any].model_validate(
+                {'input': {'default': {'name': 'User'}}}
+            ),
+        )
+
+        self.assertIsNone(plain.input)
+        self.assertIsNone(with_options.input)
+        self.assertEqual(plain.model_fields_set, with_options.model_fields_set)
+
+    def test_additional_metadata_is_part_of_the_key(self) -> None:
+        """Test that additional metadata compiles a separate prompt."""
+        plain = self.dotprompt.compile('Hi')
+        described = self.dotprompt.compile(
+            'Hi',
+            PromptMetadata[Any].model_validate({'description': 'greeting'}),
+        )
+
+        self.assertIsNot(plain, described)
+        self.assertEqual(self.render(described).description, 'greeting')
+
+    def test_cache_is_bounded(self) -> None:
+        """Test that the least recently used prompts are evicted."""
+        dotprompt = Dotprompt(DotpromptOptions(compile_cache_size=1))
+        first = dotprompt.compile('A')
+        dotprompt.compile('B')
+
+        self.assertIsNot(dotprompt.compile('A'), first)
+        self.assertEqual(dotprompt.cache_info(), {'size': 1, 'capacity': 1})
+
+    def test_evicted_prompt_still_renders(self) -> None:
+        """Test that a prompt function outlives its cache entry."""
+        dotprompt = Dotprompt(DotpromptOptions(compile_cache_size=1))
+        first = dotprompt.compile('Hello {{name}}!')
+        dotprompt.compile('B')
+
+        result = self.render(first, name='Ada')
+
+        self.assertEqual(self.text(result), 'Hello Ada!')
+
+    def test_define_tool_clears_the_cache(self) -> None:
+        """Test that defining a tool discards compiled prompts."""
+        self.dotprompt.compile(SOURCE)
+
+        self.dotprompt.define_tool(
+            ToolDefinition.model_validate({'name': 'search'})
+        )
+        result = self.render(self.dotprompt.compile(SOURCE), name='Ada')
+
+        self.assertEqual(self.tool_calls, ['search'])
+        self.assertIsNone((result.tool_defs or [])[0].description)
+
+    def test_define_tool_keeps_compiled_prompts(self) -> None:
+        """Test that prompts compiled before defining a tool still render."""
+        prompt = self.dotprompt.compile(SOURCE)
+
+        self.dotprompt.define_tool(
+            ToolDefinition.model_validate({'name': 'search'})
+        )
+        result = self.render(prompt, name='Ada')
+
+        self.assertEqual(self.text(result), 'Hello Ada!')
+
+    def test_unknown_tool(self) -> None:
+        """Test that tools the resolver does not know are rejected."""
+        with pytest.raises(ValueError):
+            self.dotprompt.compile('---\ntools: [nope]\n---\nHi')
+
+    def test_model_config(self) -> None:
+        """Test that the configuration of the default model is merged."""
+        dotprompt = Dotprompt(
+            DotpromptOptions(
+                default_model='gemini',
+                model_configs={'gemini': {'temperature': 0.5}},
+            )
+        )
+
+        metadata = dotprompt.render_metadata('Hi')
+
+        self.assertEqual(metadata.config, {'temperature': 0.5})
+
+    def test_model_config_of_overriding_model(self) -> None:
+        """Test that a model selected on render brings its configuration."""
+        dotprompt = Dotprompt(
+            DotpromptOptions(
+                default_model='a',
+                model_configs={'a': {'temperature': 0.5}, 'b': {'top_k': 3}},
+            )
+        )
+        prompt = dotprompt.compile('---\nconfig:\n  seed: 1\n---\nHi')
+
+        default = prompt(DataArgument[Any]())
+        overridden = prompt(
+            DataArgument[Any](),
+            PromptMetadata[Any].model_validate({'model': 'b'}),
+        )
+
+        self.assertEqual(default.config, {'temperature': 0.5, 'seed': 1})
+        self.assertEqual(overridden.model, 'b')
+        self.assertEqual(overridden.config, {'top_k': 3, 'seed': 1})
+
+
+if __name__ == '__main__':
+    unittest.main()
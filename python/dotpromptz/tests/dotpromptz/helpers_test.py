@@ -10,6 +10,7 @@ from dotpromptz.helpers import (
     history_helper,
     json_helper,
     media_helper,
+    register_all_helpers,
     role_helper,
     section_helper,
 )
@@ -276,3 +277,28 @@ class TestUnlessEqualsHelper(unittest.TestCase):
             'unless_equals_test', {'arg1': 'test', 'arg2': 'test'}
         )
         self.assertEqual(result, 'no')
+
+
+class TestRegisterAllHelpers(unittest.TestCase):
+    def test_markers_match_python_helpers(self) -> None:
+        """Test that registered marker helpers match the Python helpers."""
+        handlebars = Handlebars()
+        register_all_helpers(handlebars)
+
+        cases = [
+            ('{{role "model"}}', role_helper(['model'], {}, {})),
+            ('{{history}}', history_helper([], {}, {})),
+            ('{{section "output"}}', section_helper(['output'], {}, {})),
+            (
+                '{{media url="http://a/b" contentType="image/png"}}',
+                media_helper(
+                    [], {'url': 'http://a/b', 'contentType': 'image/png'}, {}
+                ),
+            ),
+            (
+                '{{media url="http://a/b"}}',
+                media_helper([], {'url': 'http://a/b'}, {}),
+            ),
+        ]
+        for template, expected in cases:
+            self.assertEqual(handlebars.render_template(template, {}), expected)
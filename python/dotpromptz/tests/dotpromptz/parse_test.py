@@ -3,33 +3,43 @@
 
 """Tests for parse module."""
 
+import random
 import re
 import unittest
+from pathlib import Path
+from typing import Any
 
 import pytest
-
+import yaml
 from dotpromptz.parse import (
     FRONTMATTER_AND_BODY_REGEX,
     MEDIA_AND_SECTION_MARKER_REGEX,
     RESERVED_METADATA_KEYWORDS,
     ROLE_AND_HISTORY_MARKER_REGEX,
     MessageSource,
+    _parse_document,
+    clear_parse_cache,
     convert_namespaced_entry_to_nested_object,
     extract_frontmatter_and_body,
     insert_history,
     message_sources_to_messages,
     messages_have_history,
+    parse_cache_stats,
     parse_document,
     parse_media_part,
     parse_part,
     parse_section_part,
     parse_text_part,
+    scan_frontmatter,
+    set_parse_cache_capacity,
     split_by_media_and_section_markers,
     split_by_regex,
     split_by_role_and_history_markers,
+    to_messages,
     transform_messages_to_history,
 )
 from dotpromptz.typing import (
+    DataArgument,
     MediaPart,
     Message,
     ParsedPrompt,
@@ -339,6 +349,111 @@ class TestExtractFrontmatterAndBody(unittest.TestCase):
         assert body == ''
 
 
+class TestScanFrontmatter(unittest.TestCase):
+    """Test scanning documents for frontmatter."""
+
+    def test_offsets(self) -> None:
+        """Test the offsets of the frontmatter and body."""
+        source = '---\nfoo: bar\n---  \n\nBody'
+
+        self.assertEqual(scan_frontmatter(source), (4, 12, 20))
+
+    def test_matches_regex(self) -> None:
+        """Test that the scanner splits documents like the regex does."""
+        pieces = ['-', '---', '\n', ' ', '\t', 'a', '\n---', '\n---\n']
+        rng = random.Random(0)
+        for _ in range(5000):
+            source = ''.join(
+                rng.choice(pieces) for _ in range(rng.randint(0, 10))
+            )
+            if rng.random() < 0.8:
+                source = '---' + source
+            match = FRONTMATTER_AND_BODY_REGEX.match(source)
+            offsets = scan_frontmatter(source)
+            with self.subTest(source=source):
+                if match is None:
+                    self.assertIsNone(offsets)
+                else:
+                    self.assertEqual(offsets, (*match.span(1), match.start(2)))
+
+    def test_adversarial_inputs(self) -> None:
+        """Test inputs on which the regex backtracks quadratically."""
+        self.assertIsNone(scan_frontmatter('---' + '\n' * 100_000 + 'x'))
+        self.assertIsNone(scan_frontmatter('---\n' + '\n---  x' * 100_000))
+
+
+class TestToMessages(unittest.TestCase):
+    """Test converting rendered templates into messages."""
+
+    def test_roles_and_parts(self) -> None:
+        """Test that markers split messages and parts in one pass."""
+        rendered = (
+            '<<<dotprompt:role:system>>>Be brief.\n'
+            '<<<dotprompt:role:user>>>Look: '
+            '<<<dotprompt:media:url http://a/b.png image/png>>>\n'
+            '<<<dotprompt:section code>>>'
+        )
+
+        self.assertEqual(
+            to_messages(rendered),
+            [
+                Message(
+                    role=Role.SYSTEM, content=[TextPart(text='Be brief.\n')]
+                ),
+                Message(
+                    role=Role.USER,
+                    content=[
+                        TextPart(text='Look: '),
+                        MediaPart(
+                            media={
+                                'url': 'http://a/b.png',
+                                'contentType': 'image/png',
+                            }
+                        ),
+                        PendingPart(
+                            metadata={'purpose': 'code', 'pending': True}
+                        ),
+                    ],
+                ),
+            ],
+        )
+
+    def test_history(self) -> None:
+        """Test that history is inserted and followed by a model message."""
+        history = [Message(role=Role.USER, content=[TextPart(text='Hi')])]
+
+        messages = to_messages(
+            'Intro<<<dotprompt:history>>>Reply',
+            DataArgument(messages=history),
+        )
+
+        self.assertEqual(
+            [(message.role, message.metadata) for message in messages],
+            [
+                (Role.USER, None),
+                (Role.USER, {'purpose': 'history'}),
+                (Role.MODEL, None),
+            ],
+        )
+
+    def test_media_marker_does_not_contain_role_marker(self) -> None:
+        """Test that role markers end unterminated media markers."""
+        messages = to_messages(
+            '<<<dotprompt:media:url a<<<dotprompt:role:model>>>x>>>'
+        )
+
+        self.assertEqual(
+            messages,
+            [
+                Message(
+                    role=Role.USER,
+                    content=[MediaPart(media={'url': 'a'})],
+                ),
+                Message(role=Role.MODEL, content=[TextPart(text='x>>>')]),
+            ],
+        )
+
+
 class TestTransformMessagesToHistory(unittest.TestCase):
     def test_add_history_metadata_to_messages(self) -> None:
         messages: list[Message] = [
@@ -772,3 +887,97 @@ Template content"""
         #    self.assertEqual(getattr(result, keyword), f'value-{keyword}')
 
         self.assertEqual(result.template, 'Template content')
+
+
+class TestParseCache(unittest.TestCase):
+    def setUp(self) -> None:
+        clear_parse_cache()
+        self.addCleanup(clear_parse_cache)
+        self.addCleanup(set_parse_cache_capacity, 256)
+
+    def test_repeated_parses_are_cached(self) -> None:
+        """Test that parsing the same source again hits the cache."""
+        source = '---\nname: test\n---\nHello'
+
+        first: ParsedPrompt[Any] = parse_document(source)
+        second: ParsedPrompt[Any] = parse_document(source)
+
+        self.assertEqual(first, second)
+        stats = parse_cache_stats()
+        self.assertEqual(stats['hits'], 1)
+        self.assertEqual(stats['misses'], 1)
+        self.assertEqual(stats['size'], 1)
+
+    def test_cached_prompts_are_copies(self) -> None:
+        """Test that modifying a parsed prompt does not affect the cache."""
+        source = '---\nname: test\nfoo.bar: 1\n---\nHello'
+
+        first: ParsedPrompt[Any] = parse_document(source)
+        first.name = 'changed'
+        (first.ext or {})['foo']['bar'] = 2
+
+        second: ParsedPrompt[Any] = parse_document(source)
+        self.assertEqual(second.name, 'test')
+        self.assertEqual(second.ext, {'foo': {'bar': 1}})
+
+    def test_cache_is_bounded(self) -> None:
+        """Test that the least recently used documents are evicted."""
+        set_parse_cache_capacity(1)
+
+        parse_document('a')
+        parse_document('b')
+        parse_document('a')
+
+        stats = parse_cache_stats()
+        self.assertEqual(stats['misses'], 3)
+        self.assertEqual(stats['evictions'], 2)
+        self.assertEqual(stats['capacity'], 1)
+
+    def test_invalid_capacity(self) -> None:
+        """Test that a negative capacity is rejected."""
+        with pytest.raises(ValueError):
+            set_parse_cache_capacity(-1)
+
+
+SPECS_DIR = Path(__file__).parents[4] / 'spec'
+
+
+@unittest.skipUnless(yaml.__with_libyaml__, 'PyYAML is built without libyaml')
+class TestYamlLoaders(unittest.TestCase):
+    def assert_same_parse(self, source: str) -> None:
+        """Assert that both YAML loaders parse a source the same way."""
+        self.assertEqual(
+            _parse_document(source, yaml.CSafeLoader),
+            _parse_document(source, yaml.SafeLoader),
+        )
+
+    def test_spec_templates(self) -> None:
+        """Test that both loaders agree on every template in the spec."""
+        sources: list[str] = []
+        for path in sorted(SPECS_DIR.glob('**/*.yaml')):
+            with open(path) as f:
+                sources.extend(suite['template'] for suite in yaml.safe_load(f))
+
+        self.assertTrue(any(source.startswith('---') for source in sources))
+        for source in sources:
+            with self.subTest(source=source):
+                self.assert_same_parse(source)
+
+    def test_yaml_edge_cases(self) -> None:
+        """Test that both loaders agree on scalars, anchors and nesting."""
+        self.assert_same_parse(
+            '---\n'
+            'name: edge\n'
+            'config: {temperature: 0.5, stop: ["a", "b"], seed: 0x1F}\n'
+            'input:\n'
+            '  default: &defaults {on: yes, off: ~, day: 2025-01-01}\n'
+            '  schema:\n'
+            '    text: string, "quoted: description"\n'
+            '    items(array): {name: string, score?: number}\n'
+            'output: {default: *defaults}\n'
+            'ext.nested.key: |\n'
+            '  multi\n'
+            '  line\n'
+            '---\n'
+            'Hello {{text}}'
+        )
@@ -12,8 +12,13 @@ from typing import Any, TypedDict
 
 import structlog
 import yaml
-
-from dotpromptz.typing import DataArgument, JsonSchema, ToolDefinition
+from dotpromptz.dotprompt import Dotprompt, DotpromptOptions
+from dotpromptz.typing import (
+    DataArgument,
+    JsonSchema,
+    PromptMetadata,
+    ToolDefinition,
+)
 
 logger = structlog.get_logger(__name__)
 
@@ -168,6 +173,40 @@ class TestSpecLocation(unittest.TestCase):
         self.assertEqual(names, expected)
 
 
+class TestHelperSpecs(unittest.TestCase):
+    """Render the helper specs and compare the resulting messages."""
+
+    def test_helper_specs(self) -> None:
+        suites = create_test_suites(
+            SPECS_DIR / 'helpers', filter=is_allowed_spec_file
+        )
+        self.assertTrue(suites)
+        for suite in suites:
+            dotprompt = Dotprompt(
+                DotpromptOptions(partials=suite.get('partials', {}))
+            )
+            for test in suite['tests']:
+                with self.subTest(suite=suite['name'], desc=test['desc']):
+                    # The YAML data is a plain dict, not a DataArgument.
+                    suite_data: Any = suite.get('data', {})
+                    test_data: Any = test.get('data', {})
+                    data = {**suite_data, **test_data}
+                    options = test.get('options')
+                    result = dotprompt.render(
+                        suite['template'],
+                        DataArgument[Any].model_validate(data),
+                        PromptMetadata[Any].model_validate(options)
+                        if options
+                        else None,
+                    )
+                    messages = [
+                        message.model_dump(exclude_none=True)
+                        for message in result.messages
+                    ]
+                    expect: dict[str, Any] = dict(test['expect'])
+                    self.assertEqual(messages, expect['messages'])
+
+
 if __name__ == '__main__':
     from pprint import pprint
 
@@ -0,0 +1,129 @@
+# Copyright 2025 Google LLC
+# SPDX-License-Identifier: Apache-2.0
+
+"""Benchmark rendering from asyncio.
+
+Compares three ways of rendering from a coroutine: calling `render` directly
+on the event loop, wrapping it in `asyncio.to_thread`, and `render_async`,
+which runs the render on the native worker pool. For each it reports render
+throughput and the worst delay seen by a ticker task that should wake up
+every millisecond, i.e. how responsive the loop stayed.
+
+Usage:
+
+    python benchmarks/render_async_bench.py [--items N] [--renders N]
+"""
+
+import argparse
+import asyncio
+import time
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from handlebarrz import Template
+
+TEMPLATE = """\
+{{#each items}}
+* {{name}}: {{description}} [{{#each tags}}{{this}} {{/each}}]
+{{/each}}
+"""
+
+TICK = 0.001
+
+
+def make_context(num_items: int) -> dict[str, Any]:
+    """Build a render context with `num_items` list entries.
+
+    Args:
+        num_items: Number of entries to render per call.
+
+    Returns:
+        Render context.
+    """
+    return {
+        'items': [
+            {
+                'name': f'item-{i}',
+                'description': 'A fairly long description. ' * 4,
+                'tags': ['a', 'b', 'c', 'd'],
+            }
+            for i in range(num_items)
+        ]
+    }
+
+
+async def ticker(stop: asyncio.Event) -> float:
+    """Measure the worst event loop wake-up delay until `stop` is set.
+
+    Args:
+        stop: Event that ends the measurement.
+
+    Returns:
+        The largest observed delay past the expected wake-up, in seconds.
+    """
+    worst = 0.0
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(TICK)
+        worst = max(worst, time.perf_counter() - start - TICK)
+    return worst
+
+
+async def measure(
+    render: Callable[[], Awaitable[str]], renders: int
+) -> tuple[float, float]:
+    """Run `renders` concurrent renders next to a ticker task.
+
+    Args:
+        render: Coroutine function performing one render.
+        renders: Number of renders to perform.
+
+    Returns:
+        Renders per second and the worst loop delay in milliseconds.
+    """
+    stop = asyncio.Event()
+    tick = asyncio.create_task(ticker(stop))
+    start = time.perf_counter()
+    await asyncio.gather(*(render() for _ in range(renders)))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    return renders / elapsed, await tick * 1e3
+
+
+async def run(num_items: int, renders: int) -> None:
+    """Run the benchmark and print the results."""
+    template = Template()
+    template.register_template('bench', TEMPLATE)
+    data = make_context(num_items)
+
+    async def blocking() -> str:
+        return template.render('bench', data)
+
+    async def to_thread() -> str:
+        return await asyncio.to_thread(template.render, 'bench', data)
+
+    async def native() -> str:
+        return await template.render_async('bench', data)
+
+    for label, render in (
+        ('blocking', blocking),
+        ('to_thread', to_thread),
+        ('render_async', native),
+    ):
+        rate, lag = await measure(render, renders)
+        print(
+            f'{label:>12}: {rate:10.1f} renders/s, worst loop lag {lag:7.2f} ms'
+        )
+
+
+def main() -> None:
+    """Parse arguments and run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--items', type=int, default=1000)
+    parser.add_argument('--renders', type=int, default=500)
+    args = parser.parse_args()
+    asyncio.run(run(args.items, args.renders))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+# Copyright 2025 Google LLC
+# SPDX-License-Identifier: Apache-2.0
+
+"""Benchmark passing render context to the native engine.
+
+Compares the JSON string path (`json.dumps` in Python followed by
+`serde_json::from_str` in Rust) with the direct conversion of Python objects
+into native JSON values.
+
+Usage:
+
+    python benchmarks/render_context_bench.py [--docs N] [--repeat N]
+"""
+
+import argparse
+import json
+import timeit
+from typing import Any
+
+from handlebarrz._native import HandlebarrzTemplate
+
+TEMPLATE = """\
+{{#each docs}}
+[{{@index}}] {{title}} ({{source.url}})
+{{/each}}
+Question: {{question}}
+"""
+
+
+def make_context(num_docs: int) -> dict[str, Any]:
+    """Build a retrieval-augmented prompt context.
+
+    Args:
+        num_docs: Number of retrieved documents to include.
+
+    Returns:
+        Render context with roughly 2 KB of data per document.
+    """
+    return {
+        'question': 'What is the capital of France?',
+        'docs': [
+            {
+                'title': f'Document {i}',
+                'text': 'Lorem ipsum dolor sit amet. ' * 64,
+                'score': 1.0 / (i + 1),
+                'tags': ['geo', 'europe', 'capital'],
+                'source': {'url': f'https://example.com/{i}', 'page': i},
+            }
+            for i in range(num_docs)
+        ],
+    }
+
+
+def main() -> None:
+    """Run the benchmark and print per-render timings."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--docs', type=int, default=200)
+    parser.add_argument('--repeat', type=int, default=50)
+    args = parser.parse_args()
+
+    engine = HandlebarrzTemplate()
+    engine.register_template('rag', TEMPLATE)
+    data = make_context(args.docs)
+    size_kb = len(json.dumps(data)) / 1024
+
+    assert engine.render_json('rag', json.dumps(data)) == engine.render(
+        'rag', data
+    )
+
+    def json_path() -> str:
+        return engine.render_json('rag', json.dumps(data))
+
+    def direct_path() -> str:
+        return engine.render('rag', data)
+
+    print(f'context size: {size_kb:.0f} KB, repeat: {args.repeat}')
+    for label, fn in (('json.dumps', json_path), ('direct', direct_path)):
+        best = min(timeit.repeat(fn, number=args.repeat, repeat=5))
+        print(f'{label:>12}: {best / args.repeat * 1e3:8.3f} ms/render')
+
+
+if __name__ == '__main__':
+    main()
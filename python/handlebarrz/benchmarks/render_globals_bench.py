@@ -0,0 +1,77 @@
+# Copyright 2025 Google LLC
+# SPDX-License-Identifier: Apache-2.0
+
+"""Benchmark global data against passing shared data on every render.
+
+Renders a template that reads a large product catalog plus a small
+per-request context. The catalog is either merged into the render data on
+every call, or registered once with `Template.set_global`.
+
+Usage:
+
+    python benchmarks/render_globals_bench.py [--products N] [--repeat N]
+"""
+
+import argparse
+import timeit
+from typing import Any
+
+from handlebarrz import Template
+
+TEMPLATE = """\
+Hi {{user}}, today's picks:
+{{#each picks}}
+- {{lookup @root.catalog.names this}}
+{{/each}}
+"""
+
+
+def make_catalog(num_products: int) -> dict[str, Any]:
+    """Build a product catalog.
+
+    Args:
+        num_products: Number of products in the catalog.
+
+    Returns:
+        Catalog data.
+    """
+    return {
+        'names': {f'p{i}': f'Product {i}' for i in range(num_products)},
+        'descriptions': {
+            f'p{i}': 'A very good product. ' * 8 for i in range(num_products)
+        },
+    }
+
+
+def main() -> None:
+    """Run the benchmark and print per-render timings."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--products', type=int, default=2000)
+    parser.add_argument('--repeat', type=int, default=50)
+    args = parser.parse_args()
+
+    catalog = make_catalog(args.products)
+    request = {'user': 'Ada', 'picks': ['p1', 'p7', 'p42']}
+
+    per_render = Template()
+    per_render.register_template('page', TEMPLATE)
+    shared = Template()
+    shared.register_template('page', TEMPLATE)
+    shared.set_global('catalog', catalog)
+
+    def merged() -> str:
+        return per_render.render('page', {**request, 'catalog': catalog})
+
+    def global_data() -> str:
+        return shared.render('page', request)
+
+    assert merged() == global_data()
+
+    print(f'products: {args.products}, repeat: {args.repeat}')
+    for label, fn in (('per render', merged), ('global', global_data)):
+        best = min(timeit.repeat(fn, number=args.repeat, repeat=5))
+        print(f'{label:>10}: {best / args.repeat * 1e3:8.3f} ms/render')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,101 @@
+# Copyright 2025 Google LLC
+# SPDX-License-Identifier: Apache-2.0
+
+"""Benchmark context projection.
+
+Renders a template that reads a few fields of a large user profile, with and
+without context projection. With projection enabled only the fields the
+template reads are converted into native JSON values.
+
+Usage:
+
+    python benchmarks/render_projection_bench.py [--orders N] [--repeat N]
+"""
+
+import argparse
+import json
+import timeit
+from typing import Any
+
+from handlebarrz import Template
+
+TEMPLATE = """\
+Hello {{user.name}}! Your last orders:
+{{#each orders}}
+- #{{id}} ({{status}})
+{{/each}}
+"""
+
+
+def make_context(num_orders: int) -> dict[str, Any]:
+    """Build a render context dominated by data the template never reads.
+
+    Args:
+        num_orders: Number of orders in the order history.
+
+    Returns:
+        Render context.
+    """
+    return {
+        'user': {
+            'name': 'Ada',
+            'email': 'ada@example.com',
+            'preferences': {f'pref-{i}': i % 2 == 0 for i in range(100)},
+        },
+        'orders': [
+            {
+                'id': i,
+                'status': 'shipped',
+                'lines': [
+                    {'sku': f'sku-{j}', 'qty': j, 'price': 9.99}
+                    for j in range(10)
+                ],
+                'notes': 'Leave at the door. ' * 16,
+            }
+            for i in range(num_orders)
+        ],
+    }
+
+
+def main() -> None:
+    """Run the benchmark and print per-render timings."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--orders', type=int, default=200)
+    parser.add_argument('--repeat', type=int, default=50)
+    args = parser.parse_args()
+
+    data = make_context(args.orders)
+    size_kb = len(json.dumps(data)) / 1024
+    engines: dict[str, Template] = {}
+    for projection in (False, True):
+        engine = Template()
+        engine.context_projection = projection
+        engine.register_template('page', TEMPLATE)
+        engines['projected' if projection else 'full'] = engine
+
+    assert engines['full'].render('page', data) == engines['projected'].render(
+        'page', data
+    )
+
+    print(f'context size: {size_kb:.0f} KB, repeat: {args.repeat}')
+    for label, engine in engines.items():
+
+        def render(engine: Template = engine) -> str:
+            return engine.render('page', data)
+
+        best = min(
+            timeit.repeat(
+                render,
+                number=args.repeat,
+                repeat=5,
+            )
+        )
+        print(f'{label:>10}: {best / args.repeat * 1e3:8.3f} ms/render')
+
+    stats = engines['projected'].context_projection_stats()
+    saved_kb = stats['bytes_saved'] / stats['projected'] / 1024
+    print(f'saved per render: {saved_kb:.0f} KB')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,110 @@
+# Copyright 2025 Google LLC
+# SPDX-License-Identifier: Apache-2.0
+
+"""Benchmark peak memory of buffered and streaming renders.
+
+Renders a long-context prompt to a file with `render` (one string built in
+Rust and copied into Python) and with `render_to` (chunks written while
+rendering). Each mode runs in a fresh interpreter so its peak resident set
+size is measured in isolation.
+
+Usage:
+
+    python benchmarks/render_streaming_bench.py [--docs N]
+"""
+
+import argparse
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any
+
+from handlebarrz import Template
+
+TEMPLATE = """\
+{{#each docs}}
+<doc id="{{@index}}" title="{{title}}">
+{{text}}
+</doc>
+{{/each}}
+"""
+
+MODES = ('render', 'render_to')
+
+
+def make_context(num_docs: int) -> dict[str, Any]:
+    """Build a long-context prompt with roughly 8 KB of text per document.
+
+    Args:
+        num_docs: Number of documents to include.
+
+    Returns:
+        Render context.
+    """
+    text = 'Lorem ipsum dolor sit amet, consectetur adipiscing elit. ' * 144
+    return {
+        'docs': [
+            {'title': f'Document {i}', 'text': text} for i in range(num_docs)
+        ]
+    }
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process in megabytes."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kilobytes elsewhere.
+    return peak / (1024 * 1024 if sys.platform == 'darwin' else 1024)
+
+
+def run_mode(mode: str, num_docs: int) -> None:
+    """Render once with the given mode and print the measurements.
+
+    Args:
+        mode: One of `MODES`.
+        num_docs: Number of documents to render.
+    """
+    template = Template()
+    template.register_template('prompt', TEMPLATE)
+    data = make_context(num_docs)
+    baseline = peak_rss_mb()
+
+    with tempfile.TemporaryFile('w', encoding='utf-8') as out:
+        start = time.perf_counter()
+        if mode == 'render':
+            out.write(template.render('prompt', data))
+        else:
+            template.render_to('prompt', data, out)
+        elapsed = time.perf_counter() - start
+        size_mb = out.tell() / (1024 * 1024)
+
+    print(
+        f'{mode:>10}: output {size_mb:6.1f} MB, '
+        f'peak growth {peak_rss_mb() - baseline:7.1f} MB, '
+        f'{elapsed * 1e3:8.1f} ms'
+    )
+
+
+def main() -> None:
+    """Run each mode in a separate interpreter."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--docs', type=int, default=4000)
+    parser.add_argument('--mode', choices=MODES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode:
+        run_mode(args.mode, args.docs)
+        return
+
+    for mode in MODES:
+        subprocess.run(
+            [sys.executable, os.path.abspath(__file__), '--mode', mode]
+            + ['--docs', str(args.docs)],
+            check=True,
+        )
+
+
+if __name__ == '__main__':
+    main()
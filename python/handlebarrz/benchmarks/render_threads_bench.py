@@ -0,0 +1,137 @@
+# Copyright 2025 Google LLC
+# SPDX-License-Identifier: Apache-2.0
+
+"""Benchmark multi-threaded render throughput.
+
+Renders the same template from a growing number of threads. Since the native
+engine releases the GIL while rendering, throughput should scale with the
+number of threads up to the number of available cores.
+
+With `--python-helper` every item is rendered through a Python helper, which
+needs the GIL on regular builds and so stops scaling. On a free-threaded build
+(e.g. `python3.13t`) the helper calls run in parallel as well:
+
+    python3.13t benchmarks/render_threads_bench.py --python-helper
+
+Usage:
+
+    python benchmarks/render_threads_bench.py [--items N] [--renders N]
+        [--python-helper]
+"""
+
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+from handlebarrz import Template
+
+TEMPLATE = """\
+{{#each items}}
+{{#if active}}* {{name}}: {{description}} [{{#each tags}}{{this}} {{/each}}]
+{{else}}- {{name}}{{/if}}
+{{/each}}
+"""
+
+HELPER_TEMPLATE = """\
+{{#each items}}
+* {{label name active}}: {{description}}
+{{/each}}
+"""
+
+
+def label(params: list[Any], hash: dict[str, Any], ctx: dict[str, Any]) -> str:
+    """Python helper that formats an item name.
+
+    Args:
+        params: The item name and whether it is active.
+        hash: Unused.
+        ctx: Unused.
+
+    Returns:
+        The formatted name.
+    """
+    name, active = str(params[0]), params[1]
+    return name.upper() if active else name.lower()
+
+
+def make_context(num_items: int) -> dict[str, Any]:
+    """Build a render context with `num_items` list entries.
+
+    Args:
+        num_items: Number of entries to render per call.
+
+    Returns:
+        Render context.
+    """
+    return {
+        'items': [
+            {
+                'name': f'item-{i}',
+                'active': i % 3 != 0,
+                'description': 'A fairly long description. ' * 4,
+                'tags': ['a', 'b', 'c', 'd'],
+            }
+            for i in range(num_items)
+        ]
+    }
+
+
+def throughput(
+    template: Template, data: dict[str, Any], threads: int, renders: int
+) -> float:
+    """Measure renders per second using the given number of threads.
+
+    Args:
+        template: Template engine with the `bench` template registered.
+        data: Render context.
+        threads: Number of worker threads.
+        renders: Total number of renders to perform.
+
+    Returns:
+        Renders per second.
+    """
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        start = time.perf_counter()
+        for _ in pool.map(
+            lambda _: template.render('bench', data), range(renders)
+        ):
+            pass
+        return renders / (time.perf_counter() - start)
+
+
+def main() -> None:
+    """Run the benchmark and print throughput per thread count."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--items', type=int, default=2000)
+    parser.add_argument('--renders', type=int, default=400)
+    parser.add_argument('--python-helper', action='store_true')
+    args = parser.parse_args()
+
+    template = Template()
+    if args.python_helper:
+        template.register_helper('label', label, needs_context=False)
+        template.register_template('bench', HELPER_TEMPLATE)
+    else:
+        template.register_template('bench', TEMPLATE)
+    data = make_context(args.items)
+
+    gil = getattr(sys, '_is_gil_enabled', lambda: True)()
+    print(f'Python {sys.version.split()[0]}, GIL enabled: {gil}')
+
+    baseline = throughput(template, data, 1, args.renders)
+    max_threads = os.cpu_count() or 1
+    threads = 1
+    while threads <= max_threads:
+        rate = throughput(template, data, threads, args.renders)
+        print(
+            f'{threads:>3} threads: {rate:10.1f} renders/s '
+            f'({rate / baseline:4.2f}x)'
+        )
+        threads *= 2
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,847 @@
+// Copyright 2025 Google LLC
+// SPDX-License-Identifier: Apache-2.0
+
+//! Static analysis of compiled templates.
+//!
+//! Walks the template AST to find the data paths, partials and helpers a
+//! template references, without rendering it. Paths are resolved against the
+//! root of the render data, following the context changes made by `#each`
+//! and `#with` blocks, `../` parent references, `@root` and block parameters.
+//! Elements of arrays (or values of objects) iterated by `#each` are written
+//! as a `*` segment, e.g. `items.*.name`.
+
+use handlebars::template::{
+    BlockParam, DecoratorTemplate, HelperTemplate, Parameter, TemplateElement,
+};
+use handlebars::{Handlebars, Template};
+use serde_json::{Map, Value};
+use std::collections::{BTreeSet, HashMap};
+
+/// The data paths, partials and helpers referenced by a template.
+#[derive(Debug, Default, PartialEq, Eq)]
+pub struct TemplateAnalysis {
+    /// Paths whose whole subtree may be read, e.g. by `{{user.name}}` or by
+    /// passing `user` to a helper.
+    pub reads: BTreeSet<Vec<String>>,
+    /// Paths used as the context of an `#each` or `#with` block or a partial.
+    /// Only their shape and truthiness matter, not their full contents.
+    pub scopes: BTreeSet<Vec<String>>,
+    /// Names of referenced partials, including those used by partials.
+    pub partials: BTreeSet<String>,
+    /// Referenced partials that are neither registered nor defined inline.
+    pub missing_partials: BTreeSet<String>,
+    /// Names of called helpers.
+    pub helpers: BTreeSet<String>,
+    /// Called helpers that are not registered.
+    pub unknown_helpers: BTreeSet<String>,
+    /// Whether the template may read data through paths that cannot be
+    /// determined statically, e.g. via dynamic or recursive partials.
+    pub dynamic: bool,
+}
+
+impl TemplateAnalysis {
+    /// All referenced data paths, formatted as strings and sorted.
+    pub fn paths(&self) -> Vec<String> {
+        self.reads
+            .union(&self.scopes)
+            .map(|path| format_path(path))
+            .collect::<BTreeSet<_>>()
+            .into_iter()
+            .collect()
+    }
+
+    /// Builds the projection of the render data that covers every path the
+    /// template reads.
+    ///
+    /// Returns `None` if the template needs all of the data: when it reads
+    /// the whole root context, or when the analysis is not complete.
+    pub fn projection(&self) -> Option<Projection> {
+        if self.dynamic {
+            return None;
+        }
+        let mut root = Projection::default();
+        for path in &self.reads {
+            root.insert(path, true);
+        }
+        for path in &self.scopes {
+            root.insert(path, false);
+        }
+        if root.all {
+            return None;
+        }
+        root.finish();
+        Some(root)
+    }
+}
+
+/// The parts of a value that a template reads.
+///
+/// Values are projected by keeping the object keys and array elements that
+/// have a child node, recursively, and keeping nodes marked `all` in full.
+#[derive(Debug, Default, PartialEq, Eq)]
+pub struct Projection {
+    /// Whether the whole value is read.
+    pub all: bool,
+    /// Whether the truthiness of the value is observed, so a non-empty
+    /// object must not be projected to an empty one.
+    pub keep_nonempty: bool,
+    /// The parts read of object values or array elements, by key or index.
+    pub children: HashMap<String, Projection>,
+    /// The parts read of every object value or array element.
+    pub elements: Option<Box<Projection>>,
+}
+
+impl Projection {
+    /// The projection of the object value or array element at `key`, or
+    /// `None` if it is not read.
+    pub fn child(&self, key: &str) -> Option<&Projection> {
+        self.children.get(key).or(self.elements.as_deref())
+    }
+
+    /// The projection of the array element at `index`, or `None` if it is
+    /// not read.
+    pub fn element(&self, index: usize) -> Option<&Projection> {
+        if self.children.is_empty() {
+            self.elements.as_deref()
+        } else {
+            self.child(&index.to_string())
+        }
+    }
+
+    /// Copies the parts of a JSON value that the projection covers.
+    ///
+    /// Unread object keys are dropped and unread array elements become
+    /// `null`, as when projecting Python data.
+    pub fn apply(&self, value: &Value) -> Value {
+        if self.all {
+            return value.clone();
+        }
+        match value {
+            Value::Object(map) => {
+                let projected = map
+                    .iter()
+                    .filter_map(|(key, item)| Some((key.clone(), self.child(key)?.apply(item))))
+                    .collect::<Map<_, _>>();
+                if projected.is_empty() && !map.is_empty() && self.keep_nonempty {
+                    return value.clone();
+                }
+                Value::Object(projected)
+            }
+            Value::Array(items) => Value::Array(
+                items
+                    .iter()
+                    .enumerate()
+                    .map(|(index, item)| self.element(index).map_or(Value::Null, |p| p.apply(item)))
+                    .collect(),
+            ),
+            _ => value.clone(),
+        }
+    }
+
+    fn insert(&mut self, path: &[String], all: bool) {
+        let Some((first, rest)) = path.split_first() else {
+            if all {
+                self.all = true;
+            } else {
+                self.keep_nonempty = true;
+            }
+            return;
+        };
+        let node = if first == "*" {
+            self.elements.get_or_insert_with(Box::default)
+        } else {
+            self.children.entry(first.clone()).or_default()
+        };
+        node.insert(rest, all);
+    }
+
+    fn merge(&mut self, other: &Projection) {
+        self.all |= other.all;
+        self.keep_nonempty |= other.keep_nonempty;
+        for (key, child) in &other.children {
+            self.children.entry(key.clone()).or_default().merge(child);
+        }
+        if let Some(elements) = &other.elements {
+            self.elements
+                .get_or_insert_with(Box::default)
+                .merge(elements);
+        }
+    }
+
+    /// Drops nodes below `all` nodes and merges `elements` into the named
+    /// children, so that `child` only needs a single lookup.
+    fn finish(&mut self) {
+        if self.all {
+            self.children.clear();
+            self.elements = None;
+            return;
+        }
+        if let Some(elements) = self.elements.as_deref_mut() {
+            elements.finish();
+            for child in self.children.values_mut() {
+                child.merge(elements);
+            }
+        }
+        for child in self.children.values_mut() {
+            child.finish();
+        }
+    }
+}
+
+/// Where the analysis looks up the helpers and partials a template uses.
+pub trait Lookup {
+    /// Returns whether a helper is registered under `name`.
+    fn has_helper(&self, name: &str) -> bool;
+
+    /// Returns the template or partial registered under `name`.
+    fn get_template(&self, name: &str) -> Option<&Template>;
+}
+
+impl Lookup for Handlebars<'_> {
+    fn has_helper(&self, name: &str) -> bool {
+        self.get_helper(name).is_some()
+    }
+
+    fn get_template(&self, name: &str) -> Option<&Template> {
+        Handlebars::get_template(self, name)
+    }
+}
+
+/// Analyzes a template, looking up helpers and partials in `registry`.
+pub fn analyze<'a>(registry: &'a dyn Lookup, template: &'a Template) -> TemplateAnalysis {
+    let mut analyzer = Analyzer {
+        registry,
+        analysis: TemplateAnalysis::default(),
+        inline_partials: HashMap::new(),
+        partial_blocks: Vec::new(),
+        partial_stack: Vec::new(),
+    };
+    analyzer.visit_template(template, &Scope::root());
+    analyzer.analysis
+}
+
+/// Formats a path as a Handlebars-style dotted path.
+///
+/// The empty path (the whole context) is written as `this`, and segments
+/// that are not plain identifiers are wrapped in `[...]`.
+pub fn format_path(path: &[String]) -> String {
+    if path.is_empty() {
+        return "this".to_string();
+    }
+    path.iter()
+        .map(|seg| {
+            if seg.is_empty() || seg.contains(['.', '/', '[', ']', ' ']) {
+                format!("[{}]", seg)
+            } else {
+                seg.clone()
+            }
+        })
+        .collect::<Vec<_>>()
+        .join(".")
+}
+
+/// A path expression as written in a template.
+#[derive(Debug, PartialEq, Eq)]
+enum RawPath {
+    /// A data variable such as `@index`.
+    Data,
+    /// A path below `@root`.
+    Root(Vec<String>),
+    /// A path relative to the context `up` levels above the current one.
+    Relative { up: usize, segs: Vec<String> },
+}
+
+fn parse_raw_path(raw: &str) -> RawPath {
+    if let Some(rest) = raw.strip_prefix("@root") {
+        if rest.is_empty() || rest.starts_with(['.', '/']) {
+            return RawPath::Root(split_segments(rest));
+        }
+    }
+    if raw.starts_with('@') {
+        return RawPath::Data;
+    }
+
+    let mut rest = raw;
+    let mut up = 0;
+    loop {
+        if let Some(r) = rest.strip_prefix("../") {
+            up += 1;
+            rest = r;
+        } else if rest == ".." {
+            up += 1;
+            rest = "";
+        } else {
+            break;
+        }
+    }
+
+    let mut segs = split_segments(rest);
+    if segs.first().is_some_and(|seg| seg == "this") {
+        segs.remove(0);
+    }
+    RawPath::Relative { up, segs }
+}
+
+/// Splits a path on `.` and `/`, keeping `[...]` segments literal.
+fn split_segments(path: &str) -> Vec<String> {
+    let mut segs = Vec::new();
+    let mut current = String::new();
+    let mut chars = path.chars();
+    while let Some(c) = chars.next() {
+        match c {
+            '[' => current.extend(chars.by_ref().take_while(|&c| c != ']')),
+            '.' | '/' => {
+                if !current.is_empty() {
+                    segs.push(std::mem::take(&mut current));
+                }
+            }
+            _ => current.push(c),
+        }
+    }
+    if !current.is_empty() {
+        segs.push(current);
+    }
+    segs
+}
+
+/// The contexts and block parameters visible at a point in a template.
+#[derive(Clone)]
+struct Scope {
+    /// Absolute path of each enclosing context, innermost last.
+    contexts: Vec<Vec<String>>,
+    /// Block parameters by name. `None` for parameters that do not refer to
+    /// data, such as the index of `#each`.
+    block_params: HashMap<String, Option<Vec<String>>>,
+}
+
+impl Scope {
+    fn root() -> Self {
+        Scope {
+            contexts: vec![Vec::new()],
+            block_params: HashMap::new(),
+        }
+    }
+
+    fn push(&self, context: Vec<String>) -> Self {
+        let mut scope = self.clone();
+        scope.contexts.push(context);
+        scope
+    }
+
+    fn bind(&mut self, param: &Parameter, path: Option<Vec<String>>) {
+        if let Some(name) = param.as_name() {
+            self.block_params.insert(name.to_string(), path);
+        }
+    }
+
+    /// Resolves a path expression to an absolute path, or `None` if it does
+    /// not refer to the render data.
+    fn resolve(&self, raw: &str) -> Option<Vec<String>> {
+        match parse_raw_path(raw) {
+            RawPath::Data => None,
+            RawPath::Root(segs) => Some(segs),
+            RawPath::Relative { up, segs } => {
+                if up == 0 {
+                    if let Some(bound) = segs.first().and_then(|s| self.block_params.get(s)) {
+                        let mut path = bound.clone()?;
+                        path.extend(segs.into_iter().skip(1));
+                        return Some(path);
+                    }
+                }
+                let base = self
+                    .contexts
+                    .len()
+                    .checked_sub(1 + up)
+                    .map_or(&self.contexts[0], |i| &self.contexts[i]);
+                let mut path = base.clone();
+                path.extend(segs);
+                Some(path)
+            }
+        }
+    }
+}
+
+struct Analyzer<'a> {
+    registry: &'a dyn Lookup,
+    analysis: TemplateAnalysis,
+    /// Inline partials defined so far, by name. They are analyzed where they
+    /// are used, in the context they are rendered with.
+    inline_partials: HashMap<String, &'a Template>,
+    /// Blocks of the enclosing partial blocks, innermost last, which
+    /// `{{> @partial-block}}` renders.
+    partial_blocks: Vec<&'a Template>,
+    partial_stack: Vec<String>,
+}
+
+impl<'a> Analyzer<'a> {
+    fn visit_template(&mut self, template: &'a Template, scope: &Scope) {
+        for element in &template.elements {
+            self.visit_element(element, scope);
+        }
+    }
+
+    fn visit_element(&mut self, element: &'a TemplateElement, scope: &Scope) {
+        match element {
+            TemplateElement::Expression(ht) | TemplateElement::HtmlExpression(ht) => {
+                self.visit_expression(ht, scope)
+            }
+            TemplateElement::HelperBlock(ht) => self.visit_block(ht, scope),
+            TemplateElement::PartialExpression(dt) | TemplateElement::PartialBlock(dt) => {
+                self.visit_partial(dt, scope)
+            }
+            TemplateElement::DecoratorExpression(dt) | TemplateElement::DecoratorBlock(dt) => {
+                self.visit_decorator(dt, scope)
+            }
+            TemplateElement::RawString(_) | TemplateElement::Comment(_) => {}
+        }
+    }
+
+    /// `{{name}}` reads a path unless `name` is a helper; `{{name args}}`
+    /// always calls a helper.
+    fn visit_expression(&mut self, ht: &HelperTemplate, scope: &Scope) {
+        if !ht.params.is_empty() || !ht.hash.is_empty() {
+            self.visit_call(&ht.name, &ht.params, &ht.hash, scope);
+            return;
+        }
+        match &ht.name {
+            Parameter::Subexpression(_) | Parameter::Literal(_) => {
+                self.visit_param(&ht.name, scope)
+            }
+            name => {
+                if let Some(name) = name.as_name() {
+                    if self.registry.has_helper(name) {
+                        self.use_helper(name);
+                    } else {
+                        self.read(name, scope);
+                    }
+                }
+            }
+        }
+    }
+
+    fn visit_block(&mut self, ht: &'a HelperTemplate, scope: &Scope) {
+        let name = ht.name.as_name().unwrap_or_default();
+        let target = match (name, ht.params.as_slice()) {
+            ("each" | "with", [param]) => param_path(param).map(|raw| scope.resolve(raw)),
+            _ => None,
+        };
+
+        match target {
+            Some(Some(target)) => {
+                self.use_helper(name);
+                self.visit_params(&[], &ht.hash, scope);
+                self.analysis.scopes.insert(target.clone());
+
+                let context = if name == "each" {
+                    let mut elements = target;
+                    elements.push("*".to_string());
+                    elements
+                } else {
+                    target
+                };
+                let mut inner = scope.push(context.clone());
+                match &ht.block_param {
+                    Some(BlockParam::Single(param)) => inner.bind(param, Some(context)),
+                    Some(BlockParam::Pair((value, key))) => {
+                        inner.bind(value, Some(context));
+                        inner.bind(key, None);
+                    }
+                    None => {}
+                }
+                if let Some(template) = &ht.template {
+                    self.visit_template(template, &inner);
+                }
+            }
+            _ => {
+                let is_path_block = ht.params.is_empty()
+                    && ht.hash.is_empty()
+                    && matches!(ht.name, Parameter::Path(_) | Parameter::Name(_))
+                    && !self.registry.has_helper(name);
+                if is_path_block {
+                    // `{{#path}}...{{/path}}` may render the block with the
+                    // value of `path` as context, so the whole value is
+                    // needed. The block is also visited in that context so
+                    // that `../` references resolve either way.
+                    self.read(name, scope);
+                    if let (Some(context), Some(template)) = (scope.resolve(name), &ht.template) {
+                        self.visit_template(template, &scope.push(context));
+                    }
+                } else {
+                    self.visit_call(&ht.name, &ht.params, &ht.hash, scope);
+                    if matches!(name, "each" | "with") {
+                        // `#each`/`#with` over a data variable or a
+                        // subexpression, whose block renders in a context
+                        // that is not known statically.
+                        self.analysis.dynamic = true;
+                    }
+                }
+
+                let mut inner = scope.clone();
+                match &ht.block_param {
+                    Some(BlockParam::Single(param)) => inner.bind(param, None),
+                    Some(BlockParam::Pair((first, second))) => {
+                        inner.bind(first, None);
+                        inner.bind(second, None);
+                    }
+                    None => {}
+                }
+                if let Some(template) = &ht.template {
+                    self.visit_template(template, &inner);
+                }
+            }
+        }
+
+        if let Some(inverse) = &ht.inverse {
+            self.visit_template(inverse, scope);
+        }
+    }
+
+    fn visit_partial(&mut self, dt: &'a DecoratorTemplate, scope: &Scope) {
+        let name = match &dt.name {
+            Parameter::Literal(Value::String(name)) => Some(name.as_str()),
+            Parameter::Subexpression(_) | Parameter::Literal(_) => {
+                self.visit_param(&dt.name, scope);
+                self.analysis.dynamic = true;
+                None
+            }
+            name => name.as_name(),
+        };
+
+        self.visit_params(&[], &dt.hash, scope);
+        let partial_scope = match dt.params.first() {
+            Some(param) => match param_path(param).and_then(|raw| scope.resolve(raw)) {
+                Some(context) => {
+                    self.analysis.scopes.insert(context.clone());
+                    scope.push(context)
+                }
+                None => {
+                    self.visit_param(param, scope);
+                    scope.clone()
+                }
+            },
+            None => scope.clone(),
+        };
+        // Inline partials defined at the top of a partial block are defined
+        // before the partial is looked up.
+        if let Some(template) = &dt.template {
+            for element in &template.elements {
+                if let TemplateElement::DecoratorExpression(inner)
+                | TemplateElement::DecoratorBlock(inner) = element
+                {
+                    self.define_inline_partial(inner);
+                }
+            }
+        }
+
+        if name == Some("@partial-block") {
+            self.visit_partial_block(&partial_scope);
+            return;
+        }
+        let Some(name) = name.filter(|name| !name.starts_with('@')) else {
+            if let Some(template) = &dt.template {
+                self.visit_template(template, scope);
+            }
+            return;
+        };
+        self.analysis.partials.insert(name.to_string());
+        if self.partial_stack.iter().any(|n| n == name) {
+            // Recursive partials can read arbitrarily deep paths.
+            self.analysis.dynamic = true;
+            return;
+        }
+        let partial = match self.inline_partials.get(name) {
+            Some(&partial) => Some(partial),
+            None => self.registry.get_template(name),
+        };
+        match (partial, &dt.template) {
+            (Some(partial), block) => {
+                // Inline partials defined by the partial stay local to it.
+                let inline_partials = self.inline_partials.clone();
+                if let Some(block) = block {
+                    self.partial_blocks.push(block);
+                }
+                self.partial_stack.push(name.to_string());
+                self.visit_template(partial, &partial_scope);
+                self.partial_stack.pop();
+                if block.is_some() {
+                    self.partial_blocks.pop();
+                }
+                self.inline_partials = inline_partials;
+            }
+            // A missing partial renders its block instead, in the context
+            // of the caller.
+            (None, Some(block)) => self.visit_template(block, scope),
+            (None, None) => {
+                self.analysis.missing_partials.insert(name.to_string());
+                self.analysis.dynamic = true;
+            }
+        }
+    }
+
+    /// `{{> @partial-block}}` renders the block of the innermost partial
+    /// block in the context at that point of the partial, with the block of
+    /// the next partial block out as its own `@partial-block`.
+    fn visit_partial_block(&mut self, scope: &Scope) {
+        let Some(block) = self.partial_blocks.pop() else {
+            // The partial was not called with a block.
+            self.analysis.dynamic = true;
+            return;
+        };
+        self.visit_template(block, scope);
+        self.partial_blocks.push(block);
+    }
+
+    fn visit_decorator(&mut self, dt: &'a DecoratorTemplate, scope: &Scope) {
+        if self.define_inline_partial(dt) {
+            return;
+        }
+        self.visit_params(&dt.params, &dt.hash, scope);
+        if let Some(template) = &dt.template {
+            self.visit_template(template, scope);
+        }
+    }
+
+    /// Records the definition of an inline partial, returning whether the
+    /// decorator is one.
+    fn define_inline_partial(&mut self, dt: &'a DecoratorTemplate) -> bool {
+        if dt.name.as_name() != Some("inline") {
+            return false;
+        }
+        match (dt.params.first(), &dt.template) {
+            (Some(Parameter::Literal(Value::String(name))), Some(template)) => {
+                self.inline_partials.insert(name.clone(), template);
+            }
+            // An inline partial with a computed name may replace any partial.
+            _ => self.analysis.dynamic = true,
+        }
+        true
+    }
+
+    fn visit_call(
+        &mut self,
+        name: &Parameter,
+        params: &[Parameter],
+        hash: &HashMap<String, Parameter>,
+        scope: &Scope,
+    ) {
+        match name.as_name() {
+            Some(name) => self.use_helper(name),
+            None => self.visit_param(name, scope),
+        }
+        self.visit_params(params, hash, scope);
+    }
+
+    fn visit_params(
+        &mut self,
+        params: &[Parameter],
+        hash: &HashMap<String, Parameter>,
+        scope: &Scope,
+    ) {
+        for param in params.iter().chain(hash.values()) {
+            self.visit_param(param, scope);
+        }
+    }
+
+    fn visit_param(&mut self, param: &Parameter, scope: &Scope) {
+        match param {
+            Parameter::Subexpression(sub) => match sub.as_element() {
+                TemplateElement::Expression(ht) | TemplateElement::HtmlExpression(ht) => {
+                    self.visit_call(&ht.name, &ht.params, &ht.hash, scope)
+                }
+                _ => self.analysis.dynamic = true,
+            },
+            Parameter::Literal(_) => {}
+            path => {
+                if let Some(raw) = path.as_name() {
+                    self.read(raw, scope);
+                }
+            }
+        }
+    }
+
+    fn use_helper(&mut self, name: &str) {
+        self.analysis.helpers.insert(name.to_string());
+        if !self.registry.has_helper(name) {
+            self.analysis.unknown_helpers.insert(name.to_string());
+        }
+    }
+
+    fn read(&mut self, raw: &str, scope: &Scope) {
+        if let Some(path) = scope.resolve(raw) {
+            self.analysis.reads.insert(path);
+        }
+    }
+}
+
+/// The path expression of a parameter, if it is one.
+fn param_path(param: &Parameter) -> Option<&str> {
+    match param {
+        Parameter::Path(_) | Parameter::Name(_) => param.as_name(),
+        _ => None,
+    }
+}
+
+#[cfg(test)]
+mod test {
+    use super::*;
+
+    fn analyze_source(source: &str) -> TemplateAnalysis {
+        let mut registry = Handlebars::new();
+        registry
+            .register_partial("footer", "{{company.name}} {{@root.year}}")
+            .unwrap();
+        registry
+            .register_partial("layout", "{{#each rows}}{{> @partial-block}}{{/each}}")
+            .unwrap();
+        let template = Template::compile(source).unwrap();
+        analyze(&registry, &template)
+    }
+
+    #[test]
+    fn test_parse_raw_path() {
+        assert_eq!(parse_raw_path("@index"), RawPath::Data);
+        assert_eq!(
+            parse_raw_path("@root.a.b"),
+            RawPath::Root(vec!["a".into(), "b".into()])
+        );
+        assert_eq!(
+            parse_raw_path("../../this.[a b]/c"),
+            RawPath::Relative {
+                up: 2,
+                segs: vec!["a b".into(), "c".into()]
+            }
+        );
+        assert_eq!(
+            parse_raw_path("."),
+            RawPath::Relative {
+                up: 0,
+                segs: vec![]
+            }
+        );
+    }
+
+    #[test]
+    fn test_scopes() {
+        let analysis = analyze_source(
+            "{{title}}{{#each items as |item i|}}{{name}}{{item.id}}{{i}}{{../title}}\
+             {{@index}}{{/each}}{{#with user}}{{email}}{{@root.year}}{{/with}}",
+        );
+
+        assert_eq!(
+            analysis.paths(),
+            vec![
+                "items",
+                "items.*.id",
+                "items.*.name",
+                "title",
+                "user",
+                "user.email",
+                "year"
+            ]
+        );
+        assert!(!analysis.dynamic);
+    }
+
+    #[test]
+    fn test_helpers_and_partials() {
+        let analysis =
+            analyze_source("{{#if (eq kind \"a\")}}{{upper name}}{{/if}}{{> footer}}{{> header}}");
+
+        assert_eq!(
+            analysis.paths(),
+            vec!["company.name", "kind", "name", "year"]
+        );
+        assert_eq!(
+            analysis.helpers.iter().collect::<Vec<_>>(),
+            vec!["eq", "if", "upper"]
+        );
+        assert_eq!(
+            analysis.unknown_helpers.iter().collect::<Vec<_>>(),
+            vec!["upper"]
+        );
+        assert_eq!(
+            analysis.partials.iter().collect::<Vec<_>>(),
+            vec!["footer", "header"]
+        );
+        assert!(analysis.missing_partials.contains("header"));
+        assert!(analysis.dynamic);
+    }
+
+    #[test]
+    fn test_inline_partials_are_analyzed_where_used() {
+        let analysis = analyze_source(
+            "{{#*inline \"row\"}}{{name}}{{/inline}}{{#each items}}{{> row}}{{/each}}",
+        );
+
+        assert_eq!(analysis.paths(), vec!["items", "items.*.name"]);
+        assert!(!analysis.dynamic);
+    }
+
+    #[test]
+    fn test_partial_blocks_are_analyzed_in_the_partial_context() {
+        let analysis = analyze_source("{{#> layout}}{{name}}{{/layout}}");
+
+        assert_eq!(analysis.paths(), vec!["rows", "rows.*.name"]);
+        assert!(!analysis.dynamic);
+    }
+
+    #[test]
+    fn test_subexpression_contexts_are_dynamic() {
+        assert!(analyze_source("{{#each (lookup a b)}}{{name}}{{/each}}").dynamic);
+        assert!(analyze_source("{{#with (lookup a b)}}{{name}}{{/with}}").dynamic);
+    }
+
+    #[test]
+    fn test_projection() {
+        let analysis = analyze_source(
+            "{{#each items}}{{name}}{{/each}}{{items.[0].id}}\
+             {{#with user}}{{email}}{{/with}}{{lookup meta key}}",
+        );
+        let projection = analysis.projection().unwrap();
+
+        let items = projection.child("items").unwrap();
+        assert!(items.keep_nonempty && !items.all);
+        assert!(items.child("1").unwrap().child("name").is_some());
+        let first = items.child("0").unwrap();
+        assert!(first.child("id").is_some() && first.child("name").is_some());
+        assert!(projection.child("user").unwrap().child("email").is_some());
+        assert!(projection.child("meta").unwrap().all);
+        assert!(projection.child("key").unwrap().all);
+        assert!(projection.child("other").is_none());
+    }
+
+    #[test]
+    fn test_apply_projection() {
+        let analysis =
+            analyze_source("{{#each items}}{{name}}{{/each}}{{#with user}}{{nick}}{{/with}}");
+        let projection = analysis.projection().unwrap();
+        let value = serde_json::json!({
+            "items": [{"name": "a", "price": 1}, "b"],
+            "user": {"name": "Ada"},
+            "other": [1, 2, 3],
+        });
+
+        assert_eq!(
+            projection.apply(&value),
+            serde_json::json!({
+                "items": [{"name": "a"}, "b"],
+                "user": {"name": "Ada"},
+            })
+        );
+    }
+
+    #[test]
+    fn test_no_projection_when_root_is_read() {
+        assert!(analyze_source("{{json this}}").projection().is_none());
+        assert!(analyze_source("{{> missing}}").projection().is_none());
+    }
+
+    #[test]
+    fn test_format_path() {
+        assert_eq!(format_path(&[]), "this");
+        assert_eq!(
+            format_path(&["a".into(), "b c".into(), "*".into()]),
+            "a.[b c].*"
+        );
+    }
+}
@@ -52,10 +52,13 @@ result = handlebars.render("formatted", {"name": "World"}) # "Hello WORLD!"
 ```
 """
 
-import json
-from collections.abc import Callable
+import asyncio
+import contextlib
+import queue
+import threading
+from collections.abc import Callable, Generator, Iterable
 from pathlib import Path
-from typing import Any
+from typing import Any, Protocol, TypedDict
 
 import structlog
 
@@ -67,6 +70,121 @@ from ._native import (
 
 logger = structlog.get_logger(__name__)
 
+DEFAULT_CHUNK_SIZE = 64 * 1024
+"""Default size in bytes of the chunks produced by streaming renders."""
+
+DEFAULT_HELPER_CACHE_SIZE = 1024
+"""Default number of results cached for each pure helper."""
+
+# Number of rendered chunks `render_iter` buffers ahead of its consumer.
+_STREAM_QUEUE_SIZE = 4
+
+# Seconds between checks for an abandoned `render_iter` consumer.
+_STREAM_POLL_INTERVAL = 0.1
+
+
+class TextWriter(Protocol):
+    """A file-like object that rendered output can be streamed to."""
+
+    def write(self, chunk: str, /) -> Any:
+        """Write a chunk of rendered output."""
+        ...
+
+
+class TemplateAnalysis(TypedDict):
+    """What a template references, as returned by `Template.analyze`.
+
+    Data paths are rooted at the render data. Elements iterated by `#each`
+    are written as `*`, e.g. `items.*.name`, and the whole context as `this`.
+    """
+
+    paths: list[str]
+    partials: list[str]
+    missing_partials: list[str]
+    helpers: list[str]
+    unknown_helpers: list[str]
+    complete: bool
+
+
+class TemplateStats(TypedDict):
+    """Render counters of one template, as returned by `Template.stats`.
+
+    Times are in nanoseconds and cover the native render, including the time
+    spent in helpers but not converting the render data. Only calls to Python
+    helpers are counted in `python_helper_calls` and `python_helper_ns`;
+    native helpers, such as the built-in, extra and dotprompt helpers, are
+    part of the render time only.
+    """
+
+    renders: int
+    errors: int
+    total_ns: int
+    max_ns: int
+    output_bytes: int
+    python_helper_calls: int
+    python_helper_ns: int
+
+
+def _future_resolver(
+    future: asyncio.Future[Any],
+) -> Callable[[Any, BaseException | None], None]:
+    """Create a native render callback that resolves an asyncio future.
+
+    The callback runs on a native worker thread, so it hands the outcome over
+    to the future's event loop instead of resolving the future directly.
+
+    Args:
+        future: The future to resolve.
+
+    Returns:
+        Callback to pass to the native `render_async` methods.
+    """
+    loop = future.get_loop()
+
+    def resolve(result: Any, error: BaseException | None) -> None:
+        loop.call_soon_threadsafe(_resolve_future, future, result, error)
+
+    return resolve
+
+
+def _resolve_future(
+    future: asyncio.Future[Any], result: Any, error: BaseException | None
+) -> None:
+    """Set the outcome of a render future unless it has been cancelled."""
+    if future.cancelled():
+        return
+    if error is not None:
+        future.set_exception(error)
+    else:
+        future.set_result(result)
+
+
+class _StreamClosedError(Exception):
+    """Raised in the render thread once a `render_iter` consumer is gone."""
+
+
+class _QueueWriter:
+    """File-like object that hands rendered chunks to a consumer thread.
+
+    Writing blocks while the queue is full so the render thread never gets
+    more than a few chunks ahead of the consumer.
+    """
+
+    def __init__(self) -> None:
+        self.chunks: queue.Queue[str | BaseException | None] = queue.Queue(
+            _STREAM_QUEUE_SIZE
+        )
+        self.closed = threading.Event()
+
+    def write(self, chunk: str | BaseException | None) -> None:
+        while not self.closed.is_set():
+            try:
+                self.chunks.put(chunk, timeout=_STREAM_POLL_INTERVAL)
+                return
+            except queue.Full:
+                pass
+        raise _StreamClosedError
+
 
 class EscapeFunction:
     """Enumeration of built-in escape functions for Handlebars templates.
@@ -110,6 +228,12 @@ class Template:
     * Subexpressions: `{{helper (subhelper param) param2}}`
     * Whitespace Control: `{{~helper}}` or `{{helper~}}`
 
+    A template engine can be shared between threads. Renders work on a
+    snapshot of the registered templates and helpers and run concurrently
+    without blocking each other. Registrations and setting changes can happen
+    at any time; they become visible to renders started afterwards, while
+    renders already in progress finish with the snapshot they started with.
+
     Attributes:
         strict_mode: Whether to raise errors for missing fields in templates.
         dev_mode: Whether to enable development mode features for
@@ -120,6 +244,29 @@ class Template:
         """Create a new Handlebars template engine."""
         self._template = HandlebarrzTemplate()
 
+    def fork(self) -> 'Template':
+        """Create a child engine that starts out as a copy of this one.
+
+        The child shares this engine's templates, partials, helpers and
+        settings without copying or recompiling them, so forking is cheap
+        enough to do per request or per tenant. Registrations and setting
+        changes made on either engine afterwards are not visible to the other.
+
+        Templates are shared one by one: registering a template or partial on
+        either engine after a fork only adds that template to the engine, so a
+        fork that overrides a few partials never copies the others. Changing a
+        helper or a setting, unregistering a shared template, or overriding
+        more than a few dozen templates copies the shared registry once for
+        that engine.
+
+        Returns:
+            A new template engine.
+        """
+        child = object.__new__(type(self))
+        child._template = self._template.fork()
+        logger.debug({'event': 'template_engine_forked'})
+        return child
+
     @property
     def strict_mode(self) -> bool:
         """Whether the strict mode setting is enabled.
@@ -155,7 +302,8 @@ class Template:
 
         In dev mode, templates are automatically reloaded from file when
         modified. This is useful during development to see changes without
-        restarting the application.
+        restarting the application. Dev mode reloads templates on every render;
+        see `reload_interval` for a faster way to pick up changed files.
 
         Args:
             enabled: Whether to enable development mode
@@ -163,6 +311,263 @@ class Template:
         self._template.set_dev_mode(enabled)
         logger.debug({'event': 'dev_mode_changed', 'enabled': enabled})
 
+    @property
+    def reload_interval(self) -> float | None:
+        """Seconds between checks for changed template files.
+
+        Returns:
+            The minimum time between two checks, or `None` if template files
+            are not checked for changes.
+        """
+        return self._template.get_reload_interval()
+
+    @reload_interval.setter
+    def reload_interval(self, interval: float | None) -> None:
+        """Set how often template files are checked for changes.
+
+        Before a render, at most once per `interval` seconds, the files of
+        templates registered with `register_template_file`,
+        `register_templates_directory` or `load_snapshot` are checked for
+        changes. Only the files whose size or modification time changed are
+        read again and recompiled, and template directories are rescanned for
+        added and removed files. Unlike dev mode, which reloads templates on
+        every render, renders between checks run at full speed. Checks are
+        skipped while dev mode is enabled.
+
+        Args:
+            interval: Minimum seconds between two checks, or `None` to stop
+                checking.
+
+        Raises:
+            ValueError: If `interval` is negative.
+        """
+        self._template.set_reload_interval(interval)
+        logger.debug({'event': 'reload_interval_changed', 'interval': interval})
+
+    @property
+    def template_cache_capacity(self) -> int:
+        """Number of compiled template strings kept by `render_template`.
+
+        Returns:
+            Maximum number of cached compiled templates.
+        """
+        return self._template.get_template_cache_capacity()
+
+    @template_cache_capacity.setter
+    def template_cache_capacity(self, capacity: int) -> None:
+        """Set the number of compiled template strings kept by
+        `render_template`.
+
+        The least recently used templates are evicted once the cache is full.
+        A capacity of zero disables the cache.
+
+        Args:
+            capacity: Maximum number of cached compiled templates.
+        """
+        self._template.set_template_cache_capacity(capacity)
+        logger.debug(
+            {'event': 'template_cache_capacity_changed', 'capacity': capacity}
+        )
+
+    def template_cache_stats(self) -> dict[str, int]:
+        """Usage statistics for the `render_template` compiled template cache.
+
+        Returns:
+            Dictionary with the `hits`, `misses` and `evictions` counters and
+            the current `size` and `capacity` of the cache.
+        """
+        return self._template.template_cache_stats()
+
+    def clear_template_cache(self) -> None:
+        """Remove all compiled templates from the `render_template` cache.
+
+        The cache is also cleared automatically whenever helpers or partials
+        are registered.
+        """
+        self._template.clear_template_cache()
+        logger.debug({'event': 'template_cache_cleared'})
+
+    @property
+    def context_projection(self) -> bool:
+        """Whether render data is projected to what templates read.
+
+        Returns:
+            Whether context projection is enabled.
+        """
+        return self._template.get_context_projection()
+
+    @context_projection.setter
+    def context_projection(self, enabled: bool) -> None:
+        """Only convert the parts of the render data a template reads.
+
+        With projection enabled, rendering a registered template works out
+        (once per template, see `analyze`) which data paths it reads and
+        converts only those subtrees, skipping the rest of large input
+        objects. Skipped values are never inspected, so they need not be
+        JSON serializable.
+
+        Templates that read the whole context, call Python helpers registered
+        with `needs_context=True`, use `#each` or `#with` over a
+        subexpression, or use dynamic, recursive or missing partials always
+        receive all of the data, as do all templates in dev mode.
+        `render_template` is never projected.
+
+        Args:
+            enabled: Whether to enable context projection.
+        """
+        self._template.set_context_projection(enabled)
+        logger.debug(
+            {'event': 'context_projection_changed', 'enabled': enabled}
+        )
+
+    def context_projection_stats(self) -> dict[str, int]:
+        """Statistics about context projection.
+
+        Returns:
+            Dictionary with the number of `renders` made with projection
+            enabled, how many of them were `projected`, and `bytes_saved`,
+            the estimated JSON size of the data that was skipped.
+        """
+        return self._template.context_projection_stats()
+
+    def set_global(self, name: str, data: Any) -> None:
+        """Register named global data that every render can read.
+
+        The data is converted once and kept natively, instead of being
+        converted again on every render. Renders see it as a top-level key of
+        their data, so templates read it as `{{name.field}}` or
+        `{{@root.name.field}}`. A key with the same name in the render data
+        takes precedence. Registering a global again replaces it.
+
+        Each render copies only the parts of the globals its template reads,
+        as found by `analyze`. If that analysis is incomplete (e.g. dynamic
+        partials), the template calls a Python helper that receives the
+        context, or dev mode is on, every global is copied whole into the
+        render data, which costs time proportional to the size of the
+        globals on every render.
+
+        Args:
+            name: Name of the global.
+            data: The global data.
+
+        Raises:
+            TypeError: If the data is not JSON serializable.
+        """
+        try:
+            self._template.set_global(name, data)
+            logger.debug({'event': 'global_set', 'name': name})
+        except (TypeError, ValueError) as e:
+            logger.error({'event': 'global_set_error', 'error': str(e)})
+            raise
+
+    def update_global(self, name: str, data: dict[str, Any]) -> None:
+        """Add or replace top-level keys of a global object.
+
+        Only the given keys are converted, which keeps small changes to large
+        globals cheap. A missing global is created.
+
+        Args:
+            name: Name of the global.
+            data: The keys to add or replace.
+
+        Raises:
+            TypeError: If the data is not JSON serializable.
+            ValueError: If the global is not an object.
+        """
+        try:
+            self._template.update_global(name, data)
+            logger.debug({'event': 'global_updated', 'name': name})
+        except (TypeError, ValueError) as e:
+            logger.error({'event': 'global_update_error', 'error': str(e)})
+            raise
+
+    def drop_global(self, name: str) -> bool:
+        """Remove a global.
+
+        Args:
+            name: Name of the global.
+
+        Returns:
+            Whether the global existed.
+        """
+        dropped = self._template.drop_global(name)
+        logger.debug({'event': 'global_dropped', 'name': name})
+        return dropped
+
+    def global_names(self) -> list[str]:
+        """Names of the registered globals.
+
+        Returns:
+            The sorted global names.
+        """
+        return self._template.global_names()
+
+    def set_partial_resolver(
+        self,
+        resolver: Callable[[str], str | None] | None,
+        max_size: int = 256,
+        ttl: float | None = None,
+    ) -> None:
+        """Set a callable that loads partials on demand.
+
+        Before a render, each partial the template references that is not
+        registered is passed to `resolver` by name. The resolver returns the
+        partial source, or `None` if there is no such partial. Resolved
+        partials are compiled once and reused by later renders, until they
+        are evicted or invalidated. Partials registered with
+        `register_partial` always take precedence.
+
+        Partials are found by analyzing the template before it renders, so
+        dynamic partials (`{{> (name)}}`) are not resolved.
+
+        Args:
+            resolver: Callable taking a partial name, or `None` to stop
+                resolving partials.
+            max_size: Maximum number of resolved partials to keep; the least
+                recently used are evicted first.
+            ttl: Seconds after which a resolved partial is resolved again, or
+                `None` to keep it until it is evicted or invalidated.
+
+        Raises:
+            ValueError: If `ttl` is negative.
+        """
+        self._template.set_partial_resolver(resolver, max_size, ttl)
+        logger.debug(
+            {
+                'event': 'partial_resolver_changed',
+                'enabled': resolver is not None,
+                'max_size': max_size,
+                'ttl': ttl,
+            }
+        )
+
+    def invalidate_partials(self, names: Iterable[str] | None = None) -> int:
+        """Forget partials loaded by the partial resolver.
+
+        Invalidated partials are resolved again the next time a template
+        uses them.
+
+        Args:
+            names: The partials to invalidate, or `None` for all of them.
+
+        Returns:
+            The number of resolved partials that were invalidated.
+        """
+        count = self._template.invalidate_partials(
+            None if names is None else list(names)
+        )
+        logger.debug({'event': 'partials_invalidated', 'count': count})
+        return count
+
+    def resolved_partial_stats(self) -> dict[str, int]:
+        """Usage statistics for partials loaded by the partial resolver.
+
+        Returns:
+            A dictionary with the `hits`, `misses` and `evictions` counters,
+            and the current `size` and `capacity` of the cache.
+        """
+        return self._template.resolved_partial_stats()
+
     def set_escape_function(self, escape_fn: str) -> None:
         """Set the escape function used for HTML escaping.
 
@@ -278,32 +683,52 @@ class Template:
 
     def register_templates_directory(
         self, dir_path: str | Path, extension: str = '.hbs'
-    ) -> None:
+    ) -> dict[str, list[str]]:
         """Register all templates in a directory.
 
         Recursively finds all files with the specified extension in the
         directory and registers them as templates. The template name will be the
-        file path relative to the directory, without the extension.
+        file path relative to the directory, without the extension. Hidden
+        files and directories are skipped. Files are read and compiled in
+        parallel.
+
+        Calling this again for the same directory and extension rescans it
+        incrementally, so it can be used to keep a large template tree in
+        sync cheaply: files whose size and modification time are unchanged
+        are not read, files whose content is unchanged are not recompiled, and
+        templates whose file has been deleted are unregistered.
 
         Args:
             dir_path: Path to the directory containing templates
             extension: File extension for templates, defaults to ".hbs"
 
+        Returns:
+            Dictionary with the sorted names of the `added`, `changed` and
+            `removed` templates.
+
         Raises:
             FileNotFoundError: If the directory does not exist
-            ValueError: If there is a syntax error in any template
+            OSError: If a template file cannot be read
+            ValueError: If there is a syntax error in any template, in which
+                case no templates are registered or unregistered
         """
         dir_path_str = str(dir_path)
         try:
-            self._template.register_templates_directory(dir_path_str, extension)
+            changes = self._template.register_templates_directory(
+                dir_path_str, extension
+            )
             logger.debug(
                 {
                     'event': 'templates_directory_registered',
                     'path': dir_path_str,
                     'extension': extension,
+                    'added': len(changes['added']),
+                    'changed': len(changes['changed']),
+                    'removed': len(changes['removed']),
                 }
             )
-        except (FileNotFoundError, ValueError) as e:
+            return changes
+        except (OSError, ValueError) as e:
             logger.error(
                 {
                     'event': 'templates_directory_registration_error',
@@ -314,10 +739,87 @@ class Template:
             )
             raise
 
+    def save_snapshot(self, path: str | Path) -> int:
+        """Save the sources of all registered templates to a snapshot file.
+
+        A snapshot lets a process register a large set of templates and
+        partials at startup with a single file read and a parallel compile,
+        instead of reading and compiling files one at a time. Each entry stores
+        the template name, whether it was registered as a partial, the file
+        it came from (if any) with its size and modification time, its source
+        and a content hash of the source. Partials are compiled as partials
+        again when the snapshot is loaded.
+
+        Args:
+            path: The snapshot file to write
+
+        Returns:
+            The number of templates written.
+
+        Raises:
+            OSError: If a template file or the snapshot cannot be accessed.
+        """
+        path_str = str(path)
+        try:
+            count = self._template.save_snapshot(path_str)
+            logger.debug(
+                {'event': 'snapshot_saved', 'path': path_str, 'count': count}
+            )
+            return count
+        except OSError as e:
+            logger.error(
+                {
+                    'event': 'snapshot_save_error',
+                    'path': path_str,
+                    'error': str(e),
+                }
+            )
+            raise
+
+    def load_snapshot(self, path: str | Path) -> int:
+        """Register all templates stored in a snapshot file.
+
+        Entries that were registered from a file are checked against the
+        file. A file whose size and modification time match those stored in
+        the snapshot is not read. Otherwise it is read, and if its contents no
+        longer match the content hash stored in the snapshot, its current
+        contents are used instead.
+
+        Args:
+            path: The snapshot file to load
+
+        Returns:
+            The number of templates registered.
+
+        Raises:
+            OSError: If the snapshot cannot be read.
+            ValueError: If the snapshot is invalid or corrupt, or a template
+                has a syntax error. Nothing is registered in that case.
+        """
+        path_str = str(path)
+        try:
+            count = self._template.load_snapshot(path_str)
+            logger.debug(
+                {'event': 'snapshot_loaded', 'path': path_str, 'count': count}
+            )
+            return count
+        except (OSError, ValueError) as e:
+            logger.error(
+                {
+                    'event': 'snapshot_load_error',
+                    'path': path_str,
+                    'error': str(e),
+                }
+            )
+            raise
+
     def register_helper(
         self,
         name: str,
         helper_fn: Callable[[list[Any], dict[str, Any], dict[str, Any]], str],
+        needs_context: bool = True,
+        pure: bool = False,
+        cache_size: int = DEFAULT_HELPER_CACHE_SIZE,
     ) -> None:
         """Register a helper function.
 
@@ -332,6 +834,21 @@ class Template:
 
         It should return a string that will be inserted into the template.
 
+        Arguments are passed to the helper as native Python objects. Building
+        the context requires converting the entire render data, so helpers
+        that never read it should be registered with `needs_context=False`;
+        they receive an empty dictionary instead.
+
+        Helpers whose result only depends on their arguments, such as
+        formatters, can be registered with `pure=True`. Their results are
+        cached natively by parameters and hash arguments, so repeated calls
+        with the same arguments are answered without calling into Python.
+        Pure helpers never receive the context. See `helper_cache_stats`.
+
+        When the engine is shared between threads, the helper may be called
+        from several threads at once. On free-threaded Python builds these
+        calls run in parallel, so helpers must be thread-safe.
+
         Examples:
             ```python
             # A helper that formats a date
@@ -349,10 +866,15 @@ class Template:
         Args:
             name: The name to register the helper under
             helper_fn: The helper function
+            needs_context: Whether the helper reads the current context
+            pure: Whether the helper always returns the same result for the
+                same arguments, so that its results can be cached
+            cache_size: Maximum number of results cached for a pure helper
         """
         try:
-            # TODO: Fix this type error.
-            self._template.register_helper(name, create_helper(helper_fn))  # type: ignore[arg-type]
+            self._template.register_helper(
+                name, helper_fn, needs_context, pure, cache_size
+            )
             logger.debug({'event': 'helper_registered', 'name': name})
         except Exception as e:
             logger.error(
@@ -364,6 +886,33 @@ class Template:
             )
             raise
 
+    def stats(self, reset: bool = False) -> dict[str, TemplateStats]:
+        """Render statistics for each registered template rendered so far.
+
+        Counters are kept natively for every render of a registered template,
+        at the cost of two clock reads per render and per Python helper call.
+        Renders of template strings with `render_template` are not counted.
+        Successful renders are not logged, so these counters are the way to
+        observe them.
+
+        Args:
+            reset: Whether to start counting from zero again afterwards.
+
+        Returns:
+            A dictionary mapping template names to their render counters.
+        """
+        return self._template.render_stats(reset)  # type: ignore[return-value]
+
+    def helper_cache_stats(self) -> dict[str, dict[str, int]]:
+        """Usage statistics for the result caches of pure helpers.
+
+        Returns:
+            A dictionary mapping each helper registered with `pure=True` to
+            its `hits`, `misses` and `evictions` counters and the current
+            `size` and `capacity` of its cache.
+        """
+        return self._template.helper_cache_stats()
+
     def has_template(self, name: str) -> bool:
         """Determines whether the template with teh given name exists.
 
@@ -386,12 +935,39 @@ class Template:
         self._template.unregister_template(name)
         logger.debug({'event': 'template_unregistered', 'name': name})
 
+    def analyze(self, name: str) -> TemplateAnalysis:
+        """Statically analyze a registered template without rendering it.
+
+        Finds the data paths, partials and helpers the template references,
+        following `#each`/`#with` scopes, `../`, `@root`, block parameters and
+        registered partials. Useful to check that every helper is registered
+        before the first render, or to see which parts of the data a template
+        actually needs.
+
+        Args:
+            name: Name of the template.
+
+        Returns:
+            The referenced `paths`, `partials` and `helpers`, the partials and
+            helpers that are not registered, and whether the analysis is
+            `complete` (false if the template uses dynamic, recursive or
+            missing partials).
+
+        Raises:
+            ValueError: If the template is not registered.
+        """
+        try:
+            return self._template.analyze(name)  # type: ignore[return-value]
+        except ValueError as e:
+            logger.error({'event': 'template_analyze_error', 'error': str(e)})
+            raise
+
     def render(self, name: str, data: dict[str, Any]) -> str:
         """Render a template with the given data.
 
         Renders a previously registered template using the provided data
-        context. The data is converted to JSON before being passed to the
-        template engine.
+        context. The data is converted directly into native JSON values by the
+        template engine, so it must be JSON serializable.
 
         Args:
             name: The name of the template to render
@@ -401,13 +977,12 @@ class Template:
             str: The rendered template string
 
         Raises:
+            TypeError: If the data is not JSON serializable.
             ValueError: If the template does not exist or there is a rendering
                 error.
         """
         try:
-            result = self._template.render(name, json.dumps(data))
-            logger.debug({'event': 'template_rendered', 'name': name})
-            return result
+            return self._template.render(name, data)
         except ValueError as e:
             logger.error(
                 {
@@ -418,14 +993,223 @@ class Template:
             )
             raise
 
+    def render_many(
+        self,
+        name: str,
+        contexts: Iterable[dict[str, Any]],
+        parallel: bool = False,
+    ) -> list[str]:
+        """Render a template once for each of the given data contexts.
+
+        All contexts are rendered in a single call into the native engine,
+        which is considerably faster than calling `render` in a loop when
+        rendering the same template against many rows of data.
+
+        Args:
+            name: The name of the template to render
+            contexts: The data contexts to render the template with
+            parallel: Whether to spread the renders over native worker
+                threads. Ignored when Python helpers are registered.
+
+        Returns:
+            The rendered template strings, in the same order as `contexts`.
+
+        Raises:
+            TypeError: If any of the contexts is not JSON serializable.
+            ValueError: If the template does not exist or there is a rendering
+                error.
+        """
+        if not isinstance(contexts, list):
+            contexts = list(contexts)
+        try:
+            return self._template.render_many(name, contexts, parallel)
+        except ValueError as e:
+            logger.error(
+                {
+                    'event': 'template_batch_rendering_error',
+                    'name': name,
+                    'error': str(e),
+                }
+            )
+            raise
+
+    def render_to(
+        self,
+        name: str,
+        data: dict[str, Any],
+        writer: TextWriter,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+    ) -> None:
+        """Render a template, streaming the output to a file-like object.
+
+        The output is passed to `writer.write` in chunks while the template is
+        being rendered instead of being built up as one string, which keeps
+        peak memory low for very large outputs.
+
+        Args:
+            name: The name of the template to render
+            data: The data to render the template with
+            writer: Object with a `write(str)` method, such as a text file
+            chunk_size: Minimum size in bytes of each chunk; the last chunk
+                may be smaller
+
+        Raises:
+            TypeError: If the data is not JSON serializable.
+            ValueError: If the template does not exist or there is a rendering
+                error.
+            Exception: Any exception raised by `writer.write`.
+        """
+        try:
+            self._template.render_to(name, data, writer, chunk_size)
+        except ValueError as e:
+            logger.error(
+                {
+                    'event': 'template_rendering_error',
+                    'name': name,
+                    'error': str(e),
+                }
+            )
+            raise
+
+    def render_iter(
+        self,
+        name: str,
+        data: dict[str, Any],
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+    ) -> Generator[str, None, None]:
+        """Render a template, yielding the output in chunks.
+
+        The template is rendered on a background thread that stays at most a
+        few chunks ahead of the consumer. Closing the generator early stops the
+        render.
+
+        Args:
+            name: The name of the template to render
+            data: The data to render the template with
+            chunk_size: Minimum size in bytes of each chunk; the last chunk
+                may be smaller
+
+        Yields:
+            Consecutive chunks of the rendered template.
+
+        Raises:
+            TypeError: If the data is not JSON serializable.
+            ValueError: If the template does not exist or there is a rendering
+                error.
+        """
+        writer = _QueueWriter()
+
+        def produce() -> None:
+            try:
+                self.render_to(name, data, writer, chunk_size)
+                writer.write(None)
+            except _StreamClosedError:
+                pass
+            except Exception as e:
+                with contextlib.suppress(_StreamClosedError):
+                    writer.write(e)
+
+        thread = threading.Thread(
+            target=produce, name=f'handlebarrz-render-{name}', daemon=True
+        )
+        thread.start()
+        try:
+            while (chunk := writer.chunks.get()) is not None:
+                if isinstance(chunk, BaseException):
+                    raise chunk
+                yield chunk
+        finally:
+            writer.closed.set()
+            thread.join()
+
+    async def render_async(self, name: str, data: dict[str, Any]) -> str:
+        """Render a template without blocking the event loop.
+
+        The data is converted on the calling thread. The render itself runs
+        on a pool of native worker threads shared by all template engines,
+        and the coroutine completes once it has finished. Cancelling the
+        coroutine discards the result, but does not interrupt the render.
+
+        Args:
+            name: The name of the template to render
+            data: The data to render the template with
+
+        Returns:
+            str: The rendered template string
+
+        Raises:
+            TypeError: If the data is not JSON serializable.
+            ValueError: If the template does not exist or there is a rendering
+                error.
+        """
+        future: asyncio.Future[str] = asyncio.get_running_loop().create_future()
+        self._template.render_async(name, data, _future_resolver(future))
+        try:
+            return await future
+        except ValueError as e:
+            logger.error(
+                {
+                    'event': 'template_rendering_error',
+                    'name': name,
+                    'error': str(e),
+                }
+            )
+            raise
+
+    async def render_many_async(
+        self,
+        name: str,
+        contexts: Iterable[dict[str, Any]],
+        parallel: bool = False,
+    ) -> list[str]:
+        """Render a template once for each context without blocking the loop.
+
+        Works like `render_many`, but the renders run on the native worker
+        pool used by `render_async`.
+
+        Args:
+            name: The name of the template to render
+            contexts: The data contexts to render the template with
+            parallel: Whether to spread the renders over additional native
+                worker threads. Ignored when Python helpers are registered.
+
+        Returns:
+            The rendered template strings, in the same order as `contexts`.
+
+        Raises:
+            TypeError: If any of the contexts is not JSON serializable.
+            ValueError: If the template does not exist or there is a rendering
+                error.
+        """
+        if not isinstance(contexts, list):
+            contexts = list(contexts)
+        future: asyncio.Future[list[str]] = (
+            asyncio.get_running_loop().create_future()
+        )
+        self._template.render_many_async(
+            name, contexts, _future_resolver(future), parallel
+        )
+        try:
+            return await future
+        except ValueError as e:
+            logger.error(
+                {
+                    'event': 'template_batch_rendering_error',
+                    'name': name,
+                    'error': str(e),
+                }
+            )
+            raise
+
     def render_template(
         self, template_string: str, data: dict[str, Any]
     ) -> str:
         """Render a template string directly without registering it.
 
         Parses and renders the template string in one step. This is useful for
-        one-off template rendering, but for templates that will be rendered
-        multiple times, it's more efficient to register them first.
+        one-off template rendering. Compiled template strings are kept in a
+        bounded LRU cache (see `template_cache_capacity`), so sources that are
+        rendered repeatedly are only parsed once.
 
         Args:
             template_string: The template string to render
@@ -435,15 +1219,12 @@ class Template:
             Rendered template string.
 
         Raises:
+            TypeError: If the data is not JSON serializable.
             ValueError: If there is a syntax error in the template or a
                 rendering error.
         """
         try:
-            result = self._template.render_template(
-                template_string, json.dumps(data)
-            )
-            logger.debug({'event': 'template_string_rendered'})
-            return result
+            return self._template.render_template(template_string, data)
         except ValueError as e:
             logger.error(
                 {'event': 'template_string_rendering_error', 'error': str(e)}
@@ -469,15 +1250,39 @@ class Template:
             )
             raise
 
+    def register_dotprompt_helpers(self) -> None:
+        """Registers native implementations of the dotprompt marker helpers.
+
+        - `history`
+        - `media`
+        - `role`
+        - `section`
+
+        These helpers render entirely in the native engine and emit the markers
+        that `dotpromptz` uses to split rendered prompts into messages and
+        parts.
+        """
+        try:
+            self._template.register_dotprompt_helpers()
+            logger.debug({'event': 'dotprompt_helpers_registered'})
+        except Exception as e:
+            logger.error(
+                {
+                    'event': 'dotprompt_helpers_registration_error',
+                    'error': str(e),
+                }
+            )
+            raise
+
 
 def create_helper(
     fn: Callable[[list[Any], dict[str, Any], dict[str, Any]], str],
-) -> Callable[[str, str, str], str]:
+) -> Callable[[list[Any], dict[str, Any], dict[str, Any]], str]:
     """Create a helper function compatible with the Rust interface.
 
-    This function adapts a Python function with typed parameters to the format
-    expected by the Rust bindings. It handles the serialization and
-    deserialization of JSON data between Rust and Python.
+    The Rust bindings pass helper arguments as native Python objects, so a
+    function with typed parameters is already compatible and is returned as
+    is. This function is kept for backwards compatibility.
 
     Helper functions in Handlebars can be used for various purposes:
 
@@ -496,16 +1301,7 @@ def create_helper(
     Returns:
         Function compatible with the Rust interface.
     """
-
-    def wrapper(params_json: str, hash_json: str, ctx_json: str) -> str:
-        params = json.loads(params_json)
-        hash = json.loads(hash_json)
-        ctx = json.loads(ctx_json)
-
-        result = fn(params, hash, ctx)
-        return result
-
-    return wrapper
+    return fn
 
 
 # Alias Template as Handlebars.  This is done because the JS implementation
@@ -514,9 +1310,14 @@ Handlebars = Template
 
 
 __all__ = [
+    'DEFAULT_CHUNK_SIZE',
+    'DEFAULT_HELPER_CACHE_SIZE',
     'EscapeFunction',
     'Handlebars',
     'Template',
+    'TemplateAnalysis',
+    'TemplateStats',
+    'TextWriter',
     'create_helper',
     'html_escape',
     'no_escape',
@@ -2,12 +2,14 @@
 # SPDX-License-Identifier: Apache-2.0
 
 from collections.abc import Callable
+from typing import Any
 
 def html_escape(text: str) -> str: ...
 def no_escape(text: str) -> str: ...
 
 class HandlebarrzTemplate:
     def __init__(self) -> None: ...
+    def fork(self) -> HandlebarrzTemplate: ...
 
     # Strict mode
     def get_strict_mode(self) -> bool: ...
@@ -17,6 +19,10 @@ class HandlebarrzTemplate:
     def get_dev_mode(self) -> bool: ...
     def set_dev_mode(self, enabled: bool) -> None: ...
 
+    # File reloading
+    def get_reload_interval(self) -> float | None: ...
+    def set_reload_interval(self, interval: float | None) -> None: ...
+
     # Escape function
     def set_escape_fn(self, escape_fn: str) -> None: ...
 
@@ -25,21 +31,84 @@ class HandlebarrzTemplate:
     def register_partial(self, name: str, template_string: str) -> None: ...
     def register_template_file(self, name: str, file_path_str: str) -> None: ...
     def register_templates_directory(
-        self, dir_path_str: str, extension: str
-    ) -> None: ...
+        self, dir_path: str, extension: str = '.hbs'
+    ) -> dict[str, list[str]]: ...
+
+    # Snapshots
+    def save_snapshot(self, path: str) -> int: ...
+    def load_snapshot(self, path: str) -> int: ...
 
     # Helper registration
     def register_helper(
-        self, name: str, helper_fn: Callable[[str], str]
+        self,
+        name: str,
+        helper_fn: Callable[[list[Any], dict[str, Any], dict[str, Any]], str],
+        needs_context: bool = True,
+        pure: bool = False,
+        cache_size: int = 1024,
     ) -> None: ...
+    def helper_cache_stats(self) -> dict[str, dict[str, int]]: ...
+    def render_stats(
+        self, reset: bool = False
+    ) -> dict[str, dict[str, int]]: ...
 
     # Template management
     def has_template(self, name: str) -> bool: ...
     def unregister_template(self, name: str) -> None: ...
+    def analyze(self, name: str) -> dict[str, Any]: ...
 
     # Rendering
-    def render(self, name: str, data_json: str) -> str: ...
-    def render_template(self, template_str: str, data_json: str) -> str: ...
+    def render(self, name: str, data: Any) -> str: ...
+    def render_json(self, name: str, data_json: str) -> str: ...
+    def render_many(
+        self, name: str, contexts: list[Any], parallel: bool = False
+    ) -> list[str]: ...
+    def render_to(
+        self, name: str, data: Any, writer: Any, chunk_size: int = 65536
+    ) -> None: ...
+    def render_async(
+        self,
+        name: str,
+        data: Any,
+        callback: Callable[[str | None, BaseException | None], None],
+    ) -> None: ...
+    def render_many_async(
+        self,
+        name: str,
+        contexts: list[Any],
+        callback: Callable[[list[str] | None, BaseException | None], None],
+        parallel: bool = False,
+    ) -> None: ...
+    def render_template(self, template_str: str, data: Any) -> str: ...
+    def render_template_json(
+        self, template_str: str, data_json: str
+    ) -> str: ...
+
+    # Compiled template cache
+    def get_template_cache_capacity(self) -> int: ...
+    def set_template_cache_capacity(self, capacity: int) -> None: ...
+    def template_cache_stats(self) -> dict[str, int]: ...
+    def clear_template_cache(self) -> None: ...
+    def get_context_projection(self) -> bool: ...
+    def set_context_projection(self, enabled: bool) -> None: ...
+    def context_projection_stats(self) -> dict[str, int]: ...
+
+    # Global data
+    def set_global(self, name: str, data: Any) -> None: ...
+    def update_global(self, name: str, data: dict[str, Any]) -> None: ...
+    def drop_global(self, name: str) -> bool: ...
+    def global_names(self) -> list[str]: ...
+
+    # Partial resolution
+    def set_partial_resolver(
+        self,
+        resolver: Callable[[str], str | None] | None,
+        max_size: int = 256,
+        ttl: float | None = None,
+    ) -> None: ...
+    def invalidate_partials(self, names: list[str] | None = None) -> int: ...
+    def resolved_partial_stats(self) -> dict[str, int]: ...
 
     # Extra helper registration
     def register_extra_helpers(self) -> None: ...
+    def register_dotprompt_helpers(self) -> None: ...
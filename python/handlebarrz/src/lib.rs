@@ -3,14 +3,37 @@
 
 use handlebars::{
     Context, Handlebars, Helper, HelperDef, Output, RenderContext, RenderError, RenderErrorReason,
-    Renderable,
+    Renderable, Template,
 };
-use pyo3::exceptions::{PyFileNotFoundError, PyValueError};
+use pyo3::exceptions::{PyFileNotFoundError, PyOSError, PyTypeError, PyValueError};
 use pyo3::prelude::*;
+use pyo3::types::{PyBool, PyDict, PyFloat, PyInt, PyList, PyString, PyTuple};
 use pyo3::wrap_pyfunction;
-use serde_json::Value;
-use std::collections::HashMap;
-use std::path::Path;
+use serde_json::{Map, Number, Value};
+use std::borrow::Cow;
+use std::collections::hash_map::DefaultHasher;
+use std::collections::{BTreeMap, HashMap, HashSet};
+use std::hash::{Hash, Hasher};
+use std::io;
+use std::panic::{catch_unwind, AssertUnwindSafe};
+use std::path::{Path, PathBuf};
+use std::sync::atomic::{AtomicU64, Ordering};
+use std::sync::{
+    mpsc, Arc, Mutex, MutexGuard, OnceLock, PoisonError, RwLock, RwLockReadGuard, RwLockWriteGuard,
+};
+use std::time::{Duration, Instant, SystemTime, UNIX_EPOCH};
+
+use analysis::Projection;
+use lru::LruCache;
+use registry::Registry;
+use snapshot::{content_hash, SnapshotEntry, SnapshotFile};
+use stats::{RenderStats, TemplateCounters};
+
+mod analysis;
+mod lru;
+mod registry;
+mod snapshot;
+mod stats;
 
 /// Python bindings for the handlebars-rust library.
 ///
@@ -21,7 +44,11 @@ use std::path::Path;
 /// - HTML escaping utilities.
 /// - Strict mode and development mode.
 /// - Template and helper function registration.
-#[pymodule]
+///
+/// The module is safe to use without the GIL on free-threaded CPython builds:
+/// all engine state is guarded by Rust locks (see `HandlebarrzTemplate`), and
+/// native rendering never touches Python objects.
+#[pymodule(gil_used = false)]
 fn _native(py: Python<'_>, m: &Bound<'_, PyModule>) -> PyResult<()> {
     m.add_class::<HandlebarrzTemplate>()?;
     m.add_function(wrap_pyfunction!(html_escape, py)?)?;
@@ -74,9 +101,498 @@ fn no_escape(text: &str) -> String {
     handlebars::no_escape(text)
 }
 
+/// Maximum nesting depth accepted when converting Python data to JSON values.
+///
+/// Matches the recursion limit of `serde_json::from_str` so that data accepted
+/// by the JSON string path is also accepted by the direct conversion path, and
+/// so that self-referencing containers fail with an error instead of
+/// overflowing the stack.
+const MAX_DATA_DEPTH: usize = 128;
+
+/// Converts a Python object directly into a `serde_json::Value`.
+///
+/// This avoids the `json.dumps` / `serde_json::from_str` round trip when
+/// passing render data from Python to Rust. The supported types and the
+/// conversions applied mirror those of `json.dumps`:
+///
+/// | Python                  | JSON                   |
+/// |-------------------------|------------------------|
+/// | `None`                  | `null`                 |
+/// | `bool`                  | `true`/`false`         |
+/// | `int`                   | number (float if wider |
+/// |                         | than 64 bits)          |
+/// | `float`                 | number                 |
+/// | `str`                   | string                 |
+/// | `list`, `tuple`         | array                  |
+/// | `dict`                  | object                 |
+///
+/// # Arguments
+///
+/// * `obj` - The Python object to convert.
+///
+/// # Returns
+///
+/// The equivalent JSON value.
+///
+/// # Raises
+///
+/// `PyTypeError` if the object (or a nested value or key) is not JSON
+/// serializable.
+/// `PyValueError` if a number cannot be represented in JSON or the data is
+/// nested too deeply.
+///
+/// Like `json.dumps`, this reads the data without locking it, so other threads
+/// must not modify it while it is being converted. This matters on
+/// free-threaded builds, where no GIL serializes the conversion with them.
+fn py_to_json(obj: &Bound<'_, PyAny>) -> PyResult<Value> {
+    py_to_json_at_depth(obj, 0)
+}
+
+fn py_to_json_at_depth(obj: &Bound<'_, PyAny>, depth: usize) -> PyResult<Value> {
+    if depth > MAX_DATA_DEPTH {
+        return Err(PyValueError::new_err(
+            "data is nested too deeply (possible circular reference)",
+        ));
+    }
+
+    if obj.is_none() {
+        return Ok(Value::Null);
+    }
+    if let Ok(s) = obj.downcast::<PyString>() {
+        return Ok(Value::String(s.to_str()?.to_owned()));
+    }
+    // NOTE: `bool` is a subclass of `int`, so it must be checked first.
+    if let Ok(b) = obj.downcast::<PyBool>() {
+        return Ok(Value::Bool(b.is_true()));
+    }
+    if obj.is_instance_of::<PyInt>() {
+        if let Ok(i) = obj.extract::<i64>() {
+            return Ok(Value::from(i));
+        }
+        if let Ok(u) = obj.extract::<u64>() {
+            return Ok(Value::from(u));
+        }
+        // Like integers parsed from JSON text, integers beyond 64 bits become
+        // floats, losing precision.
+        if let Some(n) = obj.extract::<f64>().ok().and_then(Number::from_f64) {
+            return Ok(Value::Number(n));
+        }
+        return Err(PyValueError::new_err(format!(
+            "integer out of range for JSON: {}",
+            obj.str()?
+        )));
+    }
+    if let Ok(f) = obj.downcast::<PyFloat>() {
+        return Number::from_f64(f.value())
+            .map(Value::Number)
+            .ok_or_else(|| {
+                PyValueError::new_err("Out of range float values are not JSON compliant")
+            });
+    }
+    if let Ok(dict) = obj.downcast::<PyDict>() {
+        let mut map = Map::new();
+        for (key, value) in dict.iter() {
+            map.insert(
+                py_key_to_string(&key)?,
+                py_to_json_at_depth(&value, depth + 1)?,
+            );
+        }
+        return Ok(Value::Object(map));
+    }
+    if let Ok(list) = obj.downcast::<PyList>() {
+        let mut items = Vec::with_capacity(list.len());
+        for item in list.iter() {
+            items.push(py_to_json_at_depth(&item, depth + 1)?);
+        }
+        return Ok(Value::Array(items));
+    }
+    if let Ok(tuple) = obj.downcast::<PyTuple>() {
+        let mut items = Vec::with_capacity(tuple.len());
+        for item in tuple.iter() {
+            items.push(py_to_json_at_depth(&item, depth + 1)?);
+        }
+        return Ok(Value::Array(items));
+    }
+
+    Err(PyTypeError::new_err(format!(
+        "Object of type {} is not JSON serializable",
+        obj.get_type().name()?
+    )))
+}
+
+/// Converts a Python dictionary key into a JSON object key.
+///
+/// Like `json.dumps`, string keys are used as is while `None`, `bool`, `int`
+/// and `float` keys are converted to their JSON representation.
+fn py_key_to_string(key: &Bound<'_, PyAny>) -> PyResult<String> {
+    if let Ok(s) = key.downcast::<PyString>() {
+        return Ok(s.to_str()?.to_owned());
+    }
+    if key.is_none() {
+        return Ok("null".to_string());
+    }
+    if let Ok(b) = key.downcast::<PyBool>() {
+        return Ok(if b.is_true() { "true" } else { "false" }.to_string());
+    }
+    if key.is_instance_of::<PyInt>() || key.is_instance_of::<PyFloat>() {
+        return Ok(key.str()?.to_str()?.to_owned());
+    }
+
+    Err(PyTypeError::new_err(format!(
+        "keys must be str, int, float, bool or None, not {}",
+        key.get_type().name()?
+    )))
+}
+
+/// Converts the parts of a Python object selected by a projection into a
+/// `serde_json::Value`.
+///
+/// Object keys and array elements that the projection does not cover are
+/// skipped without being converted, and the estimated size of their JSON
+/// encoding is added to `skipped_bytes`. Skipped array elements become
+/// `null` so that indices and lengths are preserved.
+///
+/// # Arguments
+///
+/// * `obj` - The Python object to convert.
+/// * `projection` - The parts of the object to convert.
+/// * `skipped_bytes` - Incremented by the estimated size of skipped data.
+///
+/// # Returns
+///
+/// The projected JSON value.
+///
+/// # Raises
+///
+/// Same as `py_to_json`, but only for the parts of the object that are
+/// converted.
+fn py_to_json_projected(
+    obj: &Bound<'_, PyAny>,
+    projection: &Projection,
+    skipped_bytes: &mut u64,
+) -> PyResult<Value> {
+    py_to_json_projected_at_depth(obj, projection, 0, skipped_bytes)
+}
+
+fn py_to_json_projected_at_depth(
+    obj: &Bound<'_, PyAny>,
+    projection: &Projection,
+    depth: usize,
+    skipped_bytes: &mut u64,
+) -> PyResult<Value> {
+    if projection.all {
+        return py_to_json_at_depth(obj, depth);
+    }
+    if depth > MAX_DATA_DEPTH {
+        return Err(PyValueError::new_err(
+            "data is nested too deeply (possible circular reference)",
+        ));
+    }
+
+    if let Ok(dict) = obj.downcast::<PyDict>() {
+        let skipped_before = *skipped_bytes;
+        let mut map = Map::new();
+        for (key, value) in dict.iter() {
+            let key = match key.downcast::<PyString>() {
+                Ok(s) => Cow::Borrowed(s.to_str()?),
+                Err(_) => Cow::Owned(py_key_to_string(&key)?),
+            };
+            match projection.child(&key) {
+                Some(child) => {
+                    let value =
+                        py_to_json_projected_at_depth(&value, child, depth + 1, skipped_bytes)?;
+                    map.insert(key.into_owned(), value);
+                }
+                None => *skipped_bytes += (key.len() + 4 + json_size(&value, depth + 1)) as u64,
+            }
+        }
+        // Projecting away every key would change the truthiness of the value.
+        if map.is_empty() && !dict.is_empty() && projection.keep_nonempty {
+            *skipped_bytes = skipped_before;
+            return py_to_json_at_depth(obj, depth);
+        }
+        return Ok(Value::Object(map));
+    }
+    if let Ok(list) = obj.downcast::<PyList>() {
+        return py_items_to_json_projected(
+            list.iter(),
+            list.len(),
+            projection,
+            depth,
+            skipped_bytes,
+        );
+    }
+    if let Ok(tuple) = obj.downcast::<PyTuple>() {
+        return py_items_to_json_projected(
+            tuple.iter(),
+            tuple.len(),
+            projection,
+            depth,
+            skipped_bytes,
+        );
+    }
+
+    py_to_json_at_depth(obj, depth)
+}
+
+fn py_items_to_json_projected<'py>(
+    items: impl Iterator<Item = Bound<'py, PyAny>>,
+    len: usize,
+    projection: &Projection,
+    depth: usize,
+    skipped_bytes: &mut u64,
+) -> PyResult<Value> {
+    let mut values = Vec::with_capacity(len);
+    for (index, item) in items.enumerate() {
+        match projection.element(index) {
+            Some(child) => values.push(py_to_json_projected_at_depth(
+                &item,
+                child,
+                depth + 1,
+                skipped_bytes,
+            )?),
+            None => {
+                *skipped_bytes += json_size(&item, depth + 1).saturating_sub(4) as u64;
+                values.push(Value::Null);
+            }
+        }
+    }
+    Ok(Value::Array(values))
+}
+
+/// Estimates the size in bytes of the compact JSON encoding of a Python
+/// object without encoding it.
+///
+/// String escapes are not accounted for, and values that cannot be encoded
+/// count as empty.
+fn json_size(obj: &Bound<'_, PyAny>, depth: usize) -> usize {
+    if depth > MAX_DATA_DEPTH {
+        return 0;
+    }
+    if obj.is_none() {
+        return 4;
+    }
+    if let Ok(s) = obj.downcast::<PyString>() {
+        return s.to_str().map_or(0, str::len) + 2;
+    }
+    if let Ok(b) = obj.downcast::<PyBool>() {
+        return if b.is_true() { 4 } else { 5 };
+    }
+    if obj.is_instance_of::<PyInt>() {
+        return match obj.extract::<i64>() {
+            Ok(i) => {
+                let digits = i
+                    .unsigned_abs()
+                    .checked_ilog10()
+                    .map_or(1, |d| d as usize + 1);
+                digits + usize::from(i < 0)
+            }
+            Err(_) => obj.str().and_then(|s| s.len()).unwrap_or(0),
+        };
+    }
+    if let Ok(f) = obj.downcast::<PyFloat>() {
+        return Number::from_f64(f.value()).map_or(4, |n| n.to_string().len());
+    }
+    if let Ok(dict) = obj.downcast::<PyDict>() {
+        let entries = dict
+            .iter()
+            .map(|(key, value)| {
+                let key_len = match key.downcast::<PyString>() {
+                    Ok(s) => s.to_str().map_or(0, str::len),
+                    Err(_) => json_size(&key, depth + 1),
+                };
+                key_len + 3 + json_size(&value, depth + 1)
+            })
+            .sum::<usize>();
+        return 2 + entries + dict.len().saturating_sub(1);
+    }
+    if let Ok(list) = obj.downcast::<PyList>() {
+        let items = list
+            .iter()
+            .map(|item| json_size(&item, depth + 1))
+            .sum::<usize>();
+        return 2 + items + list.len().saturating_sub(1);
+    }
+    if let Ok(tuple) = obj.downcast::<PyTuple>() {
+        let items = tuple
+            .iter()
+            .map(|item| json_size(&item, depth + 1))
+            .sum::<usize>();
+        return 2 + items + tuple.len().saturating_sub(1);
+    }
+    0
+}
+
+/// Converts a JSON value into the equivalent Python object.
+///
+/// This is the inverse of `py_to_json` and is used to hand helper arguments
+/// to Python helpers without encoding them as JSON strings.
+///
+/// # Arguments
+///
+/// * `py` - The Python interpreter token.
+/// * `value` - The JSON value to convert.
+///
+/// # Returns
+///
+/// The equivalent Python object.
+fn json_to_py(py: Python<'_>, value: &Value) -> PyResult<PyObject> {
+    let obj = match value {
+        Value::Null => py.None(),
+        Value::Bool(b) => PyBool::new(py, *b).to_owned().into_any().unbind(),
+        Value::Number(n) => {
+            if let Some(i) = n.as_i64() {
+                i.into_pyobject(py)?.into_any().unbind()
+            } else if let Some(u) = n.as_u64() {
+                u.into_pyobject(py)?.into_any().unbind()
+            } else {
+                PyFloat::new(py, n.as_f64().unwrap_or(f64::NAN))
+                    .into_any()
+                    .unbind()
+            }
+        }
+        Value::String(s) => PyString::new(py, s).into_any().unbind(),
+        Value::Array(items) => {
+            let list = PyList::empty(py);
+            for item in items {
+                list.append(json_to_py(py, item)?)?;
+            }
+            list.into_any().unbind()
+        }
+        Value::Object(map) => {
+            let dict = PyDict::new(py);
+            for (key, item) in map {
+                dict.set_item(key.as_str(), json_to_py(py, item)?)?;
+            }
+            dict.into_any().unbind()
+        }
+    };
+    Ok(obj)
+}
+
+/// Creates a render error with a custom description.
+fn render_error(desc: String) -> RenderError {
+    RenderError::from(RenderErrorReason::Other(desc))
+}
+
 /// Callable helper.
+///
+/// Templates are rendered with the GIL released, so the helper acquires it
+/// only for the duration of the call into Python. The helper is called with
+/// the positional parameters as a list, the hash arguments as a dict and the
+/// current context. Converting the context can be expensive for large render
+/// data, so it is only done for helpers registered with `needs_context`;
+/// other helpers receive an empty dict.
+///
+/// Renders run concurrently, so the same helper may be called from several
+/// threads at once. With the GIL this only interleaves calls; on
+/// free-threaded builds the calls run in parallel.
+///
+/// Results of pure helpers are cached by their serialized arguments, so
+/// repeated calls are answered without acquiring the GIL.
 struct PyHelperDef {
     func: PyObject,
+    needs_context: bool,
+    cache: Option<HelperCache>,
+}
+
+/// Default number of results kept for each pure Python helper.
+const DEFAULT_HELPER_CACHE_CAPACITY: usize = 1024;
+
+/// Results of a pure Python helper, by serialized arguments.
+type HelperCache = Arc<Mutex<LruCache<String, String>>>;
+
+/// Locks the result cache of a pure Python helper.
+fn lock_helper_cache(cache: &HelperCache) -> MutexGuard<'_, LruCache<String, String>> {
+    cache.lock().unwrap_or_else(PoisonError::into_inner)
+}
+
+/// Serializes the parameters and hash arguments of a helper call into a
+/// cache key. Hash arguments are ordered by name.
+fn helper_cache_key(h: &Helper<'_>) -> Option<String> {
+    let params: Vec<&Value> = h.params().iter().map(|param| param.value()).collect();
+    let hash: BTreeMap<&str, &Value> = h
+        .hash()
+        .iter()
+        .map(|(key, value)| (*key, value.value()))
+        .collect();
+    serde_json::to_string(&(params, hash)).ok()
+}
+
+/// What the engine knows about a registered Python helper.
+#[derive(Clone)]
+struct PyHelperInfo {
+    /// Whether the helper reads the render context.
+    needs_context: bool,
+    /// The result cache of a pure helper.
+    cache: Option<HelperCache>,
+}
+
+impl PyHelperDef {
+    /// Builds the `(params, hash, context)` arguments for the Python helper.
+    fn build_args<'py>(
+        &self,
+        py: Python<'py>,
+        h: &Helper<'_>,
+        ctx: &Context,
+    ) -> PyResult<(Bound<'py, PyList>, Bound<'py, PyDict>, PyObject)> {
+        let params = PyList::empty(py);
+        for param in h.params() {
+            params.append(json_to_py(py, param.value())?)?;
+        }
+
+        let hash = PyDict::new(py);
+        for (key, value) in h.hash() {
+            hash.set_item(*key, json_to_py(py, value.value())?)?;
+        }
+
+        let context = if self.needs_context {
+            json_to_py(py, ctx.data())?
+        } else {
+            PyDict::new(py).into_any().unbind()
+        };
+
+        Ok((params, hash, context))
+    }
+
+    /// Writes the helper's result, from the cache of a pure helper if
+    /// possible.
+    fn call_cached(
+        &self,
+        h: &Helper<'_>,
+        ctx: &Context,
+        out: &mut dyn Output,
+    ) -> Result<(), RenderError> {
+        let key = self.cache.as_ref().and_then(|_| helper_cache_key(h));
+        if let (Some(cache), Some(key)) = (&self.cache, &key) {
+            let cached = lock_helper_cache(cache).get(key).cloned();
+            if let Some(result) = cached {
+                out.write(&result)?;
+                return Ok(());
+            }
+        }
+
+        let result_str = Python::with_gil(|py| {
+            let args = self
+                .build_args(py, h, ctx)
+                .map_err(|e| render_error(format!("Failed to convert helper arguments: {}", e)))?;
+
+            let result = self
+                .func
+                .call1(py, args)
+                .map_err(|e| render_error(format!("Helper execution failed: {}", e)))?;
+
+            result
+                .extract::<String>(py)
+                .map_err(|e| render_error(format!("Failed to extract result: {}", e)))
+        })?;
+
+        out.write(&result_str)?;
+        if let (Some(cache), Some(key)) = (&self.cache, key) {
+            lock_helper_cache(cache).put(key, result_str);
+        }
+        Ok(())
+    }
 }
 
 impl HelperDef for PyHelperDef {
@@ -88,64 +604,400 @@ impl HelperDef for PyHelperDef {
         _rc: &mut RenderContext<'reg, 'rc>,
         out: &mut dyn Output,
     ) -> Result<(), RenderError> {
-        Python::with_gil(|py| {
-            // Extract params.
-            let params: Vec<&Value> = h.params().iter().map(|p| p.value()).collect();
-            let params_json = match serde_json::to_string(&params) {
-                Ok(json) => json,
-                Err(e) => {
-                    let desc = format!("Failed to serialize params: {}", e);
-                    return Err(RenderError::from(RenderErrorReason::Other(desc.into())));
-                }
-            };
+        let start = Instant::now();
+        let result = self.call_cached(h, ctx, out);
+        stats::record_python_helper_call(start.elapsed());
+        result
+    }
+}
 
-            // Get hash.
-            let hash = h.hash();
-            let mut hash_map = HashMap::new();
-            for (k, v) in hash.iter() {
-                hash_map.insert(k.to_string(), v.value().clone());
-            }
-            let hash_json = match serde_json::to_string(&hash_map) {
-                Ok(json) => json,
-                Err(e) => {
-                    let desc = format!("Failed to serialize hash: {}", e);
-                    return Err(RenderError::from(RenderErrorReason::Other(desc.into())));
-                }
-            };
+/// Default number of compiled template strings kept by `render_template`.
+const DEFAULT_TEMPLATE_CACHE_CAPACITY: usize = 256;
 
-            // Convert context to JSON.
-            let ctx_json = match serde_json::to_string(ctx.data()) {
-                Ok(json) => json,
-                Err(e) => {
-                    let desc = format!("Failed to serialize context: {}", e);
-                    return Err(RenderError::from(RenderErrorReason::Other(desc.into())));
-                }
+/// A template string compiled by `render_template`.
+///
+/// The source is kept alongside the compiled template so that a hash collision
+/// in the cache can never render the wrong template.
+struct CompiledTemplate {
+    source: String,
+    template: Template,
+    /// The analysis facts of the template, with the `EngineState::generation`
+    /// they were computed at. Filled in by `source_facts`.
+    facts: Mutex<Option<(u64, Arc<TemplateFacts>)>>,
+}
+
+/// Computes the cache key for a template source.
+fn source_hash(source: &str) -> u64 {
+    let mut hasher = DefaultHasher::new();
+    source.hash(&mut hasher);
+    hasher.finish()
+}
+
+/// An `Output` that collects rendered text into a `String`.
+#[derive(Default)]
+struct StringWriter {
+    buf: String,
+}
+
+impl Output for StringWriter {
+    fn write(&mut self, seg: &str) -> Result<(), std::io::Error> {
+        self.buf.push_str(seg);
+        Ok(())
+    }
+}
+
+/// Applies `f` to every item, splitting the items across scoped worker
+/// threads, one per available core. Results keep the order of `items`.
+fn map_parallel<T, R, F>(items: &[T], f: F) -> Result<Vec<R>, String>
+where
+    T: Sync,
+    R: Send,
+    F: Fn(&T) -> Result<R, String> + Sync,
+{
+    let workers = std::thread::available_parallelism()
+        .map(|n| n.get())
+        .unwrap_or(1)
+        .min(items.len());
+    if workers < 2 {
+        return items.iter().map(&f).collect();
+    }
+
+    let f = &f;
+    let chunk_size = items.len().div_ceil(workers);
+    std::thread::scope(|scope| {
+        let handles: Vec<_> = items
+            .chunks(chunk_size)
+            .map(|chunk| scope.spawn(move || chunk.iter().map(f).collect::<Result<Vec<_>, _>>()))
+            .collect();
+
+        let mut results = Vec::with_capacity(items.len());
+        for handle in handles {
+            let mapped = handle
+                .join()
+                .map_err(|_| "worker thread panicked".to_string())??;
+            results.extend(mapped);
+        }
+        Ok(results)
+    })
+}
+
+/// Compiles named template sources on worker threads.
+///
+/// # Arguments
+///
+/// * `sources` - The name, source and whether it is a partial of every
+///   template.
+///
+/// # Returns
+///
+/// The compiled templates, in the order of `sources`.
+fn compile_templates(sources: &[(&str, &str, bool)]) -> Result<Vec<Template>, String> {
+    map_parallel(sources, |&(name, source, partial)| {
+        if partial {
+            return registry::compile(name, source, true).map_err(|e| format!("{}: {}", name, e));
+        }
+        let mut template = Template::compile(source).map_err(|e| format!("{}: {}", name, e))?;
+        template.name = Some(name.to_string());
+        Ok(template)
+    })
+}
+
+/// Where a registered template or partial came from, kept so the registry
+/// can be written to a snapshot.
+#[derive(Clone)]
+enum TemplateSource {
+    Text(Arc<str>),
+    /// A partial registered from source text, which is compiled with the
+    /// partial options.
+    Partial(Arc<str>),
+    File(PathBuf),
+}
+
+/// Size, modification time and content hash of a template file registered
+/// by `register_templates_directory`.
+#[derive(Clone, Copy, PartialEq, Eq)]
+struct FileFingerprint {
+    len: u64,
+    modified: Option<SystemTime>,
+    hash: u64,
+}
+
+impl FileFingerprint {
+    /// The fingerprint of a file as stored in a snapshot.
+    fn from_snapshot(file: &SnapshotFile<'_>, hash: u64) -> Self {
+        FileFingerprint {
+            len: file.len,
+            modified: file
+                .modified
+                .map(|nanos| UNIX_EPOCH + Duration::from_nanos(nanos)),
+            hash,
+        }
+    }
+
+    /// The modification time in nanoseconds since the Unix epoch, as stored
+    /// in a snapshot.
+    fn modified_nanos(&self) -> Option<u64> {
+        let since_epoch = self.modified?.duration_since(UNIX_EPOCH).ok()?;
+        u64::try_from(since_epoch.as_nanos()).ok()
+    }
+}
+
+/// Reads a file along with its fingerprint.
+///
+/// The metadata is read before the contents, so that a change made while
+/// the file is read is picked up by the next check.
+fn read_fingerprinted(path: &Path) -> io::Result<(FileFingerprint, String)> {
+    let metadata = std::fs::metadata(path)?;
+    let source = std::fs::read_to_string(path)?;
+    let fingerprint = FileFingerprint {
+        len: metadata.len(),
+        modified: metadata.modified().ok(),
+        hash: content_hash(&source),
+    };
+    Ok((fingerprint, source))
+}
+
+/// Reads a file unless its size and modification time match `known`.
+///
+/// # Returns
+///
+/// The new fingerprint and contents of the file, or `None` if it is
+/// unchanged.
+fn read_if_changed(
+    path: &Path,
+    known: FileFingerprint,
+) -> io::Result<Option<(FileFingerprint, String)>> {
+    let metadata = std::fs::metadata(path)?;
+    let modified = metadata.modified().ok();
+    if modified.is_some() && known.len == metadata.len() && known.modified == modified {
+        return Ok(None);
+    }
+    read_fingerprinted(path).map(Some)
+}
+
+/// Template files registered from one directory, by template name.
+type DirectoryState = HashMap<String, (PathBuf, FileFingerprint)>;
+
+/// The result of comparing a templates directory with its registered state.
+#[derive(Default)]
+struct DirectoryScan {
+    /// Fingerprints of all template files now in the directory.
+    files: DirectoryState,
+    /// Added or changed templates, with their compiled form unless they are
+    /// to be loaded by the registry itself.
+    updated: Vec<(String, PathBuf, Option<Template>)>,
+    added: Vec<String>,
+    changed: Vec<String>,
+    removed: Vec<String>,
+}
+
+/// Recursively lists the files below `dir` whose names end with `extension`.
+///
+/// Hidden files and directories are skipped, and symbolic links to
+/// directories are not followed.
+///
+/// # Returns
+///
+/// `(name, path)` pairs sorted by name, where the name is the path relative
+/// to `dir` without the extension and with `/` as the separator.
+fn find_template_files(dir: &Path, extension: &str) -> io::Result<Vec<(String, PathBuf)>> {
+    let mut files = Vec::new();
+    let mut pending = vec![dir.to_path_buf()];
+    while let Some(current) = pending.pop() {
+        for entry in std::fs::read_dir(&current)? {
+            let entry = entry?;
+            let file_name = entry.file_name();
+            let Some(file_name) = file_name.to_str() else {
+                continue;
             };
+            if file_name.starts_with('.') {
+                continue;
+            }
 
-            // Call Python function.
-            let result = self.func.call1(py, (params_json, hash_json, ctx_json));
-
-            match result {
-                Ok(result) => {
-                    let result_str = match result.extract::<String>(py) {
-                        Ok(s) => s,
-                        Err(e) => {
-                            let desc = format!("Failed to extract result: {}", e);
-                            return Err(RenderError::from(RenderErrorReason::Other(desc.into())));
-                        }
-                    };
-                    out.write(&result_str)?;
-                    Ok(())
-                }
-                Err(e) => {
-                    let desc = format!("Helper execution failed: {}", e);
-                    Err(RenderError::from(RenderErrorReason::Other(desc.into())))
-                }
+            let path = entry.path();
+            if entry.file_type()?.is_dir() {
+                pending.push(path);
+            } else if file_name.ends_with(extension) && path.is_file() {
+                let relative = path.strip_prefix(dir).unwrap_or(&path);
+                let name = relative
+                    .components()
+                    .map(|c| c.as_os_str().to_string_lossy())
+                    .collect::<Vec<_>>()
+                    .join("/");
+                files.push((name[..name.len() - extension.len()].to_string(), path));
             }
+        }
+    }
+    files.sort();
+    Ok(files)
+}
+
+/// Default size in bytes of the chunks handed to Python writers by
+/// `render_to`.
+const DEFAULT_CHUNK_SIZE: usize = 64 * 1024;
+
+/// A `std::io::Write` adapter that forwards rendered output to the `write`
+/// method of a Python file-like object in chunks of at least `chunk_size`
+/// bytes.
+///
+/// Handlebars writes whole `&str` segments, so the buffer always ends on a
+/// character boundary when a chunk is handed over. The GIL is only held while
+/// the Python `write` method runs. If it raises, the exception is kept so it
+/// can be re-raised unchanged once rendering stops.
+struct PyChunkWriter {
+    writer: PyObject,
+    buf: Vec<u8>,
+    chunk_size: usize,
+    written: usize,
+    error: Option<PyErr>,
+}
+
+impl PyChunkWriter {
+    fn new(writer: PyObject, chunk_size: usize) -> Self {
+        let chunk_size = chunk_size.max(1);
+        PyChunkWriter {
+            writer,
+            buf: Vec::with_capacity(chunk_size),
+            chunk_size,
+            written: 0,
+            error: None,
+        }
+    }
+
+    /// Passes the buffered output to the Python writer.
+    fn write_chunk(&mut self) -> io::Result<()> {
+        if self.buf.is_empty() {
+            return Ok(());
+        }
+        let chunk = std::str::from_utf8(&self.buf)
+            .map_err(|e| io::Error::new(io::ErrorKind::InvalidData, e))?;
+        let result =
+            Python::with_gil(|py| self.writer.call_method1(py, "write", (chunk,)).map(|_| ()));
+        self.buf.clear();
+        result.map_err(|e| {
+            let err = io::Error::other(e.to_string());
+            self.error = Some(e);
+            err
         })
     }
 }
 
+impl io::Write for PyChunkWriter {
+    fn write(&mut self, bytes: &[u8]) -> io::Result<usize> {
+        self.buf.extend_from_slice(bytes);
+        self.written += bytes.len();
+        if self.buf.len() >= self.chunk_size {
+            self.write_chunk()?;
+        }
+        Ok(bytes.len())
+    }
+
+    fn flush(&mut self) -> io::Result<()> {
+        self.write_chunk()
+    }
+}
+
+/// Renders a registered template once per data value, optionally splitting
+/// the values across worker threads. Each render is recorded in `counters`.
+fn render_each(
+    registry: &Registry,
+    name: &str,
+    data: &[Value],
+    parallel: bool,
+    counters: &TemplateCounters,
+) -> Result<Vec<String>, String> {
+    let render_one = |d: &Value| {
+        counters
+            .measure(|| registry.render(name, d), String::len)
+            .map_err(|e| e.to_string())
+    };
+    if parallel {
+        map_parallel(data, render_one)
+    } else {
+        data.iter().map(render_one).collect()
+    }
+}
+
+/// A unit of work for the render worker pool.
+type Job = Box<dyn FnOnce() + Send + 'static>;
+
+/// A fixed-size pool of native threads that run `render_async` jobs.
+///
+/// Workers share one job queue and live for the rest of the process.
+struct WorkerPool {
+    sender: mpsc::Sender<Job>,
+}
+
+impl WorkerPool {
+    fn new(size: usize) -> io::Result<Self> {
+        let (sender, receiver) = mpsc::channel::<Job>();
+        let receiver = Arc::new(Mutex::new(receiver));
+        for i in 0..size {
+            let receiver = Arc::clone(&receiver);
+            std::thread::Builder::new()
+                .name(format!("handlebarrz-render-{}", i))
+                .spawn(move || loop {
+                    let job = match receiver
+                        .lock()
+                        .unwrap_or_else(PoisonError::into_inner)
+                        .recv()
+                    {
+                        Ok(job) => job,
+                        Err(_) => break,
+                    };
+                    job();
+                })?;
+        }
+        Ok(WorkerPool { sender })
+    }
+
+    fn submit(&self, job: Job) -> PyResult<()> {
+        self.sender
+            .send(job)
+            .map_err(|_| PyValueError::new_err("render worker pool has shut down"))
+    }
+}
+
+static RENDER_POOL: OnceLock<WorkerPool> = OnceLock::new();
+
+/// Returns the render worker pool, starting one worker per available core
+/// on first use.
+fn render_pool() -> PyResult<&'static WorkerPool> {
+    if let Some(pool) = RENDER_POOL.get() {
+        return Ok(pool);
+    }
+    let workers = std::thread::available_parallelism()
+        .map(|n| n.get())
+        .unwrap_or(1);
+    let pool = WorkerPool::new(workers)?;
+    Ok(RENDER_POOL.get_or_init(|| pool))
+}
+
+/// Runs a render job on the worker pool and passes its outcome to
+/// `callback` as `callback(result, None)` or `callback(None, error)`.
+///
+/// Exceptions raised by the callback cannot propagate anywhere, so they are
+/// reported through `sys.unraisablehook`.
+fn submit_render<T, F>(callback: PyObject, render: F) -> PyResult<()>
+where
+    T: for<'py> IntoPyObject<'py>,
+    F: FnOnce() -> Result<T, String> + Send + 'static,
+{
+    render_pool()?.submit(Box::new(move || {
+        let result = catch_unwind(AssertUnwindSafe(render))
+            .unwrap_or_else(|_| Err("render worker panicked".to_string()));
+        Python::with_gil(|py| {
+            let outcome = match result {
+                Ok(value) => callback.call1(py, (value, py.None())),
+                Err(e) => callback.call1(py, (py.None(), PyValueError::new_err(e).into_value(py))),
+            };
+            if let Err(err) = outcome {
+                err.write_unraisable(py, Some(callback.bind(py)));
+            }
+        });
+    }))
+}
+
 /// A Handlebars template engine instance.
 ///
 /// This class provides methods for:
@@ -172,10 +1024,410 @@ impl HelperDef for PyHelperDef {
 /// result = engine.render('my_template', data)
 /// print(result)              # Output: <p>John</p>
 /// ```
-#[pyclass]
+///
+/// # Thread safety
+///
+/// An engine can be shared by any number of threads. Renders take a
+/// snapshot of the registry and run without holding any lock, so they never
+/// wait for each other. Registration and configuration changes are
+/// serialized by a lock and applied copy-on-write, so renders already in
+/// progress keep using the registry they started with.
+#[pyclass(frozen)]
 struct HandlebarrzTemplate {
-    registry: Handlebars<'static>,
-    py_helpers: HashMap<String, PyObject>,
+    state: RwLock<EngineState>,
+    template_cache: Mutex<LruCache<u64, Arc<CompiledTemplate>>>,
+    analysis_cache: Mutex<AnalysisCache>,
+    projection_stats: ProjectionStats,
+    partial_resolver: Mutex<PartialResolver>,
+    reload_schedule: Mutex<ReloadSchedule>,
+    render_stats: RenderStats,
+}
+
+/// How often the files of registered templates are checked for changes.
+#[derive(Clone, Default)]
+struct ReloadSchedule {
+    /// Minimum time between two checks, or `None` to never check.
+    interval: Option<Duration>,
+    /// When the files were last checked.
+    checked_at: Option<Instant>,
+}
+
+impl ReloadSchedule {
+    /// Returns whether a check is due at `now`, recording it as started if
+    /// it is, so that concurrent renders do not check the files again.
+    fn start_check(&mut self, now: Instant) -> bool {
+        let Some(interval) = self.interval else {
+            return false;
+        };
+        if self
+            .checked_at
+            .is_some_and(|at| now.duration_since(at) < interval)
+        {
+            return false;
+        }
+        self.checked_at = Some(now);
+        true
+    }
+}
+
+/// Facts about registered templates, computed on first use.
+///
+/// Entries belong to one `EngineState::generation` and are dropped as soon
+/// as a render sees a newer one. Templates that are not registered map to
+/// `None`.
+#[derive(Default)]
+struct AnalysisCache {
+    generation: u64,
+    templates: HashMap<String, Option<Arc<TemplateFacts>>>,
+}
+
+/// What renders need to know from the static analysis of a template.
+struct TemplateFacts {
+    /// The parts of the render data the template reads, or `None` if it
+    /// needs all of the data.
+    projection: Option<Projection>,
+    /// Partials the template references, directly or through partials.
+    partials: Vec<String>,
+    /// Referenced partials that are not registered.
+    missing_partials: HashSet<String>,
+}
+
+/// Default number of partials kept after being loaded by a partial
+/// resolver.
+const DEFAULT_RESOLVED_PARTIAL_CAPACITY: usize = 256;
+
+/// Maximum number of rounds of resolving partials before a render, which
+/// bounds how deeply resolved partials can nest further unknown partials.
+const MAX_RESOLVE_ROUNDS: usize = 16;
+
+/// Loads partials on demand and keeps track of the partials it loaded.
+///
+/// Resolved partials are registered like any other partial and are
+/// unregistered again when they are evicted from `resolved`. A partial only
+/// counts as resolved while it has no recorded `TemplateSource`, so partials
+/// registered explicitly are never replaced or evicted.
+#[derive(Clone)]
+struct PartialResolver {
+    /// Called with a partial name, returns its source or `None`.
+    resolve: Option<Arc<PyObject>>,
+    /// How long a resolved partial is used before it is resolved again.
+    ttl: Option<Duration>,
+    /// When each partial was resolved, and whether the resolver found it.
+    resolved: LruCache<String, ResolvedPartial>,
+}
+
+#[derive(Clone, Copy)]
+struct ResolvedPartial {
+    at: Instant,
+    found: bool,
+}
+
+impl PartialResolver {
+    fn new() -> Self {
+        PartialResolver {
+            resolve: None,
+            ttl: None,
+            resolved: LruCache::new(DEFAULT_RESOLVED_PARTIAL_CAPACITY),
+        }
+    }
+
+    /// The partials referenced by a template that should be passed to the
+    /// resolver: unknown partials that were not resolved before, resolved
+    /// partials whose TTL has expired and resolved partials that have been
+    /// unregistered since. Names in `skip` are left out.
+    fn wanted(&mut self, facts: &TemplateFacts, skip: &HashSet<String>) -> Vec<String> {
+        let now = Instant::now();
+        let mut wanted = Vec::new();
+        for name in &facts.partials {
+            let missing = facts.missing_partials.contains(name);
+            if skip.contains(name) || !(missing || self.resolved.contains(name)) {
+                continue;
+            }
+            let stale = match self.resolved.get(name) {
+                Some(entry) => {
+                    (entry.found && missing)
+                        || self
+                            .ttl
+                            .is_some_and(|ttl| now.duration_since(entry.at) >= ttl)
+                }
+                None => true,
+            };
+            if stale {
+                wanted.push(name.clone());
+            }
+        }
+        wanted
+    }
+}
+
+/// Counters describing context projection.
+#[derive(Default)]
+struct ProjectionStats {
+    /// Renders of registered templates while projection was enabled.
+    renders: AtomicU64,
+    /// Renders whose data was projected.
+    projected: AtomicU64,
+    /// Estimated JSON size of the data that was not converted.
+    bytes_saved: AtomicU64,
+}
+
+/// The registered templates, partials, helpers and settings of an engine.
+///
+/// Every field is cheap to clone, so cloning the state is how forks and
+/// renders take a snapshot of it.
+#[derive(Clone)]
+struct EngineState {
+    registry: Registry,
+    /// Registered Python helpers.
+    py_helpers: HashMap<String, PyHelperInfo>,
+    /// Incremented whenever the registry may have changed.
+    generation: u64,
+    /// Whether render data is projected to what templates read.
+    context_projection: bool,
+    /// Named data layered under the data of every render.
+    globals: Arc<HashMap<String, Arc<Value>>>,
+    sources: Arc<HashMap<String, TemplateSource>>,
+    /// Fingerprints of the files of templates registered one file at a
+    /// time, by template name.
+    files: Arc<HashMap<String, FileFingerprint>>,
+    directories: Arc<HashMap<(PathBuf, String), DirectoryState>>,
+}
+
+impl EngineState {
+    fn new() -> Self {
+        EngineState {
+            registry: Registry::new(),
+            py_helpers: HashMap::new(),
+            generation: 0,
+            context_projection: false,
+            globals: Arc::default(),
+            sources: Arc::default(),
+            files: Arc::default(),
+            directories: Arc::default(),
+        }
+    }
+
+    /// Returns the handlebars registry for changes to helpers or settings,
+    /// first copying it if it is shared with a fork or a render in progress.
+    fn registry_mut(&mut self) -> &mut Handlebars<'static> {
+        self.generation += 1;
+        self.registry.handlebars_mut()
+    }
+
+    /// Returns the registry for registering or unregistering templates,
+    /// which copies only the templates it replaces.
+    fn templates_mut(&mut self) -> &mut Registry {
+        self.generation += 1;
+        &mut self.registry
+    }
+
+    /// Analyzes a template against the registry.
+    ///
+    /// The template's projection is `None` if it needs all of the data: when
+    /// it reads the whole context, calls a Python helper that receives the
+    /// context, or cannot be fully analyzed. In dev mode templates may be
+    /// reloaded from files at render time, so nothing is projected.
+    fn template_facts(&self, template: &Template) -> TemplateFacts {
+        let analysis = analysis::analyze(&self.registry, template);
+        let reads_context = analysis.helpers.iter().any(|helper| {
+            self.py_helpers
+                .get(helper)
+                .is_some_and(|info| info.needs_context)
+        });
+        let projection = if self.registry.dev_mode() || reads_context {
+            None
+        } else {
+            analysis.projection()
+        };
+        TemplateFacts {
+            projection,
+            partials: analysis.partials.into_iter().collect(),
+            missing_partials: analysis.missing_partials.into_iter().collect(),
+        }
+    }
+
+    /// Unregisters a partial loaded by the partial resolver, unless it has
+    /// been registered explicitly since.
+    fn remove_resolved_partial(&mut self, name: &str) {
+        if !self.sources.contains_key(name) && self.registry.has_template(name) {
+            self.remove_template(name);
+        }
+    }
+
+    /// Records where a registered template came from.
+    fn set_source(&mut self, name: &str, source: TemplateSource) {
+        Arc::make_mut(&mut self.sources).insert(name.to_string(), source);
+        if self.files.contains_key(name) {
+            Arc::make_mut(&mut self.files).remove(name);
+        }
+    }
+
+    /// Records where a template registered from a single file came from,
+    /// and the fingerprint of the file, if it could be read.
+    fn set_file_source(&mut self, name: &str, path: PathBuf, fingerprint: Option<FileFingerprint>) {
+        self.set_source(name, TemplateSource::File(path));
+        if let Some(fingerprint) = fingerprint {
+            Arc::make_mut(&mut self.files).insert(name.to_string(), fingerprint);
+        }
+    }
+
+    /// Unregisters a template and forgets where it came from.
+    fn remove_template(&mut self, name: &str) {
+        self.templates_mut().unregister_template(name);
+        Arc::make_mut(&mut self.sources).remove(name);
+        if self.files.contains_key(name) {
+            Arc::make_mut(&mut self.files).remove(name);
+        }
+    }
+
+    /// Checks the files of templates registered one file at a time for
+    /// changes.
+    ///
+    /// As for directories, files are only read if their size or modification
+    /// time changed, and only compiled if their content hash changed. Files
+    /// that can no longer be read keep their registered template.
+    ///
+    /// # Returns
+    ///
+    /// The name, path, new fingerprint and, if the content changed, the
+    /// compiled template of every changed file.
+    ///
+    /// # Raises
+    ///
+    /// `PyValueError` if a changed template cannot be compiled.
+    fn scan_template_files(
+        &self,
+    ) -> PyResult<Vec<(String, PathBuf, FileFingerprint, Option<Template>)>> {
+        let watched: Vec<(&str, &Path, FileFingerprint)> = self
+            .files
+            .iter()
+            .filter_map(|(name, fingerprint)| match self.sources.get(name) {
+                Some(TemplateSource::File(path)) => {
+                    Some((name.as_str(), path.as_path(), *fingerprint))
+                }
+                _ => None,
+            })
+            .collect();
+
+        let checked = map_parallel(&watched, |&(name, path, known)| {
+            let Ok(Some((fingerprint, source))) = read_if_changed(path, known) else {
+                return Ok(None);
+            };
+            let template = if fingerprint.hash == known.hash {
+                None
+            } else {
+                let mut template =
+                    Template::compile(&source).map_err(|e| format!("{}: {}", name, e))?;
+                template.name = Some(name.to_string());
+                Some(template)
+            };
+            Ok(Some((
+                name.to_string(),
+                path.to_path_buf(),
+                fingerprint,
+                template,
+            )))
+        })
+        .map_err(PyValueError::new_err)?;
+        Ok(checked.into_iter().flatten().collect())
+    }
+
+    /// Registers the added and changed templates of a scanned directory,
+    /// unregisters the removed ones and records the new directory state.
+    fn apply_directory_scan(
+        &mut self,
+        key: (PathBuf, String),
+        files: DirectoryState,
+        updated: Vec<(String, PathBuf, Option<Template>)>,
+        removed: &[String],
+    ) -> PyResult<()> {
+        for (name, path, template) in updated {
+            match template {
+                Some(template) => self.templates_mut().register_template(&name, template),
+                None => self
+                    .registry_mut()
+                    .register_template_file(&name, &path)
+                    .map_err(|e| PyValueError::new_err(e.to_string()))?,
+            }
+            self.set_source(&name, TemplateSource::File(path));
+        }
+        for name in removed {
+            self.remove_template(name);
+        }
+        Arc::make_mut(&mut self.directories).insert(key, files);
+        Ok(())
+    }
+
+    /// Compares a templates directory with the state recorded by the last
+    /// `register_templates_directory` call for it.
+    ///
+    /// Files are only read if their size or modification time changed, and
+    /// only compiled if their content hash changed or their template is not
+    /// registered. In dev mode nothing is compiled, so that the registry can
+    /// load the files itself and reload them when they change.
+    fn scan_templates_directory(&self, key: &(PathBuf, String)) -> PyResult<DirectoryScan> {
+        let (dir, extension) = key;
+        let empty = DirectoryState::new();
+        let previous = self.directories.get(key).unwrap_or(&empty);
+        let files = find_template_files(dir, extension)?;
+
+        let checked = map_parallel(&files, |(name, path)| {
+            let io_error = |e: io::Error| format!("{}: {}", path.display(), e);
+            let known = previous
+                .get(name)
+                .filter(|(known_path, _)| known_path == path && self.registry.has_template(name))
+                .map(|(_, fingerprint)| *fingerprint);
+
+            let (fingerprint, source) = match known {
+                Some(known) => match read_if_changed(path, known).map_err(io_error)? {
+                    Some(changed) => changed,
+                    None => return Ok((known, None)),
+                },
+                None => read_fingerprinted(path).map_err(io_error)?,
+            };
+            match known {
+                Some(known) if known.hash == fingerprint.hash => Ok((fingerprint, None)),
+                _ => Ok((fingerprint, Some(source))),
+            }
+        })
+        .map_err(PyOSError::new_err)?;
+
+        let mut scan = DirectoryScan::default();
+        let mut updated = Vec::new();
+        for ((name, path), (fingerprint, source)) in files.into_iter().zip(checked) {
+            if let Some(source) = source {
+                if previous.contains_key(&name) {
+                    scan.changed.push(name.clone());
+                } else {
+                    scan.added.push(name.clone());
+                }
+                updated.push((name.clone(), path.clone(), source));
+            }
+            scan.files.insert(name, (path, fingerprint));
+        }
+        scan.removed = previous
+            .keys()
+            .filter(|name| !scan.files.contains_key(*name))
+            .cloned()
+            .collect();
+        scan.removed.sort();
+
+        let mut templates = if self.registry.dev_mode() {
+            Vec::new()
+        } else {
+            let named: Vec<(&str, &str, bool)> = updated
+                .iter()
+                .map(|(name, _, source)| (name.as_str(), source.as_str(), false))
+                .collect();
+            compile_templates(&named).map_err(PyValueError::new_err)?
+        }
+        .into_iter();
+        scan.updated = updated
+            .into_iter()
+            .map(|(name, path, _)| (name, path, templates.next()))
+            .collect();
+        Ok(scan)
+    }
 }
 
 #[pymethods]
@@ -187,11 +1439,14 @@ impl HandlebarrzTemplate {
     /// A new `HandlebarrzTemplate` instance.
     #[new]
     fn new() -> Self {
-        let registry = Handlebars::new();
-
         Self {
-            registry,
-            py_helpers: HashMap::new(),
+            state: RwLock::new(EngineState::new()),
+            template_cache: Mutex::new(LruCache::new(DEFAULT_TEMPLATE_CACHE_CAPACITY)),
+            analysis_cache: Mutex::default(),
+            projection_stats: ProjectionStats::default(),
+            partial_resolver: Mutex::new(PartialResolver::new()),
+            reload_schedule: Mutex::default(),
+            render_stats: RenderStats::default(),
         }
     }
 
@@ -208,8 +1463,8 @@ impl HandlebarrzTemplate {
     ///
     /// `None`
     #[pyo3(text_signature = "($self, enabled)")]
-    fn set_strict_mode(&mut self, enabled: bool) -> PyResult<()> {
-        self.registry.set_strict_mode(enabled);
+    fn set_strict_mode(&self, enabled: bool) -> PyResult<()> {
+        self.state_mut().registry_mut().set_strict_mode(enabled);
         Ok(())
     }
 
@@ -220,7 +1475,7 @@ impl HandlebarrzTemplate {
     /// Whether strict mode is currently enabled.
     #[pyo3(text_signature = "($self)")]
     fn get_strict_mode(&self) -> bool {
-        self.registry.strict_mode()
+        self.state().registry.strict_mode()
     }
 
     /// Sets the development mode for the template engine.
@@ -236,8 +1491,8 @@ impl HandlebarrzTemplate {
     ///
     /// `None`
     #[pyo3(text_signature = "($self, enabled)")]
-    fn set_dev_mode(&mut self, enabled: bool) -> PyResult<()> {
-        self.registry.set_dev_mode(enabled);
+    fn set_dev_mode(&self, enabled: bool) -> PyResult<()> {
+        self.state_mut().registry_mut().set_dev_mode(enabled);
         Ok(())
     }
 
@@ -248,7 +1503,61 @@ impl HandlebarrzTemplate {
     /// Whether development mode is currently enabled.
     #[pyo3(text_signature = "($self)")]
     fn get_dev_mode(&self) -> bool {
-        self.registry.dev_mode()
+        self.state().registry.dev_mode()
+    }
+
+    /// Sets how often the files of registered templates are checked for
+    /// changes.
+    ///
+    /// Before a render, at most once per `interval` seconds, the size and
+    /// modification time of every file registered by `register_template_file`,
+    /// `register_templates_directory` or `load_snapshot` is checked. Files
+    /// that changed are read again, and recompiled if their content changed.
+    /// Template directories are rescanned, so added and deleted files are
+    /// picked up as well. Unlike dev mode, renders in between checks cost
+    /// nothing extra and rendered templates are not recompiled. Checks are
+    /// skipped while dev mode is enabled.
+    ///
+    /// # Arguments
+    ///
+    /// * `interval` - Minimum seconds between two checks, or `None` to stop
+    ///   checking.
+    ///
+    /// # Returns
+    ///
+    /// `None`
+    ///
+    /// # Raises
+    ///
+    /// `PyValueError` if `interval` is negative or not finite.
+    #[pyo3(text_signature = "($self, interval)")]
+    fn set_reload_interval(&self, interval: Option<f64>) -> PyResult<()> {
+        let interval = interval
+            .map(|interval| {
+                Duration::try_from_secs_f64(interval).map_err(|_| {
+                    PyValueError::new_err(format!("invalid reload interval: {}", interval))
+                })
+            })
+            .transpose()?;
+        *self.reload_schedule() = ReloadSchedule {
+            interval,
+            checked_at: None,
+        };
+        Ok(())
+    }
+
+    /// Gets how often the files of registered templates are checked for
+    /// changes.
+    ///
+    /// # Returns
+    ///
+    /// Minimum seconds between two checks, or `None` if files are not
+    /// checked.
+    #[pyo3(text_signature = "($self)")]
+    fn get_reload_interval(&self) -> Option<f64> {
+        self.reload_schedule()
+            .interval
+            .map(|interval| interval.as_secs_f64())
     }
 
     /// Sets the escape function for the template engine.
@@ -269,10 +1578,16 @@ impl HandlebarrzTemplate {
     ///
     /// `PyValueError` if the specified escape function is not recognized.
     #[pyo3(text_signature = "($self, escape_fn)")]
-    fn set_escape_fn(&mut self, escape_fn: &str) -> PyResult<()> {
+    fn set_escape_fn(&self, escape_fn: &str) -> PyResult<()> {
         match escape_fn {
-            "html_escape" => self.registry.register_escape_fn(handlebars::html_escape),
-            "no_escape" => self.registry.register_escape_fn(handlebars::no_escape),
+            "html_escape" => self
+                .state_mut()
+                .registry_mut()
+                .register_escape_fn(handlebars::html_escape),
+            "no_escape" => self
+                .state_mut()
+                .registry_mut()
+                .register_escape_fn(handlebars::no_escape),
             _ => {
                 return Err(PyValueError::new_err(format!(
                     "Unknown escape function: {}",
@@ -298,10 +1613,14 @@ impl HandlebarrzTemplate {
     ///
     /// `PyValueError` if the template cannot be registered.
     #[pyo3(text_signature = "($self, name, template_string)")]
-    fn register_template(&mut self, name: &str, template_string: &str) -> PyResult<()> {
-        self.registry
+    fn register_template(&self, name: &str, template_string: &str) -> PyResult<()> {
+        let mut state = self.state_mut();
+        state
+            .templates_mut()
             .register_template_string(name, template_string)
-            .map_err(|e| PyValueError::new_err(e.to_string()))
+            .map_err(|e| PyValueError::new_err(e.to_string()))?;
+        state.set_source(name, TemplateSource::Text(Arc::from(template_string)));
+        Ok(())
     }
 
     /// Registers a partial with the given name.
@@ -319,10 +1638,17 @@ impl HandlebarrzTemplate {
     ///
     /// `PyValueError` if the partial cannot be registered.
     #[pyo3(text_signature = "($self, name, template_string)")]
-    fn register_partial(&mut self, name: &str, template_string: &str) -> PyResult<()> {
-        self.registry
-            .register_partial(name, template_string)
-            .map_err(|e| PyValueError::new_err(e.to_string()))
+    fn register_partial(&self, name: &str, template_string: &str) -> PyResult<()> {
+        {
+            let mut state = self.state_mut();
+            state
+                .templates_mut()
+                .register_partial(name, template_string)
+                .map_err(|e| PyValueError::new_err(e.to_string()))?;
+            state.set_source(name, TemplateSource::Partial(Arc::from(template_string)));
+        }
+        self.invalidate_template_cache();
+        Ok(())
     }
 
     /// Registers a template file with the given name.
@@ -341,7 +1667,7 @@ impl HandlebarrzTemplate {
     /// `PyFileNotFoundError` if the template file does not exist.
     /// `PyValueError` if the template cannot be registered.
     #[pyo3(text_signature = "($self, name, file_path)")]
-    fn register_template_file(&mut self, name: &str, file_path: &str) -> PyResult<()> {
+    fn register_template_file(&self, name: &str, file_path: &str) -> PyResult<()> {
         let path = Path::new(file_path);
         if !path.exists() {
             return Err(PyFileNotFoundError::new_err(format!(
@@ -350,131 +1676,1556 @@ impl HandlebarrzTemplate {
             )));
         }
 
-        self.registry
-            .register_template_file(name, file_path)
-            .map_err(|e| PyValueError::new_err(e.to_string()))
+        let (fingerprint, source) =
+            read_fingerprinted(path).map_err(|e| PyValueError::new_err(e.to_string()))?;
+        let mut state = self.state_mut();
+        if state.registry.dev_mode() {
+            // Let the registry keep the path so it can reload the file.
+            state.registry_mut().register_template_file(name, file_path)
+        } else {
+            state
+                .templates_mut()
+                .register_template_string(name, &source)
+        }
+        .map_err(|e| PyValueError::new_err(e.to_string()))?;
+        state.set_file_source(name, path.to_path_buf(), Some(fingerprint));
+        Ok(())
+    }
+
+    /// Registers all template files in a directory and its subdirectories.
+    ///
+    /// Each template is registered under its path relative to the directory,
+    /// without the extension and with `/` as the separator. Hidden files and
+    /// directories are skipped. Files are read and compiled on worker
+    /// threads.
+    ///
+    /// Calling this again for the same directory and extension rescans it
+    /// incrementally: files whose size and modification time are unchanged
+    /// are skipped, files whose content hash is unchanged are not recompiled,
+    /// and templates whose file was deleted are unregistered.
+    ///
+    /// # Arguments
+    ///
+    /// * `dir_path` - The directory to scan.
+    /// * `extension` - The file extension of templates, including the dot.
+    ///
+    /// # Returns
+    ///
+    /// Dictionary with the sorted names of the `added`, `changed` and
+    /// `removed` templates.
+    ///
+    /// # Raises
+    ///
+    /// `PyFileNotFoundError` if the directory does not exist.
+    /// `PyOSError` if a template file cannot be read.
+    /// `PyValueError` if a template cannot be compiled. Nothing is registered
+    /// or unregistered in that case.
+    #[pyo3(signature = (dir_path, extension = ".hbs"))]
+    #[pyo3(text_signature = "($self, dir_path, extension='.hbs')")]
+    fn register_templates_directory(
+        &self,
+        py: Python<'_>,
+        dir_path: &str,
+        extension: &str,
+    ) -> PyResult<HashMap<&'static str, Vec<String>>> {
+        let dir = Path::new(dir_path);
+        if !dir.is_dir() {
+            return Err(PyFileNotFoundError::new_err(format!(
+                "Templates directory not found: {}",
+                dir_path
+            )));
+        }
+
+        let key = (dir.to_path_buf(), extension.to_string());
+        let snapshot = self.state().clone();
+        let scan = py.allow_threads(|| snapshot.scan_templates_directory(&key))?;
+
+        let DirectoryScan {
+            files,
+            updated,
+            added,
+            changed,
+            removed,
+        } = scan;
+        let modified = !updated.is_empty() || !removed.is_empty();
+
+        self.state_mut()
+            .apply_directory_scan(key, files, updated, &removed)?;
+
+        if modified {
+            self.invalidate_template_cache();
+        }
+
+        Ok(HashMap::from([
+            ("added", added),
+            ("changed", changed),
+            ("removed", removed),
+        ]))
     }
 
     /// Registers a helper function with the given name.
     ///
+    /// The helper is called with three arguments: the positional parameters
+    /// as a list, the hash arguments as a dict and the current context. The
+    /// context is only converted for helpers that need it; otherwise an empty
+    /// dict is passed.
+    ///
+    /// A pure helper must return the same result whenever it is called with
+    /// the same arguments, and never reads the context. Its results are
+    /// cached by the JSON serialization of its parameters and hash
+    /// arguments, keeping the `cache_size` most recently used ones, so
+    /// repeated calls never call into Python.
+    ///
     /// # Arguments
     ///
     /// * `name` - The name of the helper.
     /// * `helper_fn` - The Python function to use as the helper.
+    /// * `needs_context` - Whether the helper reads the current context.
+    ///   Ignored for pure helpers.
+    /// * `pure` - Whether the helper's results can be cached.
+    /// * `cache_size` - Maximum number of results kept for a pure helper.
     ///
     /// # Returns
     ///
     /// `None`
-    #[pyo3(text_signature = "($self, name, helper_fn)")]
-    fn register_helper(&mut self, name: &str, helper_fn: PyObject) -> PyResult<()> {
-        Python::with_gil(|py| {
-            self.py_helpers
-                .insert(name.to_string(), helper_fn.clone_ref(py));
+    #[pyo3(signature = (
+        name,
+        helper_fn,
+        needs_context = true,
+        pure = false,
+        cache_size = DEFAULT_HELPER_CACHE_CAPACITY,
+    ))]
+    #[pyo3(
+        text_signature = "($self, name, helper_fn, needs_context=True, pure=False, cache_size=1024)"
+    )]
+    fn register_helper(
+        &self,
+        name: &str,
+        helper_fn: PyObject,
+        needs_context: bool,
+        pure: bool,
+        cache_size: usize,
+    ) -> PyResult<()> {
+        let info = PyHelperInfo {
+            needs_context: needs_context && !pure,
+            cache: pure.then(|| Arc::new(Mutex::new(LruCache::new(cache_size)))),
+        };
+        let helper = PyHelperDef {
+            func: helper_fn,
+            needs_context: info.needs_context,
+            cache: info.cache.clone(),
+        };
+        {
+            let mut state = self.state_mut();
+            state.py_helpers.insert(name.to_string(), info);
+            state.registry_mut().register_helper(name, Box::new(helper));
+        }
+        self.invalidate_template_cache();
+
+        Ok(())
+    }
 
-            let helper = PyHelperDef { func: helper_fn };
+    /// Unregisters a template with the given name.
+    ///
+    /// # Arguments
+    ///
+    /// * `name` - The name of the template.
+    ///
+    /// # Returns
+    ///
+    /// `None`
+    #[pyo3(text_signature = "($self, name)")]
+    fn unregister_template(&self, name: &str) -> PyResult<()> {
+        self.state_mut().remove_template(name);
+        Ok(())
+    }
 
-            self.registry.register_helper(name, Box::new(helper));
-        });
+    /// Checks if a template with the given name exists.
+    ///
+    /// # Arguments
+    ///
+    /// * `name` - The name of the template.
+    ///
+    /// # Returns
+    ///
+    /// Whether the template exists.
+    #[pyo3(text_signature = "($self, name)")]
+    fn has_template(&self, name: &str) -> bool {
+        self.state().registry.has_template(name)
+    }
+
+    /// Statically analyzes a registered template without rendering it.
+    ///
+    /// Data paths are resolved against the root of the render data, following
+    /// `#each`/`#with` blocks, `../`, `@root` and block parameters; elements
+    /// iterated by `#each` are written as `*`, e.g. `items.*.name`. Partials
+    /// are analyzed in the context they are rendered in.
+    ///
+    /// # Arguments
+    ///
+    /// * `name` - The name of the template.
+    ///
+    /// # Returns
+    ///
+    /// A dict with sorted lists of `paths`, `partials`, `missing_partials`,
+    /// `helpers` and `unknown_helpers`, and a `complete` flag that is false
+    /// when the template may read data the analysis cannot see (dynamic,
+    /// recursive or missing partials).
+    ///
+    /// # Raises
+    ///
+    /// `PyValueError` if the template is not registered.
+    #[pyo3(text_signature = "($self, name)")]
+    fn analyze<'py>(&self, py: Python<'py>, name: &str) -> PyResult<Bound<'py, PyDict>> {
+        let registry = self.registry();
+        let analysis = py
+            .allow_threads(|| {
+                registry
+                    .get_template(name)
+                    .map(|template| analysis::analyze(&registry, template))
+            })
+            .ok_or_else(|| PyValueError::new_err(format!("Template not found: {}", name)))?;
+
+        let dict = PyDict::new(py);
+        dict.set_item("paths", analysis.paths())?;
+        dict.set_item("partials", Vec::from_iter(analysis.partials))?;
+        dict.set_item(
+            "missing_partials",
+            Vec::from_iter(analysis.missing_partials),
+        )?;
+        dict.set_item("helpers", Vec::from_iter(analysis.helpers))?;
+        dict.set_item("unknown_helpers", Vec::from_iter(analysis.unknown_helpers))?;
+        dict.set_item("complete", !analysis.dynamic)?;
+        Ok(dict)
+    }
+
+    /// Renders a template with the given data.
+    ///
+    /// The data is converted directly from Python objects into JSON values
+    /// without an intermediate JSON string.
+    /// With context projection enabled, only the parts of the data that the
+    /// template reads are converted.
+    ///
+    /// # Arguments
+    ///
+    /// * `name` - The name of the template.
+    /// * `data` - The data to use for rendering.
+    ///
+    /// # Returns
+    ///
+    /// Rendered template as string.
+    ///
+    /// # Raises
+    ///
+    /// `PyTypeError` if the data is not JSON serializable.
+    /// `PyValueError` if the template cannot be rendered.
+    #[pyo3(text_signature = "($self, name, data)")]
+    fn render(&self, py: Python<'_>, name: &str, data: &Bound<'_, PyAny>) -> PyResult<String> {
+        self.reload_changed_files(py)?;
+        let registry = self.resolve_partials(py, || self.template_facts(name))?;
+        let data = self.template_data(name, data)?;
+        self.render_value(py, &registry, name, &data)
+    }
+
+    /// Renders a template with the given data encoded as a JSON string.
+    ///
+    /// # Arguments
+    ///
+    /// * `name` - The name of the template.
+    /// * `data` - The data to use for rendering (as JSON).
+    ///
+    /// # Returns
+    ///
+    /// Rendered template as string.
+    ///
+    /// # Raises
+    ///
+    /// `PyValueError` if the JSON is invalid or the template cannot be
+    /// rendered.
+    #[pyo3(text_signature = "($self, name, data)")]
+    fn render_json(&self, py: Python<'_>, name: &str, data: &str) -> PyResult<String> {
+        let data: Value = serde_json::from_str(data)
+            .map_err(|e| PyValueError::new_err(format!("invalid JSON: {}", e)))?;
+        self.reload_changed_files(py)?;
+        let registry = self.resolve_partials(py, || self.template_facts(name))?;
+        let data = self.with_globals(|| self.template_facts(name), data);
+        self.render_value(py, &registry, name, &data)
+    }
+
+    /// Renders a template string directly without registering.
+    ///
+    /// # Arguments
+    ///
+    /// * `template_string` - The template source code.
+    /// * `data` - The data to use for rendering.
+    ///
+    /// # Raises
+    ///
+    /// `PyTypeError` if the data is not JSON serializable.
+    /// `PyValueError` if the template cannot be rendered.
+    ///
+    /// # Returns
+    ///
+    /// Rendered template as a string.
+    #[pyo3(text_signature = "($self, template_string, data)")]
+    fn render_template(
+        &self,
+        py: Python<'_>,
+        template_string: &str,
+        data: &Bound<'_, PyAny>,
+    ) -> PyResult<String> {
+        self.reload_changed_files(py)?;
+        let registry = self.resolve_partials(py, || self.source_facts(template_string))?;
+        let data = self.with_globals(|| self.source_facts(template_string), py_to_json(data)?);
+        self.render_template_value(py, &registry, template_string, &data)
+    }
+
+    /// Renders a template string directly without registering, with the given
+    /// data encoded as a JSON string.
+    ///
+    /// # Arguments
+    ///
+    /// * `template_string` - The template source code.
+    /// * `data` - The data to use for rendering (as JSON).
+    ///
+    /// # Raises
+    ///
+    /// `PyValueError` if the JSON is invalid or the template cannot be
+    /// rendered.
+    ///
+    /// # Returns
+    ///
+    /// Rendered template as a string.
+    #[pyo3(text_signature = "($self, template_string, data)")]
+    fn render_template_json(
+        &self,
+        py: Python<'_>,
+        template_string: &str,
+        data: &str,
+    ) -> PyResult<String> {
+        let data: Value = serde_json::from_str(data)
+            .map_err(|e| PyValueError::new_err(format!("invalid JSON: {}", e)))?;
+        self.reload_changed_files(py)?;
+        let registry = self.resolve_partials(py, || self.source_facts(template_string))?;
+        let data = self.with_globals(|| self.source_facts(template_string), data);
+        self.render_template_value(py, &registry, template_string, &data)
+    }
+
+    /// Renders a registered template once for each of the given contexts.
+    ///
+    /// All contexts are converted and rendered in a single native call, which
+    /// avoids paying the Python to Rust crossing once per context. When
+    /// `parallel` is set and no Python helpers are registered, the renders are
+    /// spread over a pool of worker threads.
+    ///
+    /// # Arguments
+    ///
+    /// * `name` - The name of the template.
+    /// * `contexts` - A sequence of data objects to render the template with.
+    /// * `parallel` - Whether to render on multiple worker threads.
+    ///
+    /// # Returns
+    ///
+    /// List of rendered strings, in the order of `contexts`.
+    ///
+    /// # Raises
+    ///
+    /// `PyTypeError` if any of the contexts is not JSON serializable.
+    /// `PyValueError` if the template cannot be rendered with any of the
+    /// contexts.
+    #[pyo3(signature = (name, contexts, parallel = false))]
+    #[pyo3(text_signature = "($self, name, contexts, parallel=False)")]
+    fn render_many(
+        &self,
+        py: Python<'_>,
+        name: &str,
+        contexts: Vec<Bound<'_, PyAny>>,
+        parallel: bool,
+    ) -> PyResult<Vec<String>> {
+        self.reload_changed_files(py)?;
+        let registry = self.resolve_partials(py, || self.template_facts(name))?;
+        let data = contexts
+            .iter()
+            .map(|data| self.template_data(name, data))
+            .collect::<PyResult<Vec<Value>>>()?;
+        let parallel = parallel && self.state().py_helpers.is_empty();
+        self.render_many_values(py, &registry, name, &data, parallel)
+    }
+
+    /// Renders a template, streaming the output to a Python writer.
+    ///
+    /// Rendered output is passed to `writer.write` in chunks as it is
+    /// produced instead of being collected into a single string, which keeps
+    /// peak memory low for large outputs.
+    ///
+    /// # Arguments
+    ///
+    /// * `name` - The name of the template.
+    /// * `data` - The data to use for rendering.
+    /// * `writer` - Object with a `write(str)` method, such as a text file.
+    /// * `chunk_size` - Minimum number of bytes per `write` call. The last
+    ///   chunk may be smaller.
+    ///
+    /// # Returns
+    ///
+    /// `None`
+    ///
+    /// # Raises
+    ///
+    /// `PyTypeError` if the data is not JSON serializable.
+    /// `PyValueError` if the template cannot be rendered.
+    /// Any exception raised by `writer.write`, unchanged.
+    #[pyo3(signature = (name, data, writer, chunk_size = DEFAULT_CHUNK_SIZE))]
+    #[pyo3(text_signature = "($self, name, data, writer, chunk_size=65536)")]
+    fn render_to(
+        &self,
+        py: Python<'_>,
+        name: &str,
+        data: &Bound<'_, PyAny>,
+        writer: PyObject,
+        chunk_size: usize,
+    ) -> PyResult<()> {
+        self.reload_changed_files(py)?;
+        let registry = self.resolve_partials(py, || self.template_facts(name))?;
+        let data = self.template_data(name, data)?;
+        let counters = self.template_counters(&registry, name);
+        let mut out = PyChunkWriter::new(writer, chunk_size);
+
+        let result = py.allow_threads(|| {
+            counters.measure(
+                || -> Result<usize, String> {
+                    registry
+                        .render_to_write(name, &data, &mut out)
+                        .map_err(|e| e.to_string())?;
+                    io::Write::flush(&mut out).map_err(|e| e.to_string())?;
+                    Ok(out.written)
+                },
+                |&written| written,
+            )
+        });
+
+        match out.error.take() {
+            Some(err) => Err(err),
+            None => result.map(|_| ()).map_err(PyValueError::new_err),
+        }
+    }
+
+    /// Writes the sources of all registered templates and partials to a
+    /// snapshot file.
+    ///
+    /// Each entry stores the template name, the file it was registered from
+    /// (if any), its source and a content hash of the source. File-based
+    /// templates are read from disk again so the snapshot reflects their
+    /// current contents. The file is written atomically.
+    ///
+    /// # Arguments
+    ///
+    /// * `path` - The snapshot file to write.
+    ///
+    /// # Returns
+    ///
+    /// Number of templates written.
+    ///
+    /// # Raises
+    ///
+    /// `OSError` if a template file or the snapshot cannot be read or written.
+    #[pyo3(text_signature = "($self, path)")]
+    fn save_snapshot(&self, py: Python<'_>, path: &str) -> PyResult<usize> {
+        let registered = Arc::clone(&self.state().sources);
+        py.allow_threads(|| -> PyResult<usize> {
+            let mut names: Vec<&String> = registered.keys().collect();
+            names.sort();
+
+            let mut sources = Vec::with_capacity(names.len());
+            for name in names {
+                let (partial, file, text) = match &registered[name] {
+                    TemplateSource::Text(text) => (false, None, Arc::clone(text)),
+                    TemplateSource::Partial(text) => (true, None, Arc::clone(text)),
+                    TemplateSource::File(file) => {
+                        let (fingerprint, text) = read_fingerprinted(file)?;
+                        (
+                            false,
+                            Some((file.to_string_lossy().into_owned(), fingerprint)),
+                            Arc::<str>::from(text),
+                        )
+                    }
+                };
+                sources.push((name.as_str(), partial, file, text));
+            }
+            let entries: Vec<SnapshotEntry> = sources
+                .iter()
+                .map(|(name, partial, file, text)| SnapshotEntry {
+                    name,
+                    partial: *partial,
+                    file: file.as_ref().map(|(path, fingerprint)| SnapshotFile {
+                        path,
+                        len: fingerprint.len,
+                        modified: fingerprint.modified_nanos(),
+                    }),
+                    hash: content_hash(text),
+                    source: text,
+                })
+                .collect();
+
+            let bytes = snapshot::encode(&entries).map_err(PyValueError::new_err)?;
+            // A unique temporary file keeps concurrent saves to the same path,
+            // from this process or others, from writing to the same file.
+            static SAVES: AtomicU64 = AtomicU64::new(0);
+            let tmp_path = format!(
+                "{}.{}-{}.tmp",
+                path,
+                std::process::id(),
+                SAVES.fetch_add(1, Ordering::Relaxed)
+            );
+            let written =
+                std::fs::write(&tmp_path, bytes).and_then(|()| std::fs::rename(&tmp_path, path));
+            if written.is_err() {
+                let _ = std::fs::remove_file(&tmp_path);
+            }
+            written?;
+            Ok(entries.len())
+        })
+    }
+
+    /// Registers all templates and partials stored in a snapshot file.
+    ///
+    /// The snapshot is read in one go and its entries are compiled on worker
+    /// threads instead of being read and compiled one file at a time. Entries
+    /// that were registered from a file are checked against the file: if it
+    /// still exists and its size or modification time differ from those
+    /// stored in the snapshot, it is read again, and if its contents no
+    /// longer match the hash stored in the snapshot, the current file
+    /// contents are compiled instead.
+    ///
+    /// # Arguments
+    ///
+    /// * `path` - The snapshot file to load.
+    ///
+    /// # Returns
+    ///
+    /// Number of templates registered.
+    ///
+    /// # Raises
+    ///
+    /// `OSError` if the snapshot cannot be read.
+    /// `PyValueError` if the snapshot is invalid or corrupt, or a template
+    /// cannot be compiled. Nothing is registered in that case.
+    #[pyo3(text_signature = "($self, path)")]
+    fn load_snapshot(&self, py: Python<'_>, path: &str) -> PyResult<usize> {
+        let bytes = std::fs::read(path)?;
+        let loaded = py
+            .allow_threads(|| -> Result<Vec<_>, String> {
+                let entries = snapshot::decode(&bytes)?;
+                let sources: Vec<(&SnapshotEntry, Option<FileFingerprint>, Cow<str>)> = entries
+                    .iter()
+                    .map(|entry| {
+                        let (fingerprint, changed) = match &entry.file {
+                            Some(file) => {
+                                let known = FileFingerprint::from_snapshot(file, entry.hash);
+                                match read_if_changed(Path::new(file.path), known) {
+                                    Ok(None) => (Some(known), None),
+                                    Ok(Some((fingerprint, text)))
+                                        if fingerprint.hash != entry.hash =>
+                                    {
+                                        (Some(fingerprint), Some(text))
+                                    }
+                                    Ok(Some((fingerprint, _))) => (Some(fingerprint), None),
+                                    Err(_) => (None, None),
+                                }
+                            }
+                            None => (None, None),
+                        };
+                        let source = changed.map_or(Cow::Borrowed(entry.source), Cow::Owned);
+                        (entry, fingerprint, source)
+                    })
+                    .collect();
+
+                let named: Vec<(&str, &str, bool)> = sources
+                    .iter()
+                    .map(|(entry, _, source)| (entry.name, source.as_ref(), entry.partial))
+                    .collect();
+                let templates = compile_templates(&named)?;
+
+                Ok(sources
+                    .into_iter()
+                    .zip(templates)
+                    .map(|((entry, fingerprint, source), template)| {
+                        let source = match entry.file {
+                            Some(file) => TemplateSource::File(PathBuf::from(file.path)),
+                            None if entry.partial => TemplateSource::Partial(Arc::from(source)),
+                            None => TemplateSource::Text(Arc::from(source)),
+                        };
+                        (entry.name.to_string(), source, fingerprint, template)
+                    })
+                    .collect())
+            })
+            .map_err(PyValueError::new_err)?;
+
+        let count = loaded.len();
+        {
+            let mut state = self.state_mut();
+            for (name, source, fingerprint, template) in loaded {
+                state.templates_mut().register_template(&name, template);
+                match source {
+                    TemplateSource::File(path) => state.set_file_source(&name, path, fingerprint),
+                    source => state.set_source(&name, source),
+                }
+            }
+        }
+        self.invalidate_template_cache();
+        Ok(count)
+    }
+
+    /// Creates a child engine that shares this engine's templates, partials,
+    /// helpers and settings.
+    ///
+    /// Forking does not copy or recompile anything: parent and child share
+    /// one registry, and templates registered by either of them afterwards
+    /// are kept in that engine's own overlay (see `Registry`), so changes
+    /// never leak between parent and child and a fork copies only the
+    /// templates it overrides. Changing a helper or a setting, or
+    /// unregistering a shared template, copies the registry for the engine
+    /// being modified. Forking is therefore cheap enough to do per request.
+    ///
+    /// # Returns
+    ///
+    /// A new `HandlebarrzTemplate` instance.
+    #[pyo3(text_signature = "($self)")]
+    fn fork(&self) -> Self {
+        Self {
+            state: RwLock::new(self.state().clone()),
+            template_cache: Mutex::new(LruCache::new(self.template_cache().capacity())),
+            analysis_cache: Mutex::default(),
+            projection_stats: ProjectionStats::default(),
+            partial_resolver: Mutex::new(self.partial_resolver().clone()),
+            reload_schedule: Mutex::new(self.reload_schedule().clone()),
+            render_stats: RenderStats::default(),
+        }
+    }
+
+    /// Renders a template on the native worker pool.
+    ///
+    /// The data is converted on the calling thread, then the render runs on
+    /// one of a fixed set of native worker threads shared by all engines, and
+    /// this method returns immediately. When the render finishes, `callback`
+    /// is called on the worker thread as `callback(result, None)`, or as
+    /// `callback(None, error)` if the template cannot be rendered.
+    ///
+    /// # Arguments
+    ///
+    /// * `name` - The name of the template.
+    /// * `data` - The data to use for rendering.
+    /// * `callback` - Called with the outcome of the render.
+    ///
+    /// # Returns
+    ///
+    /// `None`
+    ///
+    /// # Raises
+    ///
+    /// `PyTypeError` if the data is not JSON serializable.
+    #[pyo3(text_signature = "($self, name, data, callback)")]
+    fn render_async(
+        &self,
+        py: Python<'_>,
+        name: &str,
+        data: &Bound<'_, PyAny>,
+        callback: PyObject,
+    ) -> PyResult<()> {
+        self.reload_changed_files(py)?;
+        let registry = self.resolve_partials(py, || self.template_facts(name))?;
+        let data = self.template_data(name, data)?;
+        let counters = self.template_counters(&registry, name);
+        let name = name.to_string();
+        submit_render(callback, move || {
+            counters
+                .measure(|| registry.render(&name, &data), String::len)
+                .map_err(|e| e.to_string())
+        })
+    }
+
+    /// Renders a template once per data context on the native worker pool.
+    ///
+    /// Works like `render_async`, but `callback` receives the list of
+    /// rendered strings, in the order of `contexts`.
+    ///
+    /// # Arguments
+    ///
+    /// * `name` - The name of the template.
+    /// * `contexts` - The data contexts to render the template with.
+    /// * `callback` - Called with the outcome of the renders.
+    /// * `parallel` - Whether to split the contexts across additional worker
+    ///   threads.
+    ///
+    /// # Returns
+    ///
+    /// `None`
+    ///
+    /// # Raises
+    ///
+    /// `PyTypeError` if any of the contexts is not JSON serializable.
+    #[pyo3(signature = (name, contexts, callback, parallel = false))]
+    #[pyo3(text_signature = "($self, name, contexts, callback, parallel=False)")]
+    fn render_many_async(
+        &self,
+        py: Python<'_>,
+        name: &str,
+        contexts: Vec<Bound<'_, PyAny>>,
+        callback: PyObject,
+        parallel: bool,
+    ) -> PyResult<()> {
+        self.reload_changed_files(py)?;
+        let registry = self.resolve_partials(py, || self.template_facts(name))?;
+        let data = contexts
+            .iter()
+            .map(|data| self.template_data(name, data))
+            .collect::<PyResult<Vec<Value>>>()?;
+        let parallel = parallel && self.state().py_helpers.is_empty();
+        let counters = self.template_counters(&registry, name);
+        let name = name.to_string();
+        submit_render(callback, move || {
+            render_each(&registry, &name, &data, parallel, &counters)
+        })
+    }
+
+    /// Sets the number of compiled template strings kept by
+    /// `render_template`.
+    ///
+    /// Least recently used entries are evicted when the cache is full. A
+    /// capacity of zero disables the cache.
+    ///
+    /// # Arguments
+    ///
+    /// * `capacity` - Maximum number of cached compiled templates.
+    ///
+    /// # Returns
+    ///
+    /// `None`
+    #[pyo3(text_signature = "($self, capacity)")]
+    fn set_template_cache_capacity(&self, capacity: usize) -> PyResult<()> {
+        self.template_cache().set_capacity(capacity);
+        Ok(())
+    }
+
+    /// Gets the number of compiled template strings kept by
+    /// `render_template`.
+    ///
+    /// # Returns
+    ///
+    /// Maximum number of cached compiled templates.
+    #[pyo3(text_signature = "($self)")]
+    fn get_template_cache_capacity(&self) -> usize {
+        self.template_cache().capacity()
+    }
+
+    /// Gets usage statistics for the compiled template cache.
+    ///
+    /// # Returns
+    ///
+    /// Dictionary with the `hits`, `misses` and `evictions` counters and the
+    /// current `size` and `capacity` of the cache.
+    #[pyo3(text_signature = "($self)")]
+    fn template_cache_stats(&self) -> HashMap<&'static str, u64> {
+        let cache = self.template_cache();
+        let stats = cache.stats();
+        HashMap::from([
+            ("hits", stats.hits),
+            ("misses", stats.misses),
+            ("evictions", stats.evictions),
+            ("size", cache.len() as u64),
+            ("capacity", cache.capacity() as u64),
+        ])
+    }
+
+    /// Removes all compiled templates from the `render_template` cache.
+    ///
+    /// # Returns
+    ///
+    /// `None`
+    #[pyo3(text_signature = "($self)")]
+    fn clear_template_cache(&self) -> PyResult<()> {
+        self.invalidate_template_cache();
+        Ok(())
+    }
+
+    /// Enables or disables context projection.
+    ///
+    /// With projection enabled, rendering a registered template only
+    /// converts the parts of the data that the template reads (see
+    /// `analyze`); everything else is skipped. Templates that read the whole
+    /// context, call Python helpers registered with `needs_context`, or
+    /// cannot be fully analyzed still receive all of the data, as do all
+    /// templates in dev mode.
+    ///
+    /// # Arguments
+    ///
+    /// * `enabled` - Whether to enable context projection.
+    ///
+    /// # Returns
+    ///
+    /// `None`
+    #[pyo3(text_signature = "($self, enabled)")]
+    fn set_context_projection(&self, enabled: bool) -> PyResult<()> {
+        self.state_mut().context_projection = enabled;
+        Ok(())
+    }
+
+    /// Gets the context projection setting.
+    ///
+    /// # Returns
+    ///
+    /// Whether context projection is enabled.
+    #[pyo3(text_signature = "($self)")]
+    fn get_context_projection(&self) -> bool {
+        self.state().context_projection
+    }
+
+    /// Gets statistics about context projection.
+    ///
+    /// # Returns
+    ///
+    /// Dictionary with the number of `renders` made with projection
+    /// enabled, how many of them were `projected`, and the estimated number
+    /// of `bytes_saved`, i.e. the JSON size of the data that was skipped.
+    #[pyo3(text_signature = "($self)")]
+    fn context_projection_stats(&self) -> HashMap<&'static str, u64> {
+        let stats = &self.projection_stats;
+        HashMap::from([
+            ("renders", stats.renders.load(Ordering::Relaxed)),
+            ("projected", stats.projected.load(Ordering::Relaxed)),
+            ("bytes_saved", stats.bytes_saved.load(Ordering::Relaxed)),
+        ])
+    }
+
+    /// Registers named global data, replacing any global with that name.
+    ///
+    /// The data is converted once and kept as a native JSON value. Every
+    /// render then sees it as a top-level key of its data (and so also as
+    /// `@root.<name>`), unless the render data has a key with the same name,
+    /// which takes precedence. Renders of registered templates only copy
+    /// the parts of a global that the template reads, when that is known.
+    ///
+    /// # Arguments
+    ///
+    /// * `name` - The name of the global.
+    /// * `data` - The global data.
+    ///
+    /// # Returns
+    ///
+    /// `None`
+    ///
+    /// # Raises
+    ///
+    /// `PyTypeError` if the data is not JSON serializable.
+    #[pyo3(text_signature = "($self, name, data)")]
+    fn set_global(&self, name: &str, data: &Bound<'_, PyAny>) -> PyResult<()> {
+        let value = Arc::new(py_to_json(data)?);
+        Arc::make_mut(&mut self.state_mut().globals).insert(name.to_string(), value);
+        Ok(())
+    }
+
+    /// Updates the top-level keys of a global object.
+    ///
+    /// Only the given keys are converted, so small changes to large globals
+    /// are cheap. A missing global is created.
+    ///
+    /// # Arguments
+    ///
+    /// * `name` - The name of the global.
+    /// * `data` - The keys to add or replace.
+    ///
+    /// # Returns
+    ///
+    /// `None`
+    ///
+    /// # Raises
+    ///
+    /// `PyTypeError` if the data is not JSON serializable.
+    /// `PyValueError` if the global is not an object.
+    #[pyo3(text_signature = "($self, name, data)")]
+    fn update_global(&self, name: &str, data: &Bound<'_, PyDict>) -> PyResult<()> {
+        let mut updates = Vec::with_capacity(data.len());
+        for (key, value) in data.iter() {
+            updates.push((py_key_to_string(&key)?, py_to_json(&value)?));
+        }
+
+        let mut state = self.state_mut();
+        let global = Arc::make_mut(&mut state.globals)
+            .entry(name.to_string())
+            .or_insert_with(|| Arc::new(Value::Object(Map::new())));
+        if !global.is_object() {
+            return Err(PyValueError::new_err(format!(
+                "Global '{}' is not an object",
+                name
+            )));
+        }
+        if let Value::Object(map) = Arc::make_mut(global) {
+            map.extend(updates);
+        }
+        Ok(())
+    }
+
+    /// Removes a global.
+    ///
+    /// # Arguments
+    ///
+    /// * `name` - The name of the global.
+    ///
+    /// # Returns
+    ///
+    /// Whether the global existed.
+    #[pyo3(text_signature = "($self, name)")]
+    fn drop_global(&self, name: &str) -> bool {
+        let mut state = self.state_mut();
+        if !state.globals.contains_key(name) {
+            return false;
+        }
+        Arc::make_mut(&mut state.globals).remove(name);
+        true
+    }
+
+    /// Gets the names of the registered globals.
+    ///
+    /// # Returns
+    ///
+    /// The sorted global names.
+    #[pyo3(text_signature = "($self)")]
+    fn global_names(&self) -> Vec<String> {
+        let mut names = self.state().globals.keys().cloned().collect::<Vec<_>>();
+        names.sort();
+        names
+    }
+
+    /// Sets a callable that loads partials on demand.
+    ///
+    /// Before a render, the partials the template references (found by
+    /// static analysis, see `analyze`) that are not registered are passed
+    /// to `resolver` by name. It returns the partial source, or `None` if
+    /// there is no such partial. Resolved partials are compiled, registered
+    /// and reused by later renders until they are evicted: the least
+    /// recently used ones once more than `max_size` are kept, and any of
+    /// them `ttl` seconds after they were resolved, when they are resolved
+    /// again. `None` results are remembered the same way. Partials
+    /// registered explicitly always take precedence and are never evicted.
+    ///
+    /// Setting a resolver forgets the partials loaded by the previous one.
+    ///
+    /// # Arguments
+    ///
+    /// * `resolver` - Callable taking a partial name, or `None` to stop
+    ///   resolving partials.
+    /// * `max_size` - Maximum number of resolved partials to keep.
+    /// * `ttl` - Seconds after which a resolved partial is resolved again,
+    ///   or `None` to keep it until it is evicted or invalidated.
+    ///
+    /// # Returns
+    ///
+    /// `None`
+    ///
+    /// # Raises
+    ///
+    /// `PyValueError` if `ttl` is negative or not finite.
+    #[pyo3(signature = (resolver, max_size = DEFAULT_RESOLVED_PARTIAL_CAPACITY, ttl = None))]
+    #[pyo3(text_signature = "($self, resolver, max_size=256, ttl=None)")]
+    fn set_partial_resolver(
+        &self,
+        resolver: Option<PyObject>,
+        max_size: usize,
+        ttl: Option<f64>,
+    ) -> PyResult<()> {
+        let ttl = ttl
+            .map(|ttl| {
+                Duration::try_from_secs_f64(ttl)
+                    .map_err(|_| PyValueError::new_err(format!("invalid ttl: {}", ttl)))
+            })
+            .transpose()?;
+        self.forget_resolved_partials(None);
+
+        let mut resolver_state = self.partial_resolver();
+        resolver_state.resolve = resolver.map(Arc::new);
+        resolver_state.ttl = ttl;
+        resolver_state.resolved = LruCache::new(max_size);
+        Ok(())
+    }
+
+    /// Unregisters partials loaded by the partial resolver, so that they are
+    /// resolved again when next used.
+    ///
+    /// # Arguments
+    ///
+    /// * `names` - The partials to invalidate, or `None` for all resolved
+    ///   partials.
+    ///
+    /// # Returns
+    ///
+    /// Number of resolved partials that were invalidated.
+    #[pyo3(signature = (names = None))]
+    #[pyo3(text_signature = "($self, names=None)")]
+    fn invalidate_partials(&self, names: Option<Vec<String>>) -> usize {
+        self.forget_resolved_partials(names)
+    }
+
+    /// Gets usage statistics for partials loaded by the partial resolver.
+    ///
+    /// # Returns
+    ///
+    /// Dictionary with the `hits` (resolved partials reused), `misses`
+    /// (partials passed to the resolver) and `evictions` counters, and the
+    /// current `size` and `capacity` of the resolved partial cache.
+    #[pyo3(text_signature = "($self)")]
+    fn resolved_partial_stats(&self) -> HashMap<&'static str, u64> {
+        let resolver = self.partial_resolver();
+        let cache = &resolver.resolved;
+        let stats = cache.stats();
+        HashMap::from([
+            ("hits", stats.hits),
+            ("misses", stats.misses),
+            ("evictions", stats.evictions),
+            ("size", cache.len() as u64),
+            ("capacity", cache.capacity() as u64),
+        ])
+    }
+
+    /// Gets usage statistics for the result caches of pure Python helpers.
+    ///
+    /// # Returns
+    ///
+    /// Dictionary mapping the name of each pure helper to its `hits`,
+    /// `misses` and `evictions` counters and the current `size` and
+    /// `capacity` of its cache.
+    #[pyo3(text_signature = "($self)")]
+    fn helper_cache_stats(&self) -> HashMap<String, HashMap<&'static str, u64>> {
+        let state = self.state();
+        state
+            .py_helpers
+            .iter()
+            .filter_map(|(name, info)| {
+                let cache = lock_helper_cache(info.cache.as_ref()?);
+                let stats = cache.stats();
+                let counters = HashMap::from([
+                    ("hits", stats.hits),
+                    ("misses", stats.misses),
+                    ("evictions", stats.evictions),
+                    ("size", cache.len() as u64),
+                    ("capacity", cache.capacity() as u64),
+                ]);
+                Some((name.clone(), counters))
+            })
+            .collect()
+    }
+
+    /// Gets render statistics for each registered template rendered so far.
+    ///
+    /// Renders of template strings by `render_template` are not counted.
+    /// Latencies cover the native render, including the time spent in
+    /// helpers but not converting the render data.
+    ///
+    /// # Arguments
+    ///
+    /// * `reset` - Whether to start counting from zero again afterwards.
+    ///
+    /// # Returns
+    ///
+    /// Dictionary mapping template names to their `renders` and `errors`
+    /// counts, `total_ns` and `max_ns` render latency, `output_bytes`, and
+    /// `python_helper_calls` and `python_helper_ns` spent in Python helpers.
+    #[pyo3(signature = (reset = false))]
+    #[pyo3(text_signature = "($self, reset=False)")]
+    fn render_stats(&self, reset: bool) -> HashMap<String, HashMap<&'static str, u64>> {
+        self.render_stats.snapshot(reset)
+    }
+
+    /// Registers the extra helper functions.
+    ///
+    /// These helpers are not registered by default in the base template:
+    ///
+    /// - `ifEquals`
+    /// - `unlessEquals`
+    /// - `json`
+    ///
+    /// # Returns
+    ///
+    /// `None`
+    #[pyo3(text_signature = "($self)")]
+    fn register_extra_helpers(&self) -> PyResult<()> {
+        {
+            let mut state = self.state_mut();
+            let registry = state.registry_mut();
+            registry.register_helper("ifEquals", Box::new(IF_EQUALS_HELPER));
+            registry.register_helper("unlessEquals", Box::new(UNLESS_EQUALS_HELPER));
+            registry.register_helper("json", Box::new(JSON_HELPER));
+            for name in ["ifEquals", "unlessEquals", "json"] {
+                state.py_helpers.remove(name);
+            }
+        }
+        self.invalidate_template_cache();
+        Ok(())
+    }
+
+    /// Registers native implementations of the dotprompt marker helpers.
+    ///
+    /// These helpers emit the markers that `dotpromptz.parse.to_messages`
+    /// splits rendered prompts on:
+    ///
+    /// - `history`
+    /// - `media`
+    /// - `role`
+    /// - `section`
+    ///
+    /// # Returns
+    ///
+    /// `None`
+    #[pyo3(text_signature = "($self)")]
+    fn register_dotprompt_helpers(&self) -> PyResult<()> {
+        {
+            let mut state = self.state_mut();
+            let registry = state.registry_mut();
+            registry.register_helper("history", Box::new(HISTORY_HELPER));
+            registry.register_helper("media", Box::new(MEDIA_HELPER));
+            registry.register_helper("role", Box::new(ROLE_HELPER));
+            registry.register_helper("section", Box::new(SECTION_HELPER));
+            for name in ["history", "media", "role", "section"] {
+                state.py_helpers.remove(name);
+            }
+        }
+        self.invalidate_template_cache();
+        Ok(())
+    }
+}
+
+impl HandlebarrzTemplate {
+    /// Locks the engine state for reading.
+    ///
+    /// The lock must never be held while the GIL is released or reacquired:
+    /// a thread waiting for the lock may be holding the GIL.
+    fn state(&self) -> RwLockReadGuard<'_, EngineState> {
+        self.state.read().unwrap_or_else(PoisonError::into_inner)
+    }
+
+    /// Locks the engine state for modification.
+    ///
+    /// The same rules as for `state` apply.
+    fn state_mut(&self) -> RwLockWriteGuard<'_, EngineState> {
+        self.state.write().unwrap_or_else(PoisonError::into_inner)
+    }
+
+    /// Takes a snapshot of the registry to render from without holding the
+    /// state lock.
+    fn registry(&self) -> Registry {
+        self.state().registry.clone()
+    }
+
+    /// Returns the render counters of a template.
+    ///
+    /// Templates that are not registered in `registry` get counters that are
+    /// not kept, so renders of unknown names do not add entries to the stats.
+    fn template_counters(&self, registry: &Registry, name: &str) -> Arc<TemplateCounters> {
+        match registry.get_template(name) {
+            Some(_) => self.render_stats.counters(name),
+            None => Arc::default(),
+        }
+    }
+
+    /// Renders a registered template with the GIL released.
+    ///
+    /// Rendering runs entirely in Rust, so other Python threads can run while
+    /// it is in progress. Python helpers reacquire the GIL only for the
+    /// duration of their own call (see `PyHelperDef`).
+    fn render_value(
+        &self,
+        py: Python<'_>,
+        registry: &Registry,
+        name: &str,
+        data: &Value,
+    ) -> PyResult<String> {
+        let counters = self.template_counters(registry, name);
+        py.allow_threads(|| {
+            counters
+                .measure(|| registry.render(name, data), String::len)
+                .map_err(|e| e.to_string())
+        })
+        .map_err(PyValueError::new_err)
+    }
+
+    /// Renders a template string with the GIL released.
+    ///
+    /// Compiled template strings are kept in a bounded LRU cache, so sources
+    /// that are rendered repeatedly are only parsed once.
+    fn render_template_value(
+        &self,
+        py: Python<'_>,
+        registry: &Registry,
+        template_string: &str,
+        data: &Value,
+    ) -> PyResult<String> {
+        py.allow_threads(|| -> Result<String, String> {
+            let compiled = self.compile_cached(template_string)?;
+            registry
+                .render_template(&compiled.template, data)
+                .map_err(|e| e.to_string())
+        })
+        .map_err(PyValueError::new_err)
+    }
+
+    /// Returns the compiled template for a source, compiling and caching it
+    /// on a cache miss.
+    fn compile_cached(&self, source: &str) -> Result<Arc<CompiledTemplate>, String> {
+        let key = source_hash(source);
+        if let Some(compiled) = self.template_cache().get(&key) {
+            if compiled.source == source {
+                return Ok(Arc::clone(compiled));
+            }
+        }
+
+        let template = Template::compile(source).map_err(|e| e.to_string())?;
+        let compiled = Arc::new(CompiledTemplate {
+            source: source.to_string(),
+            template,
+            facts: Mutex::default(),
+        });
+        self.template_cache().put(key, Arc::clone(&compiled));
+        Ok(compiled)
+    }
+
+    /// Locks the compiled template cache.
+    fn template_cache(&self) -> MutexGuard<'_, LruCache<u64, Arc<CompiledTemplate>>> {
+        self.template_cache
+            .lock()
+            .unwrap_or_else(PoisonError::into_inner)
+    }
+
+    /// Drops all compiled template strings after helpers or partials change.
+    fn invalidate_template_cache(&self) {
+        self.template_cache().clear();
+    }
+
+    /// Returns the analysis facts of a registered template, or `None` if it
+    /// is not registered.
+    fn template_facts(&self, name: &str) -> Option<Arc<TemplateFacts>> {
+        let state = self.state();
+        let mut cache = self
+            .analysis_cache
+            .lock()
+            .unwrap_or_else(PoisonError::into_inner);
+        if cache.generation != state.generation {
+            cache.templates.clear();
+            cache.generation = state.generation;
+        }
+        if let Some(facts) = cache.templates.get(name) {
+            return facts.clone();
+        }
+        let facts = state
+            .registry
+            .get_template(name)
+            .map(|template| Arc::new(state.template_facts(template)));
+        cache.templates.insert(name.to_string(), facts.clone());
+        facts
+    }
+
+    /// Returns the analysis facts of a template string, or `None` if it
+    /// cannot be compiled.
+    ///
+    /// The facts are cached with the compiled template, until the registry
+    /// changes.
+    fn source_facts(&self, source: &str) -> Option<Arc<TemplateFacts>> {
+        let compiled = self.compile_cached(source).ok()?;
+        let state = self.state();
+        let mut cached = compiled
+            .facts
+            .lock()
+            .unwrap_or_else(PoisonError::into_inner);
+        if let Some((generation, facts)) = &*cached {
+            if *generation == state.generation {
+                return Some(facts.clone());
+            }
+        }
+        let facts = Arc::new(state.template_facts(&compiled.template));
+        *cached = Some((state.generation, facts.clone()));
+        Some(facts)
+    }
 
-        Ok(())
+    /// Locks the schedule of checks for changed template files.
+    fn reload_schedule(&self) -> MutexGuard<'_, ReloadSchedule> {
+        self.reload_schedule
+            .lock()
+            .unwrap_or_else(PoisonError::into_inner)
     }
 
-    /// Unregisters a template with the given name.
+    /// Reloads the templates whose files changed, if a check is due.
     ///
-    /// # Arguments
-    ///
-    /// * `name` - The name of the template.
+    /// Files are checked without holding the state lock, then the changes
+    /// are applied to templates that are still registered from the same
+    /// file.
     ///
-    /// # Returns
+    /// # Raises
     ///
-    /// `None`
-    #[pyo3(text_signature = "($self, name)")]
-    fn unregister_template(&mut self, name: &str) -> PyResult<()> {
-        self.registry.unregister_template(name);
+    /// `PyOSError` if a file in a template directory cannot be read.
+    /// `PyValueError` if a changed template cannot be compiled. Nothing is
+    /// reloaded in that case.
+    fn reload_changed_files(&self, py: Python<'_>) -> PyResult<()> {
+        if !self.reload_schedule().start_check(Instant::now()) {
+            return Ok(());
+        }
+        let snapshot = self.state().clone();
+        if snapshot.registry.dev_mode() {
+            return Ok(());
+        }
+        let (files, scans) = py.allow_threads(|| -> PyResult<_> {
+            let files = snapshot.scan_template_files()?;
+            let mut scans = Vec::new();
+            for key in snapshot.directories.keys() {
+                if key.0.is_dir() {
+                    scans.push((key.clone(), snapshot.scan_templates_directory(key)?));
+                }
+            }
+            Ok((files, scans))
+        })?;
+
+        let mut modified = false;
+        {
+            let mut state = self.state_mut();
+            for (name, path, fingerprint, template) in files {
+                let same_file = matches!(
+                    state.sources.get(&name),
+                    Some(TemplateSource::File(current)) if *current == path
+                );
+                if !same_file || !state.files.contains_key(&name) {
+                    continue;
+                }
+                if let Some(template) = template {
+                    state.templates_mut().register_template(&name, template);
+                    modified = true;
+                }
+                state.set_file_source(&name, path, Some(fingerprint));
+            }
+            for (key, scan) in scans {
+                if !state.directories.contains_key(&key) {
+                    continue;
+                }
+                modified |= !scan.updated.is_empty() || !scan.removed.is_empty();
+                state.apply_directory_scan(key, scan.files, scan.updated, &scan.removed)?;
+            }
+        }
+        if modified {
+            self.invalidate_template_cache();
+        }
         Ok(())
     }
 
-    /// Checks if a template with the given name exists.
-    ///
-    /// # Arguments
-    ///
-    /// * `name` - The name of the template.
-    ///
-    /// # Returns
+    /// Locks the partial resolver.
+    fn partial_resolver(&self) -> MutexGuard<'_, PartialResolver> {
+        self.partial_resolver
+            .lock()
+            .unwrap_or_else(PoisonError::into_inner)
+    }
+
+    /// Loads the partials a render needs from the partial resolver, if one
+    /// is set, and takes the snapshot of the registry to render from.
     ///
-    /// Whether the template exists.
-    #[pyo3(text_signature = "($self, name)")]
-    fn has_template(&self, name: &str) -> bool {
-        self.registry.has_template(name)
+    /// Resolved partials can be evicted by other renders as soon as they are
+    /// registered, so the partials registered for this render are added back
+    /// to its snapshot if they are missing from it.
+    fn resolve_partials(
+        &self,
+        py: Python<'_>,
+        facts: impl Fn() -> Option<Arc<TemplateFacts>>,
+    ) -> PyResult<Registry> {
+        let mut installed = Vec::new();
+        self.load_partials(py, facts, &mut installed)?;
+        let mut registry = self.registry();
+        for (name, template) in installed {
+            if !registry.has_template(&name) {
+                registry.register_template(&name, template);
+            }
+        }
+        Ok(registry)
     }
 
-    /// Renders a template with the given data.
+    /// Loads the partials a render needs from the partial resolver.
     ///
-    /// # Arguments
+    /// `facts` analyzes the template being rendered. Unknown partials it
+    /// references and expired resolved partials are passed to the resolver,
+    /// which is called with the GIL held and no lock held, and the results
+    /// are compiled and registered. Since resolved partials may reference
+    /// further unknown partials, this repeats until nothing is left to
+    /// resolve. Each partial is resolved at most once per render.
     ///
-    /// * `name` - The name of the template.
-    /// * `data` - The data to use for rendering (as JSON).
+    /// The partials that were registered are added to `installed`.
+    fn load_partials(
+        &self,
+        py: Python<'_>,
+        facts: impl Fn() -> Option<Arc<TemplateFacts>>,
+        installed: &mut Vec<(String, Template)>,
+    ) -> PyResult<()> {
+        if self.partial_resolver().resolve.is_none() {
+            return Ok(());
+        }
+        let mut attempted = HashSet::new();
+        for _ in 0..MAX_RESOLVE_ROUNDS {
+            let Some(facts) = facts() else {
+                return Ok(());
+            };
+            let (resolve, wanted) = {
+                let mut resolver = self.partial_resolver();
+                let Some(resolve) = resolver.resolve.clone() else {
+                    return Ok(());
+                };
+                let wanted = resolver.wanted(&facts, &attempted);
+                (resolve, wanted)
+            };
+            if wanted.is_empty() {
+                return Ok(());
+            }
+            for name in wanted {
+                let source: Option<String> = resolve.call1(py, (name.as_str(),))?.extract(py)?;
+                if let Some(template) = self.install_resolved_partial(&name, source.as_deref())? {
+                    installed.push((name.clone(), template));
+                }
+                attempted.insert(name);
+            }
+        }
+        Ok(())
+    }
+
+    /// Registers a partial returned by the partial resolver, or unregisters
+    /// a resolved partial that the resolver no longer finds.
     ///
     /// # Returns
     ///
-    /// Rendered template as string.
+    /// The partial, if it was registered.
     ///
     /// # Raises
     ///
-    /// `PyValueError` if the template cannot be rendered.
-    #[pyo3(text_signature = "($self, name, data)")]
-    fn render(&self, name: &str, data: &str) -> PyResult<String> {
-        let data: Value = serde_json::from_str(data)
-            .map_err(|e| PyValueError::new_err(format!("invalid JSON: {}", e)))?;
+    /// `PyValueError` if the partial cannot be compiled.
+    fn install_resolved_partial(
+        &self,
+        name: &str,
+        source: Option<&str>,
+    ) -> PyResult<Option<Template>> {
+        let template = source
+            .map(|source| registry::compile(name, source, true))
+            .transpose()
+            .map_err(|e| PyValueError::new_err(e.to_string()))?;
+        let resolved = ResolvedPartial {
+            at: Instant::now(),
+            found: template.is_some(),
+        };
 
-        self.registry
-            .render(name, &data)
-            .map_err(|e| PyValueError::new_err(e.to_string()))
+        let mut state = self.state_mut();
+        let mut resolver = self.partial_resolver();
+        if state.sources.contains_key(name) {
+            // Registered explicitly while the resolver was running.
+            resolver.resolved.remove(&name.to_string());
+            return Ok(None);
+        }
+        match &template {
+            Some(template) => state
+                .templates_mut()
+                .register_template(name, template.clone()),
+            None => state.remove_resolved_partial(name),
+        }
+        let evicted = resolver.resolved.put(name.to_string(), resolved);
+        for name in evicted {
+            state.remove_resolved_partial(&name);
+        }
+        Ok(template)
     }
 
-    /// Renders a template string directly without registering.
-    ///
-    /// # Arguments
-    ///
-    /// * `template_string` - The template source code.
-    /// * `data` - The data to use for rendering (as JSON).
-    ///
-    /// # Raises
-    ///
-    /// `PyValueError` if the template cannot be rendered.
+    /// Unregisters resolved partials and forgets them, so that they are
+    /// resolved again when next used.
     ///
     /// # Returns
     ///
-    /// Rendered template as a string.
-    #[pyo3(text_signature = "($self, template_string, data)")]
-    fn render_template(&self, template_string: &str, data: &str) -> PyResult<String> {
-        let data: Value = serde_json::from_str(data)
-            .map_err(|e| PyValueError::new_err(format!("invalid JSON: {}", e)))?;
+    /// Number of partials that were resolved.
+    fn forget_resolved_partials(&self, names: Option<Vec<String>>) -> usize {
+        let mut state = self.state_mut();
+        let mut resolver = self.partial_resolver();
+        let names = names.unwrap_or_else(|| resolver.resolved.keys().cloned().collect());
+        let mut forgotten = 0;
+        for name in names {
+            if resolver.resolved.remove(&name).is_some() {
+                state.remove_resolved_partial(&name);
+                forgotten += 1;
+            }
+        }
+        forgotten
+    }
 
-        self.registry
-            .render_template(template_string, &data)
-            .map_err(|e| PyValueError::new_err(e.to_string()))
+    /// Converts the data for a render of a registered template, projected
+    /// to what the template reads if context projection is enabled, and
+    /// layers the global data under it.
+    fn template_data(&self, name: &str, data: &Bound<'_, PyAny>) -> PyResult<Value> {
+        if !self.state().context_projection {
+            return Ok(self.with_globals(|| self.template_facts(name), py_to_json(data)?));
+        }
+        let stats = &self.projection_stats;
+        stats.renders.fetch_add(1, Ordering::Relaxed);
+        let facts = self.template_facts(name);
+        let Some(projection) = facts.as_ref().and_then(|facts| facts.projection.as_ref()) else {
+            return Ok(self.with_globals(|| facts.clone(), py_to_json(data)?));
+        };
+        let mut skipped_bytes = 0;
+        let value = py_to_json_projected(data, projection, &mut skipped_bytes)?;
+        stats.projected.fetch_add(1, Ordering::Relaxed);
+        stats
+            .bytes_saved
+            .fetch_add(skipped_bytes, Ordering::Relaxed);
+        Ok(self.with_globals(|| facts.clone(), value))
     }
 
-    /// Registers the extra helper functions.
-    ///
-    /// These helpers are not registered by default in the base template:
-    ///
-    /// - `ifEquals`
-    /// - `unlessEquals`
-    /// - `json`
-    ///
-    /// # Returns
-    ///
-    /// `None`
-    #[pyo3(text_signature = "($self)")]
-    fn register_extra_helpers(&mut self) -> PyResult<()> {
-        self.registry
-            .register_helper("ifEquals", Box::new(IF_EQUALS_HELPER));
-        self.registry
-            .register_helper("unlessEquals", Box::new(UNLESS_EQUALS_HELPER));
-        self.registry.register_helper("json", Box::new(JSON_HELPER));
-        Ok(())
+    /// Layers the global data under the data for a render.
+    ///
+    /// Each global becomes a top-level key of the data, unless the data
+    /// already has that key or is not an object. `facts` analyzes the
+    /// template being rendered and is only called if there are globals. If
+    /// the template has a known projection, only the parts of the globals it
+    /// reads are copied, whether or not context projection is enabled, since
+    /// globals need no conversion. Otherwise every global is copied whole.
+    fn with_globals(
+        &self,
+        facts: impl FnOnce() -> Option<Arc<TemplateFacts>>,
+        data: Value,
+    ) -> Value {
+        let globals = Arc::clone(&self.state().globals);
+        if globals.is_empty() {
+            return data;
+        }
+        let mut map = match data {
+            Value::Object(map) => map,
+            Value::Null => Map::new(),
+            data => return data,
+        };
+        let facts = facts();
+        let projection = facts.as_ref().and_then(|facts| facts.projection.as_ref());
+        for (key, value) in globals.iter() {
+            if map.contains_key(key) {
+                continue;
+            }
+            let value = match projection {
+                Some(projection) => match projection.child(key) {
+                    Some(child) => child.apply(value),
+                    None => continue,
+                },
+                None => Value::clone(value),
+            };
+            map.insert(key.clone(), value);
+        }
+        Value::Object(map)
+    }
+
+    /// Renders a registered template once per data value with the GIL
+    /// released, optionally splitting the values across worker threads.
+    fn render_many_values(
+        &self,
+        py: Python<'_>,
+        registry: &Registry,
+        name: &str,
+        data: &[Value],
+        parallel: bool,
+    ) -> PyResult<Vec<String>> {
+        let counters = self.template_counters(registry, name);
+        py.allow_threads(|| render_each(registry, name, data, parallel, &counters))
+            .map_err(PyValueError::new_err)
     }
 }
 
@@ -638,9 +3389,308 @@ impl HelperDef for JsonHelper {
     }
 }
 
+/// Returns the text used for a value inside a dotprompt marker.
+///
+/// Matches Python `str` of the value the Python helpers receive: strings are
+/// used verbatim, and other values are formatted like the Python `None`,
+/// `bool`, `int`, `float`, `list` and `dict` they convert to. Non-ASCII
+/// characters above U+00FF inside lists and dicts are assumed printable, so
+/// the rare ones Python `repr` escapes are written as is.
+fn marker_text(value: &Value) -> Cow<'_, str> {
+    match value {
+        Value::String(s) => Cow::Borrowed(s),
+        other => {
+            let mut out = String::new();
+            write_python_repr(other, &mut out);
+            Cow::Owned(out)
+        }
+    }
+}
+
+/// Appends the Python `repr` of a JSON value to `out`.
+fn write_python_repr(value: &Value, out: &mut String) {
+    match value {
+        Value::Null => out.push_str("None"),
+        Value::Bool(true) => out.push_str("True"),
+        Value::Bool(false) => out.push_str("False"),
+        Value::Number(n) => match n.as_f64() {
+            Some(f) if n.is_f64() => write_python_float(f, out),
+            _ => out.push_str(&n.to_string()),
+        },
+        Value::String(s) => write_python_str_repr(s, out),
+        Value::Array(items) => {
+            out.push('[');
+            for (i, item) in items.iter().enumerate() {
+                if i > 0 {
+                    out.push_str(", ");
+                }
+                write_python_repr(item, out);
+            }
+            out.push(']');
+        }
+        Value::Object(map) => {
+            out.push('{');
+            for (i, (key, item)) in map.iter().enumerate() {
+                if i > 0 {
+                    out.push_str(", ");
+                }
+                write_python_str_repr(key, out);
+                out.push_str(": ");
+                write_python_repr(item, out);
+            }
+            out.push('}');
+        }
+    }
+}
+
+/// Appends the Python `repr` of a finite float to `out`.
+///
+/// Like Python, this uses the shortest digits that round-trip, in scientific
+/// notation if the decimal exponent is below -4 or at least 16.
+fn write_python_float(f: f64, out: &mut String) {
+    let (digits, exponent) = shortest_digits(f.abs());
+
+    if f.is_sign_negative() {
+        out.push('-');
+    }
+    if !(-4..16).contains(&exponent) {
+        out.push_str(&digits[..1]);
+        if digits.len() > 1 {
+            out.push('.');
+            out.push_str(&digits[1..]);
+        }
+        let sign = if exponent < 0 { '-' } else { '+' };
+        out.push_str(&format!("e{sign}{:02}", exponent.abs()));
+    } else if exponent < 0 {
+        out.push_str("0.");
+        out.extend(std::iter::repeat('0').take((-exponent - 1) as usize));
+        out.push_str(&digits);
+    } else {
+        let int_len = exponent as usize + 1;
+        if digits.len() > int_len {
+            out.push_str(&digits[..int_len]);
+            out.push('.');
+            out.push_str(&digits[int_len..]);
+        } else {
+            out.push_str(&digits);
+            out.extend(std::iter::repeat('0').take(int_len - digits.len()));
+            out.push_str(".0");
+        }
+    }
+}
+
+/// Returns the shortest significant digits that round-trip a non-negative
+/// float, and the decimal exponent of the first digit.
+///
+/// If the float lies exactly halfway between the two shortest candidates,
+/// the one ending in an even digit is returned, as Python does.
+fn shortest_digits(f: f64) -> (String, i32) {
+    let split = |formatted: String| -> (String, i32) {
+        let (mantissa, exponent) = formatted.split_once('e').unwrap_or((&formatted, "0"));
+        (
+            mantissa.chars().filter(|c| *c != '.').collect(),
+            exponent.parse().unwrap_or(0),
+        )
+    };
+    let (digits, exponent) = split(format!("{f:e}"));
+
+    // A double has at most 767 significant decimal digits, so this is exact.
+    let (exact, exact_exponent) = split(format!("{f:.767e}"));
+    let exact = exact.trim_end_matches('0');
+    if exact_exponent == exponent && exact.len() == digits.len() + 1 && exact.ends_with('5') {
+        let truncated = &exact[..digits.len()];
+        if truncated.ends_with(['0', '2', '4', '6', '8']) {
+            return (truncated.to_owned(), exponent);
+        }
+    }
+    (digits, exponent)
+}
+
+/// Appends the Python `repr` of a string to `out`.
+fn write_python_str_repr(s: &str, out: &mut String) {
+    let quote = if s.contains('\'') && !s.contains('"') {
+        '"'
+    } else {
+        '\''
+    };
+    out.push(quote);
+    for c in s.chars() {
+        match c {
+            '\\' => out.push_str("\\\\"),
+            '\t' => out.push_str("\\t"),
+            '\n' => out.push_str("\\n"),
+            '\r' => out.push_str("\\r"),
+            c if c == quote => {
+                out.push('\\');
+                out.push(c);
+            }
+            c if c.is_control() || c == '\u{a0}' || c == '\u{ad}' => {
+                out.push_str(&format!("\\x{:02x}", c as u32));
+            }
+            c => out.push(c),
+        }
+    }
+    out.push(quote);
+}
+
+/// Whether a value is falsy by Python truthiness rules.
+fn is_falsy(value: &Value) -> bool {
+    match value {
+        Value::Null => true,
+        Value::Bool(b) => !b,
+        Value::Number(n) => n.as_f64() == Some(0.0),
+        Value::String(s) => s.is_empty(),
+        Value::Array(items) => items.is_empty(),
+        Value::Object(map) => map.is_empty(),
+    }
+}
+
+/// Helper that emits a dotprompt role marker.
+///
+/// ## Usage
+///
+/// ```handlebars
+/// {{role "system"}}
+/// ```
+///
+/// ## Parameters
+///
+/// * `role`: The role of the messages that follow the marker.
+///
+/// Renders `<<<dotprompt:role:system>>>`, or nothing if no role is given.
+#[derive(Clone, Copy, Debug)]
+pub struct RoleHelper {}
+
+impl HelperDef for RoleHelper {
+    fn call<'reg: 'rc, 'rc>(
+        &self,
+        h: &Helper<'rc>,
+        _reg: &'reg Handlebars<'reg>,
+        _ctx: &'rc Context,
+        _rc: &mut RenderContext<'reg, 'rc>,
+        out: &mut dyn Output,
+    ) -> Result<(), RenderError> {
+        if let Some(role) = h.param(0) {
+            out.write("<<<dotprompt:role:")?;
+            out.write(&marker_text(role.value()))?;
+            out.write(">>>")?;
+        }
+        Ok(())
+    }
+}
+
+/// Helper that emits a dotprompt history marker.
+///
+/// ## Usage
+///
+/// ```handlebars
+/// {{history}}
+/// ```
+///
+/// Renders `<<<dotprompt:history>>>`.
+#[derive(Clone, Copy, Debug)]
+pub struct HistoryHelper {}
+
+impl HelperDef for HistoryHelper {
+    fn call<'reg: 'rc, 'rc>(
+        &self,
+        _h: &Helper<'rc>,
+        _reg: &'reg Handlebars<'reg>,
+        _ctx: &'rc Context,
+        _rc: &mut RenderContext<'reg, 'rc>,
+        out: &mut dyn Output,
+    ) -> Result<(), RenderError> {
+        out.write("<<<dotprompt:history>>>")?;
+        Ok(())
+    }
+}
+
+/// Helper that emits a dotprompt section marker.
+///
+/// ## Usage
+///
+/// ```handlebars
+/// {{section "output"}}
+/// ```
+///
+/// ## Parameters
+///
+/// * `name`: The name of the section.
+///
+/// Renders `<<<dotprompt:section output>>>`, or nothing if no name is given.
+#[derive(Clone, Copy, Debug)]
+pub struct SectionHelper {}
+
+impl HelperDef for SectionHelper {
+    fn call<'reg: 'rc, 'rc>(
+        &self,
+        h: &Helper<'rc>,
+        _reg: &'reg Handlebars<'reg>,
+        _ctx: &'rc Context,
+        _rc: &mut RenderContext<'reg, 'rc>,
+        out: &mut dyn Output,
+    ) -> Result<(), RenderError> {
+        if let Some(name) = h.param(0) {
+            out.write("<<<dotprompt:section ")?;
+            out.write(&marker_text(name.value()))?;
+            out.write(">>>")?;
+        }
+        Ok(())
+    }
+}
+
+/// Helper that emits a dotprompt media marker.
+///
+/// ## Usage
+///
+/// ```handlebars
+/// {{media url="https://example.com/image.png" contentType="image/png"}}
+/// ```
+///
+/// ## Hash Arguments
+///
+/// * `url`: The URL of the media.
+/// * `contentType`: Optional. The MIME type of the media.
+///
+/// Renders `<<<dotprompt:media:url https://example.com/image.png image/png>>>`,
+/// or nothing if no URL is given.
+#[derive(Clone, Copy, Debug)]
+pub struct MediaHelper {}
+
+impl HelperDef for MediaHelper {
+    fn call<'reg: 'rc, 'rc>(
+        &self,
+        h: &Helper<'rc>,
+        _reg: &'reg Handlebars<'reg>,
+        _ctx: &'rc Context,
+        _rc: &mut RenderContext<'reg, 'rc>,
+        out: &mut dyn Output,
+    ) -> Result<(), RenderError> {
+        let url = match h.hash_get("url").map(|p| p.value()) {
+            Some(url) if !is_falsy(url) => url,
+            _ => return Ok(()),
+        };
+
+        out.write("<<<dotprompt:media:url ")?;
+        out.write(&marker_text(url))?;
+        if let Some(content_type) = h.hash_get("contentType").map(|p| p.value()) {
+            if !is_falsy(content_type) {
+                out.write(" ")?;
+                out.write(&marker_text(content_type))?;
+            }
+        }
+        out.write(">>>")?;
+        Ok(())
+    }
+}
+
 static IF_EQUALS_HELPER: IfEqualsHelper = IfEqualsHelper {};
 static UNLESS_EQUALS_HELPER: UnlessEqualsHelper = UnlessEqualsHelper {};
 static JSON_HELPER: JsonHelper = JsonHelper {};
+static ROLE_HELPER: RoleHelper = RoleHelper {};
+static HISTORY_HELPER: HistoryHelper = HistoryHelper {};
+static SECTION_HELPER: SectionHelper = SectionHelper {};
+static MEDIA_HELPER: MediaHelper = MediaHelper {};
 
 #[cfg(test)]
 mod test {
@@ -752,4 +3802,46 @@ mod test {
             .unwrap();
         assert_eq!(rendered_empty, "{}");
     }
+
+    #[test]
+    fn test_dotprompt_helpers() {
+        let mut handlebars = Handlebars::new();
+        handlebars.register_helper("role", Box::new(ROLE_HELPER));
+        handlebars.register_helper("history", Box::new(HISTORY_HELPER));
+        handlebars.register_helper("section", Box::new(SECTION_HELPER));
+        handlebars.register_helper("media", Box::new(MEDIA_HELPER));
+
+        let render = |source: &str, data: &Value| handlebars.render_template(source, data).unwrap();
+
+        assert_eq!(
+            render("{{role \"system\"}}", &json!({})),
+            "<<<dotprompt:role:system>>>"
+        );
+        assert_eq!(render("{{role}}", &json!({})), "");
+        assert_eq!(render("{{history}}", &json!({})), "<<<dotprompt:history>>>");
+        assert_eq!(
+            render("{{section \"output\"}}", &json!({})),
+            "<<<dotprompt:section output>>>"
+        );
+        assert_eq!(render("{{section}}", &json!({})), "");
+
+        // Markers are never HTML escaped.
+        assert_eq!(
+            render("{{media url=url}}", &json!({"url": "https://a/b?c=1&d=2"})),
+            "<<<dotprompt:media:url https://a/b?c=1&d=2>>>"
+        );
+        assert_eq!(
+            render(
+                "{{media url=url contentType=type}}",
+                &json!({"url": "http://a/b/c", "type": "image/jpeg"})
+            ),
+            "<<<dotprompt:media:url http://a/b/c image/jpeg>>>"
+        );
+        assert_eq!(
+            render("{{media url=url contentType=\"\"}}", &json!({"url": "u"})),
+            "<<<dotprompt:media:url u>>>"
+        );
+        assert_eq!(render("{{media}}", &json!({})), "");
+        assert_eq!(render("{{media url=\"\"}}", &json!({})), "");
+    }
 }
@@ -0,0 +1,213 @@
+// Copyright 2025 Google LLC
+// SPDX-License-Identifier: Apache-2.0
+
+//! A small bounded least-recently-used cache with hit/miss accounting.
+
+use std::collections::{BTreeMap, HashMap};
+use std::hash::Hash;
+
+/// Counters describing how a cache has been used.
+#[derive(Clone, Copy, Debug, Default, PartialEq, Eq)]
+pub struct CacheStats {
+    /// Number of lookups that found an entry.
+    pub hits: u64,
+    /// Number of lookups that did not find an entry.
+    pub misses: u64,
+    /// Number of entries dropped to stay within capacity.
+    pub evictions: u64,
+}
+
+/// A bounded map that evicts the least recently used entry when full.
+///
+/// Recency is tracked with a monotonically increasing tick per access, so
+/// lookups, insertions and evictions are all `O(log n)`. A capacity of zero
+/// disables the cache: nothing is stored and every lookup is a miss.
+#[derive(Clone)]
+pub struct LruCache<K, V> {
+    capacity: usize,
+    entries: HashMap<K, (V, u64)>,
+    order: BTreeMap<u64, K>,
+    tick: u64,
+    stats: CacheStats,
+}
+
+impl<K: Hash + Eq + Clone, V> LruCache<K, V> {
+    /// Creates an empty cache holding at most `capacity` entries.
+    pub fn new(capacity: usize) -> Self {
+        Self {
+            capacity,
+            entries: HashMap::new(),
+            order: BTreeMap::new(),
+            tick: 0,
+            stats: CacheStats::default(),
+        }
+    }
+
+    /// Looks up an entry and marks it as the most recently used.
+    pub fn get(&mut self, key: &K) -> Option<&V> {
+        match self.entries.get_mut(key) {
+            Some((value, last_used)) => {
+                self.order.remove(&*last_used);
+                self.tick += 1;
+                *last_used = self.tick;
+                self.order.insert(self.tick, key.clone());
+                self.stats.hits += 1;
+                Some(&*value)
+            }
+            None => {
+                self.stats.misses += 1;
+                None
+            }
+        }
+    }
+
+    /// Whether the cache holds an entry for `key`. Does not count as a use.
+    pub fn contains(&self, key: &K) -> bool {
+        self.entries.contains_key(key)
+    }
+
+    /// Inserts or replaces an entry, evicting old entries if needed.
+    ///
+    /// Returns the keys of the evicted entries.
+    pub fn put(&mut self, key: K, value: V) -> Vec<K> {
+        if self.capacity == 0 {
+            return vec![key];
+        }
+        if let Some((_, last_used)) = self.entries.remove(&key) {
+            self.order.remove(&last_used);
+        }
+        self.tick += 1;
+        self.order.insert(self.tick, key.clone());
+        self.entries.insert(key, (value, self.tick));
+        self.evict_to(self.capacity)
+    }
+
+    /// Removes an entry, returning its value if it was present.
+    pub fn remove(&mut self, key: &K) -> Option<V> {
+        let (value, last_used) = self.entries.remove(key)?;
+        self.order.remove(&last_used);
+        Some(value)
+    }
+
+    /// Removes all entries. Usage counters are kept.
+    pub fn clear(&mut self) {
+        self.entries.clear();
+        self.order.clear();
+    }
+
+    /// Changes the capacity, evicting entries if the cache is now too full.
+    ///
+    /// Returns the keys of the evicted entries.
+    pub fn set_capacity(&mut self, capacity: usize) -> Vec<K> {
+        self.capacity = capacity;
+        self.evict_to(capacity)
+    }
+
+    /// The maximum number of entries.
+    pub fn capacity(&self) -> usize {
+        self.capacity
+    }
+
+    /// The current number of entries.
+    pub fn len(&self) -> usize {
+        self.entries.len()
+    }
+
+    /// Whether the cache holds no entries.
+    pub fn is_empty(&self) -> bool {
+        self.entries.is_empty()
+    }
+
+    /// Usage counters since creation or the last `reset_stats`.
+    pub fn stats(&self) -> CacheStats {
+        self.stats
+    }
+
+    /// Resets the usage counters.
+    pub fn reset_stats(&mut self) {
+        self.stats = CacheStats::default();
+    }
+
+    /// Iterates over the keys, least recently used first.
+    pub fn keys(&self) -> impl Iterator<Item = &K> {
+        self.order.values()
+    }
+
+    fn evict_to(&mut self, size: usize) -> Vec<K> {
+        let mut evicted = Vec::new();
+        while self.entries.len() > size {
+            match self.order.pop_first() {
+                Some((_, key)) => {
+                    self.entries.remove(&key);
+                    self.stats.evictions += 1;
+                    evicted.push(key);
+                }
+                None => break,
+            }
+        }
+        evicted
+    }
+}
+
+#[cfg(test)]
+mod test {
+    use super::*;
+
+    #[test]
+    fn test_evicts_least_recently_used() {
+        let mut cache = LruCache::new(2);
+        cache.put("a", 1);
+        cache.put("b", 2);
+        assert_eq!(cache.get(&"a"), Some(&1));
+
+        assert_eq!(cache.put("c", 3), vec!["b"]);
+
+        assert!(!cache.contains(&"b"));
+        assert_eq!(cache.get(&"b"), None);
+        assert_eq!(cache.get(&"a"), Some(&1));
+        assert_eq!(cache.get(&"c"), Some(&3));
+        assert_eq!(
+            cache.stats(),
+            CacheStats {
+                hits: 3,
+                misses: 1,
+                evictions: 1
+            }
+        );
+    }
+
+    #[test]
+    fn test_replace_and_remove() {
+        let mut cache = LruCache::new(2);
+        cache.put("a", 1);
+        cache.put("a", 2);
+        assert_eq!(cache.len(), 1);
+        assert_eq!(cache.get(&"a"), Some(&2));
+
+        assert_eq!(cache.remove(&"a"), Some(2));
+        assert_eq!(cache.remove(&"a"), None);
+        assert_eq!(cache.len(), 0);
+    }
+
+    #[test]
+    fn test_set_capacity() {
+        let mut cache = LruCache::new(3);
+        cache.put(1, "a");
+        cache.put(2, "b");
+        cache.put(3, "c");
+
+        assert_eq!(cache.set_capacity(1), vec![1, 2]);
+
+        assert_eq!(cache.len(), 1);
+        assert_eq!(cache.keys().collect::<Vec<_>>(), vec![&3]);
+        assert_eq!(cache.stats().evictions, 2);
+    }
+
+    #[test]
+    fn test_zero_capacity_disables_cache() {
+        let mut cache = LruCache::new(0);
+        assert_eq!(cache.put("a", 1), vec!["a"]);
+        assert_eq!(cache.len(), 0);
+        assert_eq!(cache.get(&"a"), None);
+    }
+}
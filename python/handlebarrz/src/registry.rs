@@ -0,0 +1,239 @@
+// Copyright 2025 Google LLC
+// SPDX-License-Identifier: Apache-2.0
+
+//! A template registry that forks and renders share template by template.
+//!
+//! A handlebars registry owns its templates, so sharing one copy-on-write
+//! means that the first template registered by a fork, or while a render
+//! holds a snapshot, copies every template of the registry. `Registry`
+//! instead keeps templates registered while the registry is shared in an
+//! overlay of individually shared templates. Renders pass the overlay as
+//! partials of the render context, where they shadow the templates of the
+//! shared registry. The overlay is folded into the registry once it is no
+//! longer shared, or when it grows large enough that copying the registry
+//! once is cheaper than passing the overlay to every render.
+
+use handlebars::{
+    Context, Handlebars, Output, RenderContext, RenderError, Renderable, Template, TemplateError,
+};
+use serde_json::Value;
+use std::collections::HashMap;
+use std::io;
+use std::sync::Arc;
+
+use crate::analysis::Lookup;
+use crate::StringWriter;
+
+/// Number of overlay templates above which the overlay is folded into a
+/// copy of the shared registry.
+const MAX_OVERLAY_LEN: usize = 64;
+
+/// The templates, partials, helpers and settings of an engine.
+///
+/// Cloning a registry is cheap: clones share the handlebars registry and
+/// every template in the overlay.
+#[derive(Clone)]
+pub struct Registry {
+    /// Helpers, settings and templates.
+    base: Arc<Handlebars<'static>>,
+    /// Templates registered while `base` was shared, by name. They shadow
+    /// the templates of `base`.
+    overlay: Arc<HashMap<String, Arc<Template>>>,
+}
+
+impl Registry {
+    pub fn new() -> Self {
+        Registry {
+            base: Arc::new(Handlebars::new()),
+            overlay: Arc::default(),
+        }
+    }
+
+    /// Returns the handlebars registry for changes to helpers or settings,
+    /// first copying it if it is shared and folding the overlay into it.
+    pub fn handlebars_mut(&mut self) -> &mut Handlebars<'static> {
+        let base = Arc::make_mut(&mut self.base);
+        let overlay = Arc::unwrap_or_clone(std::mem::take(&mut self.overlay));
+        for (name, template) in overlay {
+            base.register_template(&name, Arc::unwrap_or_clone(template));
+        }
+        base
+    }
+
+    /// Returns whether templates are registered in the overlay rather than
+    /// in the handlebars registry.
+    ///
+    /// That is the case while the handlebars registry is shared, except in
+    /// dev mode, where the handlebars registry reloads template files and so
+    /// must own every template.
+    fn uses_overlay(&mut self) -> bool {
+        Arc::get_mut(&mut self.base).is_none() && !self.base.dev_mode()
+    }
+
+    /// Registers a compiled template.
+    pub fn register_template(&mut self, name: &str, template: Template) {
+        if self.uses_overlay() {
+            Arc::make_mut(&mut self.overlay).insert(name.to_string(), Arc::new(template));
+            if self.overlay.len() > MAX_OVERLAY_LEN {
+                self.handlebars_mut();
+            }
+        } else {
+            self.handlebars_mut().register_template(name, template);
+        }
+    }
+
+    /// Compiles and registers a template, like
+    /// `Handlebars::register_template_string`.
+    pub fn register_template_string(
+        &mut self,
+        name: &str,
+        source: &str,
+    ) -> Result<(), TemplateError> {
+        if self.uses_overlay() {
+            let template = compile(name, source, false)?;
+            self.register_template(name, template);
+            Ok(())
+        } else {
+            self.handlebars_mut().register_template_string(name, source)
+        }
+    }
+
+    /// Compiles and registers a partial, like `Handlebars::register_partial`.
+    pub fn register_partial(&mut self, name: &str, source: &str) -> Result<(), TemplateError> {
+        if self.uses_overlay() {
+            let template = compile(name, source, true)?;
+            self.register_template(name, template);
+            Ok(())
+        } else {
+            self.handlebars_mut().register_partial(name, source)
+        }
+    }
+
+    /// Unregisters a template.
+    ///
+    /// A template of a shared handlebars registry cannot be hidden from
+    /// renders by the overlay, so unregistering one copies the registry.
+    pub fn unregister_template(&mut self, name: &str) {
+        if self.uses_overlay() && !self.base.has_template(name) {
+            if self.overlay.contains_key(name) {
+                Arc::make_mut(&mut self.overlay).remove(name);
+            }
+        } else {
+            self.handlebars_mut().unregister_template(name);
+        }
+    }
+
+    /// Returns the template or partial registered under `name`.
+    pub fn get_template(&self, name: &str) -> Option<&Template> {
+        match self.overlay.get(name) {
+            Some(template) => Some(template),
+            None => self.base.get_template(name),
+        }
+    }
+
+    pub fn has_template(&self, name: &str) -> bool {
+        self.overlay.contains_key(name) || self.base.has_template(name)
+    }
+
+    pub fn dev_mode(&self) -> bool {
+        self.base.dev_mode()
+    }
+
+    pub fn strict_mode(&self) -> bool {
+        self.base.strict_mode()
+    }
+
+    /// Renders a registered template.
+    pub fn render(&self, name: &str, data: &Value) -> Result<String, RenderError> {
+        match self.overlay_template(name) {
+            Some(template) => self.render_template(template, data),
+            None => self.base.render(name, data),
+        }
+    }
+
+    /// Renders a registered template to a writer.
+    pub fn render_to_write<W: io::Write>(
+        &self,
+        name: &str,
+        data: &Value,
+        writer: W,
+    ) -> Result<(), RenderError> {
+        match self.overlay_template(name) {
+            Some(template) => self.render_to_output(template, data, &mut WriteOutput(writer)),
+            None => self.base.render_to_write(name, data, writer),
+        }
+    }
+
+    /// Renders an already compiled template with the helpers and partials
+    /// of the registry.
+    pub fn render_template(
+        &self,
+        template: &Template,
+        data: &Value,
+    ) -> Result<String, RenderError> {
+        let mut out = StringWriter::default();
+        self.render_to_output(template, data, &mut out)?;
+        Ok(out.buf)
+    }
+
+    /// Returns the template to render `name` from when there is an overlay.
+    ///
+    /// Without an overlay, or if `name` is not registered at all, renders
+    /// are left to the handlebars registry, which then behaves (and reports
+    /// missing templates) exactly as it does on its own.
+    fn overlay_template(&self, name: &str) -> Option<&Template> {
+        if self.overlay.is_empty() {
+            None
+        } else {
+            self.get_template(name)
+        }
+    }
+
+    fn render_to_output(
+        &self,
+        template: &Template,
+        data: &Value,
+        out: &mut dyn Output,
+    ) -> Result<(), RenderError> {
+        let ctx = Context::wraps(data)?;
+        let mut rc = RenderContext::new(template.name.as_ref());
+        for (name, partial) in self.overlay.iter() {
+            rc.set_partial(name.clone(), partial);
+        }
+        template.render(&self.base, &ctx, &mut rc, out)
+    }
+}
+
+impl Lookup for Registry {
+    fn has_helper(&self, name: &str) -> bool {
+        self.base.get_helper(name).is_some()
+    }
+
+    fn get_template(&self, name: &str) -> Option<&Template> {
+        Registry::get_template(self, name)
+    }
+}
+
+/// Compiles a template or partial the way the handlebars registry does when
+/// it registers one from source.
+pub fn compile(name: &str, source: &str, partial: bool) -> Result<Template, TemplateError> {
+    let mut scratch = Handlebars::new();
+    if partial {
+        scratch.register_partial(name, source)?;
+    } else {
+        scratch.register_template_string(name, source)?;
+    }
+    Ok(scratch
+        .get_template(name)
+        .cloned()
+        .expect("template was just registered"))
+}
+
+/// An `Output` that writes rendered text to an `io::Write`.
+struct WriteOutput<W>(W);
+
+impl<W: io::Write> Output for WriteOutput<W> {
+    fn write(&mut self, seg: &str) -> Result<(), io::Error> {
+        self.0.write_all(seg.as_bytes())
+    }
+}
@@ -0,0 +1,271 @@
+// Copyright 2025 Google LLC
+// SPDX-License-Identifier: Apache-2.0
+
+//! Binary snapshot format for registered template sources.
+//!
+//! A snapshot holds one entry per template or partial:
+//!
+//! ```text
+//! magic       8 bytes  "HBRZSNP3"
+//! count       u32
+//! entries     count times:
+//!   name      u32 length + UTF-8 bytes
+//!   kind      u8 0 for a template, 1 for a partial
+//!   path      u32 length + UTF-8 bytes, or u32::MAX if the entry has no file
+//!   file_len  u64 size of the file, only if the entry has a file
+//!   modified  u64 modification time of the file in nanoseconds since the
+//!             Unix epoch, or u64::MAX if unknown, only if the entry has a file
+//!   hash      u64 content hash of the source
+//!   source    u32 length + UTF-8 bytes
+//! ```
+//!
+//! All integers are little-endian. Decoding borrows names and sources from
+//! the input buffer instead of copying them.
+
+/// Identifies a snapshot file and its format version.
+pub const MAGIC: &[u8; 8] = b"HBRZSNP3";
+
+/// Length marker for an entry without a file path.
+const NO_PATH: u32 = u32::MAX;
+
+/// Marker for a file whose modification time is unknown.
+const NO_MODIFIED: u64 = u64::MAX;
+
+/// Kind byte of an entry registered as a template.
+const KIND_TEMPLATE: u8 = 0;
+
+/// Kind byte of an entry registered as a partial.
+const KIND_PARTIAL: u8 = 1;
+
+/// The file a template in a snapshot was loaded from.
+#[derive(Clone, Copy, Debug, PartialEq, Eq)]
+pub struct SnapshotFile<'a> {
+    /// The path of the file.
+    pub path: &'a str,
+    /// The size of the file when the snapshot was written.
+    pub len: u64,
+    /// The modification time of the file when the snapshot was written, in
+    /// nanoseconds since the Unix epoch.
+    pub modified: Option<u64>,
+}
+
+/// A template source stored in a snapshot.
+#[derive(Clone, Debug, PartialEq, Eq)]
+pub struct SnapshotEntry<'a> {
+    /// The name the template is registered under.
+    pub name: &'a str,
+    /// Whether the source was registered as a partial, which is compiled
+    /// with different whitespace handling than a template.
+    pub partial: bool,
+    /// The file the template was loaded from, if any.
+    pub file: Option<SnapshotFile<'a>>,
+    /// `content_hash` of `source` when the snapshot was written.
+    pub hash: u64,
+    /// The template source.
+    pub source: &'a str,
+}
+
+/// Computes a content hash of a template source that is stable across
+/// processes, platforms and compiler versions (64-bit FNV-1a).
+pub fn content_hash(source: &str) -> u64 {
+    const OFFSET_BASIS: u64 = 0xcbf2_9ce4_8422_2325;
+    const PRIME: u64 = 0x0000_0100_0000_01b3;
+    source.bytes().fold(OFFSET_BASIS, |hash, byte| {
+        (hash ^ u64::from(byte)).wrapping_mul(PRIME)
+    })
+}
+
+/// Encodes snapshot entries into a byte buffer.
+pub fn encode(entries: &[SnapshotEntry<'_>]) -> Result<Vec<u8>, String> {
+    let size = entries
+        .iter()
+        .map(|e| 21 + e.name.len() + e.file.map_or(0, |f| 16 + f.path.len()) + e.source.len())
+        .sum::<usize>();
+    let mut buf = Vec::with_capacity(MAGIC.len() + 4 + size);
+    buf.extend_from_slice(MAGIC);
+    put_len(&mut buf, entries.len())?;
+    for entry in entries {
+        put_str(&mut buf, entry.name)?;
+        buf.push(if entry.partial {
+            KIND_PARTIAL
+        } else {
+            KIND_TEMPLATE
+        });
+        match entry.file {
+            Some(file) => {
+                put_str(&mut buf, file.path)?;
+                buf.extend_from_slice(&file.len.to_le_bytes());
+                buf.extend_from_slice(&file.modified.unwrap_or(NO_MODIFIED).to_le_bytes());
+            }
+            None => buf.extend_from_slice(&NO_PATH.to_le_bytes()),
+        }
+        buf.extend_from_slice(&entry.hash.to_le_bytes());
+        put_str(&mut buf, entry.source)?;
+    }
+    Ok(buf)
+}
+
+/// Decodes a snapshot, checking every source against its stored hash.
+pub fn decode(bytes: &[u8]) -> Result<Vec<SnapshotEntry<'_>>, String> {
+    let mut reader = Reader { bytes, pos: 0 };
+    if reader.take(MAGIC.len())? != MAGIC {
+        return Err("not a handlebarrz snapshot".to_string());
+    }
+
+    let count = reader.u32()? as usize;
+    let mut entries = Vec::with_capacity(count.min(bytes.len() / 20));
+    for _ in 0..count {
+        let name = reader.str()?;
+        let partial = match reader.u8()? {
+            KIND_TEMPLATE => false,
+            KIND_PARTIAL => true,
+            kind => return Err(format!("unknown snapshot entry kind {}", kind)),
+        };
+        let file = match reader.u32()? {
+            NO_PATH => None,
+            len => Some(SnapshotFile {
+                path: reader.str_of_len(len as usize)?,
+                len: reader.u64()?,
+                modified: Some(reader.u64()?).filter(|&modified| modified != NO_MODIFIED),
+            }),
+        };
+        let hash = reader.u64()?;
+        let source = reader.str()?;
+        if content_hash(source) != hash {
+            return Err(format!("snapshot entry '{}' is corrupt", name));
+        }
+        entries.push(SnapshotEntry {
+            name,
+            partial,
+            file,
+            hash,
+            source,
+        });
+    }
+
+    if reader.pos != bytes.len() {
+        return Err("trailing data after snapshot entries".to_string());
+    }
+    Ok(entries)
+}
+
+fn put_len(buf: &mut Vec<u8>, len: usize) -> Result<(), String> {
+    match u32::try_from(len) {
+        Ok(len) if len != NO_PATH => {
+            buf.extend_from_slice(&len.to_le_bytes());
+            Ok(())
+        }
+        _ => Err(format!("snapshot field too large: {} bytes", len)),
+    }
+}
+
+fn put_str(buf: &mut Vec<u8>, s: &str) -> Result<(), String> {
+    put_len(buf, s.len())?;
+    buf.extend_from_slice(s.as_bytes());
+    Ok(())
+}
+
+/// Bounds-checked cursor over a snapshot buffer.
+struct Reader<'a> {
+    bytes: &'a [u8],
+    pos: usize,
+}
+
+impl<'a> Reader<'a> {
+    fn take(&mut self, len: usize) -> Result<&'a [u8], String> {
+        let end = self
+            .pos
+            .checked_add(len)
+            .filter(|&end| end <= self.bytes.len())
+            .ok_or_else(|| "truncated snapshot".to_string())?;
+        let slice = &self.bytes[self.pos..end];
+        self.pos = end;
+        Ok(slice)
+    }
+
+    fn u8(&mut self) -> Result<u8, String> {
+        Ok(self.take(1)?[0])
+    }
+
+    fn u32(&mut self) -> Result<u32, String> {
+        let bytes = self.take(4)?;
+        Ok(u32::from_le_bytes(bytes.try_into().unwrap()))
+    }
+
+    fn u64(&mut self) -> Result<u64, String> {
+        let bytes = self.take(8)?;
+        Ok(u64::from_le_bytes(bytes.try_into().unwrap()))
+    }
+
+    fn str(&mut self) -> Result<&'a str, String> {
+        let len = self.u32()? as usize;
+        self.str_of_len(len)
+    }
+
+    fn str_of_len(&mut self, len: usize) -> Result<&'a str, String> {
+        std::str::from_utf8(self.take(len)?).map_err(|e| format!("invalid snapshot text: {}", e))
+    }
+}
+
+#[cfg(test)]
+mod test {
+    use super::*;
+
+    fn entry<'a>(name: &'a str, path: Option<&'a str>, source: &'a str) -> SnapshotEntry<'a> {
+        SnapshotEntry {
+            name,
+            partial: false,
+            file: path.map(|path| SnapshotFile {
+                path,
+                len: source.len() as u64,
+                modified: (!path.is_empty()).then_some(1_700_000_000_123_456_789),
+            }),
+            hash: content_hash(source),
+            source,
+        }
+    }
+
+    #[test]
+    fn test_round_trip() {
+        let entries = vec![
+            entry("greeting", None, "Hello {{name}}!"),
+            entry("footer", Some("partials/footer.hbs"), "— ✓"),
+            entry("empty", Some(""), ""),
+            SnapshotEntry {
+                partial: true,
+                ..entry("row", None, "{{#each rows}}\n{{this}}\n{{/each}}\n")
+            },
+        ];
+
+        let bytes = encode(&entries).unwrap();
+
+        assert_eq!(decode(&bytes).unwrap(), entries);
+    }
+
+    #[test]
+    fn test_content_hash_is_stable() {
+        assert_eq!(content_hash(""), 0xcbf2_9ce4_8422_2325);
+        assert_eq!(content_hash("a"), 0xaf63_dc4c_8601_ec8c);
+    }
+
+    #[test]
+    fn test_rejects_bad_input() {
+        let bytes = encode(&[entry("a", None, "{{x}}")]).unwrap();
+
+        assert!(decode(b"not a snapshot").is_err());
+        assert!(decode(&bytes[..bytes.len() - 1]).is_err());
+
+        let mut trailing = bytes.clone();
+        trailing.push(0);
+        assert!(decode(&trailing).is_err());
+
+        let mut bad_kind = bytes.clone();
+        bad_kind[MAGIC.len() + 4 + 4 + 1] = 2;
+        assert!(decode(&bad_kind).unwrap_err().contains("kind"));
+
+        let mut corrupt = bytes.clone();
+        let last = corrupt.len() - 1;
+        corrupt[last] = b'y';
+        assert!(decode(&corrupt).unwrap_err().contains("corrupt"));
+    }
+}
@@ -0,0 +1,200 @@
+// Copyright 2025 Google LLC
+// SPDX-License-Identifier: Apache-2.0
+
+//! Per-template render counters.
+//!
+//! Counters are atomics behind a map that is only write-locked the first
+//! time a template is rendered, so recording a render costs two clock reads
+//! and a handful of relaxed atomic adds. Time spent in Python helpers is
+//! accumulated in a thread-local by the helpers themselves and attributed
+//! to the render running on the same thread. Native helpers are not
+//! counted separately; their time is part of the render time.
+
+use std::cell::Cell;
+use std::collections::HashMap;
+use std::sync::atomic::{AtomicU64, Ordering};
+use std::sync::{Arc, PoisonError, RwLock};
+use std::time::{Duration, Instant};
+
+thread_local! {
+    /// Number of Python helper calls and nanoseconds spent in them on this
+    /// thread, ever.
+    static HELPER_USAGE: Cell<(u64, u64)> = const { Cell::new((0, 0)) };
+}
+
+/// Records a call to a Python helper that took `elapsed`.
+pub fn record_python_helper_call(elapsed: Duration) {
+    HELPER_USAGE.with(|usage| {
+        let (calls, nanos) = usage.get();
+        usage.set((calls + 1, nanos + as_nanos(elapsed)));
+    });
+}
+
+fn as_nanos(duration: Duration) -> u64 {
+    u64::try_from(duration.as_nanos()).unwrap_or(u64::MAX)
+}
+
+/// Counters for the renders of one template.
+#[derive(Debug, Default)]
+pub struct TemplateCounters {
+    renders: AtomicU64,
+    errors: AtomicU64,
+    total_ns: AtomicU64,
+    max_ns: AtomicU64,
+    output_bytes: AtomicU64,
+    python_helper_calls: AtomicU64,
+    python_helper_ns: AtomicU64,
+}
+
+impl TemplateCounters {
+    /// Runs one render on the current thread and records it.
+    ///
+    /// `output_len` gives the size in bytes of the output of a successful
+    /// render.
+    pub fn measure<T, E>(
+        &self,
+        render: impl FnOnce() -> Result<T, E>,
+        output_len: impl FnOnce(&T) -> usize,
+    ) -> Result<T, E> {
+        let (calls_before, python_helper_ns_before) = HELPER_USAGE.with(Cell::get);
+        let start = Instant::now();
+        let result = render();
+        let elapsed = as_nanos(start.elapsed());
+        let (calls_after, python_helper_ns_after) = HELPER_USAGE.with(Cell::get);
+
+        self.renders.fetch_add(1, Ordering::Relaxed);
+        self.total_ns.fetch_add(elapsed, Ordering::Relaxed);
+        self.max_ns.fetch_max(elapsed, Ordering::Relaxed);
+        self.python_helper_calls
+            .fetch_add(calls_after - calls_before, Ordering::Relaxed);
+        self.python_helper_ns.fetch_add(
+            python_helper_ns_after - python_helper_ns_before,
+            Ordering::Relaxed,
+        );
+        match &result {
+            Ok(output) => {
+                self.output_bytes
+                    .fetch_add(output_len(output) as u64, Ordering::Relaxed);
+            }
+            Err(_) => {
+                self.errors.fetch_add(1, Ordering::Relaxed);
+            }
+        }
+        result
+    }
+
+    /// Reads the counters.
+    pub fn snapshot(&self) -> HashMap<&'static str, u64> {
+        let load = |counter: &AtomicU64| counter.load(Ordering::Relaxed);
+        HashMap::from([
+            ("renders", load(&self.renders)),
+            ("errors", load(&self.errors)),
+            ("total_ns", load(&self.total_ns)),
+            ("max_ns", load(&self.max_ns)),
+            ("output_bytes", load(&self.output_bytes)),
+            ("python_helper_calls", load(&self.python_helper_calls)),
+            ("python_helper_ns", load(&self.python_helper_ns)),
+        ])
+    }
+}
+
+/// Render counters of all templates of an engine, by template name.
+#[derive(Debug, Default)]
+pub struct RenderStats {
+    templates: RwLock<HashMap<String, Arc<TemplateCounters>>>,
+}
+
+impl RenderStats {
+    /// Returns the counters of a template, creating them on first use.
+    pub fn counters(&self, name: &str) -> Arc<TemplateCounters> {
+        if let Some(counters) = self
+            .templates
+            .read()
+            .unwrap_or_else(PoisonError::into_inner)
+            .get(name)
+        {
+            return Arc::clone(counters);
+        }
+        let mut templates = self
+            .templates
+            .write()
+            .unwrap_or_else(PoisonError::into_inner);
+        Arc::clone(templates.entry(name.to_string()).or_default())
+    }
+
+    /// Reads the counters of all rendered templates, starting over from
+    /// zero if `reset` is set.
+    ///
+    /// Renders still in progress during a reset are not counted.
+    pub fn snapshot(&self, reset: bool) -> HashMap<String, HashMap<&'static str, u64>> {
+        let snapshot = |templates: &HashMap<String, Arc<TemplateCounters>>| {
+            templates
+                .iter()
+                .map(|(name, counters)| (name.clone(), counters.snapshot()))
+                .collect()
+        };
+        if reset {
+            let mut templates = self
+                .templates
+                .write()
+                .unwrap_or_else(PoisonError::into_inner);
+            snapshot(&std::mem::take(&mut *templates))
+        } else {
+            snapshot(
+                &self
+                    .templates
+                    .read()
+                    .unwrap_or_else(PoisonError::into_inner),
+            )
+        }
+    }
+}
+
+#[cfg(test)]
+mod tests {
+    use super::*;
+
+    #[test]
+    fn test_measure_records_renders() {
+        let counters = TemplateCounters::default();
+
+        let ok: Result<String, ()> = counters.measure(|| Ok("abc".to_string()), String::len);
+        let err: Result<String, ()> = counters.measure(|| Err(()), String::len);
+
+        assert_eq!(ok, Ok("abc".to_string()));
+        assert_eq!(err, Err(()));
+        let snapshot = counters.snapshot();
+        assert_eq!(snapshot["renders"], 2);
+        assert_eq!(snapshot["errors"], 1);
+        assert_eq!(snapshot["output_bytes"], 3);
+        assert!(snapshot["max_ns"] <= snapshot["total_ns"]);
+    }
+
+    #[test]
+    fn test_helper_calls_are_attributed_to_the_render() {
+        let counters = TemplateCounters::default();
+        record_python_helper_call(Duration::from_nanos(5));
+
+        let _: Result<(), ()> = counters.measure(
+            || {
+                record_python_helper_call(Duration::from_nanos(7));
+                record_python_helper_call(Duration::from_nanos(11));
+                Ok(())
+            },
+            |_| 0,
+        );
+
+        let snapshot = counters.snapshot();
+        assert_eq!(snapshot["python_helper_calls"], 2);
+        assert_eq!(snapshot["python_helper_ns"], 18);
+    }
+
+    #[test]
+    fn test_snapshot_reset() {
+        let stats = RenderStats::default();
+        let _: Result<(), ()> = stats.counters("a").measure(|| Ok(()), |_| 0);
+
+        assert_eq!(stats.snapshot(true)["a"]["renders"], 1);
+        assert!(stats.snapshot(false).is_empty());
+    }
+}
@@ -0,0 +1,102 @@
+# Copyright 2025 Google LLC
+# SPDX-License-Identifier: Apache-2.0
+
+"""Tests for static template analysis."""
+
+import unittest
+from typing import Any
+
+import pytest
+
+from handlebarrz import Template
+
+
+def shout(params: list[Any], hash: dict[str, Any], ctx: dict[str, Any]) -> str:
+    """Helper that upper-cases its first parameter."""
+    return str(params[0]).upper()
+
+
+class AnalyzeTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.template = Template()
+
+    def analyze(self, source: str) -> Any:
+        self.template.register_template('t', source)
+        return self.template.analyze('t')
+
+    def test_plain_paths(self) -> None:
+        """Test that variable references are reported as paths."""
+        result = self.analyze('{{title}} {{user.name}} {{{user.[home page]}}}')
+
+        self.assertEqual(
+            result['paths'], ['title', 'user.[home page]', 'user.name']
+        )
+        self.assertEqual(result['helpers'], [])
+        self.assertTrue(result['complete'])
+
+    def test_each_and_with_scopes(self) -> None:
+        """Test that paths are resolved through block contexts."""
+        result = self.analyze(
+            '{{#each items as |item idx|}}'
+            '{{name}} {{item.id}} {{idx}} {{@index}} {{../title}}'
+            '{{else}}{{empty}}{{/each}}'
+            '{{#with user}}{{email}} {{@root.year}}{{/with}}'
+        )
+
+        self.assertEqual(
+            result['paths'],
+            [
+                'empty',
+                'items',
+                'items.*.id',
+                'items.*.name',
+                'title',
+                'user',
+                'user.email',
+                'year',
+            ],
+        )
+        self.assertEqual(result['helpers'], ['each', 'with'])
+
+    def test_helper_params_and_subexpressions(self) -> None:
+        """Test that helper arguments are paths and helpers are reported."""
+        self.template.register_helper('shout', shout)
+
+        result = self.analyze(
+            '{{#if (eq kind "a")}}{{shout name}}{{/if}}{{missing x=flag}}'
+        )
+
+        self.assertEqual(result['paths'], ['flag', 'kind', 'name'])
+        self.assertEqual(result['helpers'], ['eq', 'if', 'missing', 'shout'])
+        self.assertEqual(result['unknown_helpers'], ['missing'])
+
+    def test_partials_are_followed(self) -> None:
+        """Test that partials are analyzed in the context they render in."""
+        self.template.register_partial('card', '{{title}} {{@root.site}}')
+
+        result = self.analyze('{{#each posts}}{{> card}}{{/each}}{{> other}}')
+
+        self.assertEqual(result['paths'], ['posts', 'posts.*.title', 'site'])
+        self.assertEqual(result['partials'], ['card', 'other'])
+        self.assertEqual(result['missing_partials'], ['other'])
+        self.assertFalse(result['complete'])
+
+    def test_recursive_partial_is_incomplete(self) -> None:
+        """Test that recursive partials mark the analysis incomplete."""
+        self.template.register_partial(
+            'node', '{{name}}{{#each children}}{{> node}}{{/each}}'
+        )
+
+        result = self.analyze('{{> node tree}}')
+
+        self.assertIn('tree.children.*.name', result['paths'])
+        self.assertFalse(result['complete'])
+
+    def test_unknown_template(self) -> None:
+        """Test that analyzing an unregistered template raises."""
+        with pytest.raises(ValueError):
+            self.template.analyze('nope')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,154 @@
+# Copyright 2025 Google LLC
+# SPDX-License-Identifier: Apache-2.0
+
+"""Tests for projecting render data to what a template reads."""
+
+import io
+import unittest
+from typing import Any
+
+import pytest
+
+from handlebarrz import Template
+
+
+def echo(params: list[Any], hash: dict[str, Any], ctx: dict[str, Any]) -> str:
+    """Helper that renders the keys of the context it receives."""
+    return ','.join(sorted(ctx))
+
+
+class ContextProjectionTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.template = Template()
+        self.template.context_projection = True
+        self.data: dict[str, Any] = {
+            'user': {'name': 'Ada', 'history': ['x' * 100] * 10},
+            'orders': [
+                {'id': 1, 'lines': [{'sku': 'a'}] * 5},
+                {'id': 2, 'lines': []},
+            ],
+            'unused': object(),
+        }
+
+    def test_disabled_by_default(self) -> None:
+        """Test that projection is opt-in."""
+        self.assertFalse(Template().context_projection)
+
+    def test_only_read_paths_are_converted(self) -> None:
+        """Test that unread values are skipped, even if not serializable."""
+        self.template.register_template(
+            'page', '{{user.name}}:{{#each orders}}{{id}} {{/each}}'
+        )
+
+        self.assertEqual(self.template.render('page', self.data), 'Ada:1 2 ')
+        stats = self.template.context_projection_stats()
+        self.assertEqual(stats['renders'], 1)
+        self.assertEqual(stats['projected'], 1)
+        self.assertGreater(stats['bytes_saved'], 1000)
+
+        self.template.context_projection = False
+        with pytest.raises(TypeError):
+            self.template.render('page', self.data)
+
+    def test_output_matches_full_render(self) -> None:
+        """Test that projection does not change rendered output."""
+        source = (
+            '{{#with user}}{{name}}{{/with}}'
+            '{{#each orders as |order|}}{{order.id}}:'
+            '{{#if lines}}+{{else}}-{{/if}}{{lookup ../user "name"}}{{/each}}'
+            '{{#with missing}}x{{else}}none{{/with}}'
+        )
+        data = {k: v for k, v in self.data.items() if k != 'unused'}
+        full = Template()
+        full.register_template('page', source)
+        self.template.register_template('page', source)
+
+        self.assertEqual(
+            self.template.render('page', data), full.render('page', data)
+        )
+        self.assertEqual(
+            self.template.context_projection_stats()['projected'], 1
+        )
+
+    def test_output_matches_full_render_for_indirect_contexts(self) -> None:
+        """Test inline partials, partial blocks and subexpression contexts."""
+        data = {
+            'name': 'root',
+            'items': [{'id': 'a', 'name': 'first'}, {'id': 'b', 'name': 'x'}],
+            'labels': {'a': {'label': 'A'}, 'b': {'label': 'B'}},
+        }
+        cases = {
+            '{{#*inline "row"}}{{name}};{{/inline}}'
+            '{{#each items}}{{> row}}{{/each}}': 'first;x;',
+            '{{#> layout}}{{name}}{{/layout}}': '[first][x]',
+            '{{#each items}}{{#with (lookup ../labels id)}}'
+            '{{label}}{{../name}};{{/with}}{{/each}}': None,
+        }
+        for source, expected in cases.items():
+            with self.subTest(source=source):
+                rendered = []
+                for projection in (True, False):
+                    template = Template()
+                    template.context_projection = projection
+                    template.register_partial(
+                        'layout',
+                        '{{#each items}}[{{> @partial-block}}]{{/each}}',
+                    )
+                    template.register_template('page', source)
+                    rendered.append(template.render('page', data))
+
+                self.assertEqual(rendered[0], rendered[1])
+                if expected is not None:
+                    self.assertEqual(rendered[0], expected)
+
+    def test_with_keeps_nonempty_objects_truthy(self) -> None:
+        """Test that a `#with` context never becomes an empty object."""
+        self.template.register_template(
+            'page', '{{#with user}}[{{nickname}}]{{else}}none{{/with}}'
+        )
+
+        self.assertEqual(self.template.render('page', self.data), '[]')
+
+    def test_partials_are_followed(self) -> None:
+        """Test that paths read by partials are kept."""
+        self.template.register_partial('name', '{{user.name}}')
+        self.template.register_template('page', 'Hi {{> name}}')
+
+        self.assertEqual(self.template.render('page', self.data), 'Hi Ada')
+
+        self.template.register_partial('name', '{{orders.[1].id}}')
+
+        self.assertEqual(self.template.render('page', self.data), 'Hi 2')
+
+    def test_context_helpers_get_all_data(self) -> None:
+        """Test that helpers reading the context disable projection."""
+        self.template.register_helper('echo', echo)
+        self.template.register_template('page', '{{echo}}')
+        data = {'a': 1, 'b': 2}
+
+        self.assertEqual(self.template.render('page', data), 'a,b')
+        stats = self.template.context_projection_stats()
+        self.assertEqual(stats['renders'], 1)
+        self.assertEqual(stats['projected'], 0)
+
+    def test_render_many_and_render_to(self) -> None:
+        """Test that batch and streaming renders are projected too."""
+        self.template.register_template('page', '{{user.name}}')
+        out = io.StringIO()
+
+        rendered = self.template.render_many('page', [self.data] * 3)
+        self.template.render_to('page', self.data, out)
+
+        self.assertEqual(rendered, ['Ada'] * 3)
+        self.assertEqual(out.getvalue(), 'Ada')
+        self.assertEqual(
+            self.template.context_projection_stats()['projected'], 4
+        )
+
+    def test_fork_inherits_setting(self) -> None:
+        """Test that forks keep the projection setting."""
+        self.assertTrue(self.template.fork().context_projection)
+
+
+if __name__ == '__main__':
+    unittest.main()
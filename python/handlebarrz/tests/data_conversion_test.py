@@ -0,0 +1,99 @@
+# Copyright 2025 Google LLC
+# SPDX-License-Identifier: Apache-2.0
+
+"""Tests for converting Python render data into native JSON values."""
+
+import unittest
+from typing import Any
+
+import pytest
+
+from handlebarrz import Template
+
+
+class DataConversionTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.template = Template()
+
+    def render(self, source: str, data: Any) -> str:
+        return self.template.render_template(source, data)
+
+    def test_scalars(self) -> None:
+        """Test that scalar values render like their JSON equivalents."""
+        data = {'s': 'text', 'i': 42, 'f': 1.5, 't': True, 'f2': False}
+        result = self.render('{{s}} {{i}} {{f}} {{t}} {{f2}}', data)
+        self.assertEqual(result, 'text 42 1.5 true false')
+
+    def test_none_is_falsy(self) -> None:
+        """Test that None converts to null."""
+        result = self.render('{{#if v}}yes{{else}}no{{/if}}', {'v': None})
+        self.assertEqual(result, 'no')
+
+    def test_large_integers(self) -> None:
+        """Test that integers beyond i64 but within u64 are supported."""
+        result = self.render('{{n}}', {'n': 2**64 - 1})
+        self.assertEqual(result, str(2**64 - 1))
+
+    def test_integers_beyond_64_bits(self) -> None:
+        """Test that integers that do not fit in 64 bits become floats."""
+        result = self.render('{{n}} {{m}}', {'n': 2**80, 'm': -(2**70)})
+        self.assertEqual(
+            [float(n) for n in result.split()], [float(2**80), -float(2**70)]
+        )
+
+    def test_integer_out_of_range(self) -> None:
+        """Test that integers that do not fit in a float are rejected."""
+        with pytest.raises(ValueError):
+            self.render('{{n}}', {'n': 10**400})
+
+    def test_nested_lists_and_tuples(self) -> None:
+        """Test that lists and tuples both convert to arrays."""
+        data = {'rows': [(1, 2), [3, 4]]}
+        result = self.render(
+            '{{#each rows}}{{#each this}}{{this}}{{/each}};{{/each}}', data
+        )
+        self.assertEqual(result, '12;34;')
+
+    def test_non_string_keys(self) -> None:
+        """Test that non-string keys are converted like json.dumps does."""
+        data = {'m': {2: 'two', False: 'no', None: 'nil'}}
+        result = self.render(
+            '{{lookup m "2"}} {{lookup m "false"}} {{lookup m "null"}}', data
+        )
+        self.assertEqual(result, 'two no nil')
+
+    def test_unserializable_value(self) -> None:
+        """Test that unsupported values raise TypeError."""
+        with pytest.raises(TypeError):
+            self.render('{{v}}', {'v': object()})
+
+    def test_unserializable_key(self) -> None:
+        """Test that unsupported keys raise TypeError."""
+        with pytest.raises(TypeError):
+            self.render('{{v}}', {'v': {(1, 2): 'pair'}})
+
+    def test_nan_is_rejected(self) -> None:
+        """Test that non-finite floats are rejected."""
+        with pytest.raises(ValueError):
+            self.render('{{v}}', {'v': float('nan')})
+
+    def test_circular_reference(self) -> None:
+        """Test that circular references raise instead of recursing."""
+        data: dict[str, Any] = {}
+        data['self'] = data
+        with pytest.raises(ValueError):
+            self.render('{{v}}', data)
+
+    def test_matches_json_path(self) -> None:
+        """Test that both data paths render identical output."""
+        import json
+
+        from handlebarrz._native import HandlebarrzTemplate
+
+        engine = HandlebarrzTemplate()
+        engine.register_template('t', '{{#each items}}{{name}}={{v}},{{/each}}')
+        data = {'items': [{'name': 'a', 'v': 1}, {'name': 'b', 'v': [1, 2]}]}
+
+        self.assertEqual(
+            engine.render('t', data), engine.render_json('t', json.dumps(data))
+        )
@@ -0,0 +1,80 @@
+# Copyright 2025 Google LLC
+# SPDX-License-Identifier: Apache-2.0
+
+"""Tests for the native dotprompt marker helpers."""
+
+import unittest
+
+from handlebarrz import Template
+
+
+class DotpromptHelpersTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.template = Template()
+        self.template.register_dotprompt_helpers()
+
+    def test_role(self) -> None:
+        """Test that role renders a role marker."""
+        result = self.template.render_template('{{role "system"}}', {})
+        self.assertEqual(result, '<<<dotprompt:role:system>>>')
+
+    def test_role_without_params(self) -> None:
+        """Test that role renders nothing without a role."""
+        self.assertEqual(self.template.render_template('{{role}}', {}), '')
+
+    def test_history(self) -> None:
+        """Test that history renders a history marker."""
+        result = self.template.render_template('{{history}}', {})
+        self.assertEqual(result, '<<<dotprompt:history>>>')
+
+    def test_section(self) -> None:
+        """Test that section renders a section marker."""
+        result = self.template.render_template('{{section "output"}}', {})
+        self.assertEqual(result, '<<<dotprompt:section output>>>')
+
+    def test_section_without_params(self) -> None:
+        """Test that section renders nothing without a name."""
+        self.assertEqual(self.template.render_template('{{section}}', {}), '')
+
+    def test_media(self) -> None:
+        """Test that media renders a media marker with a content type."""
+        result = self.template.render_template(
+            '{{media url=url contentType=contentType}}',
+            {'url': 'https://a/b.png?x=1&y=2', 'contentType': 'image/png'},
+        )
+        self.assertEqual(
+            result,
+            '<<<dotprompt:media:url https://a/b.png?x=1&y=2 image/png>>>',
+        )
+
+    def test_media_without_content_type(self) -> None:
+        """Test that media omits a missing content type."""
+        result = self.template.render_template('{{media url="http://a/b"}}', {})
+        self.assertEqual(result, '<<<dotprompt:media:url http://a/b>>>')
+
+    def test_media_without_url(self) -> None:
+        """Test that media renders nothing without a URL."""
+        self.assertEqual(self.template.render_template('{{media}}', {}), '')
+
+    def test_markers_in_prompt(self) -> None:
+        """Test a prompt mixing several markers and variables."""
+        result = self.template.render_template(
+            '{{role "system"}}Be brief.{{role "user"}}{{question}}{{history}}',
+            {'question': 'Why?'},
+        )
+        self.assertEqual(
+            result,
+            '<<<dotprompt:role:system>>>Be brief.'
+            '<<<dotprompt:role:user>>>Why?<<<dotprompt:history>>>',
+        )
+
+    def test_non_string_params(self) -> None:
+        """Test that non-string params are formatted like Python str."""
+        values = [True, None, 1, 1.0, 1e16, 2.5e-05, ['a', 1], {'k': "it's"}]
+        result = self.template.render_template(
+            '{{#each values}}{{section this}}{{/each}}', {'values': values}
+        )
+        self.assertEqual(
+            result,
+            ''.join(f'<<<dotprompt:section {value}>>>' for value in values),
+        )
@@ -0,0 +1,122 @@
+# Copyright 2025 Google LLC
+# SPDX-License-Identifier: Apache-2.0
+
+"""Tests for forking a configured template engine."""
+
+import io
+import unittest
+from typing import Any
+
+from handlebarrz import EscapeFunction, Template
+
+
+def shout(params: list[Any], hash: dict[str, Any], ctx: dict[str, Any]) -> str:
+    """Helper that upper-cases its first parameter."""
+    return str(params[0]).upper()
+
+
+class ForkTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.base = Template()
+        self.base.register_partial('footer', 'bye')
+        self.base.register_template('page', '{{shout name}} {{> footer}}')
+        self.base.register_helper('shout', shout)
+
+    def test_fork_renders_parent_templates(self) -> None:
+        """Test that a fork can render everything the parent registered."""
+        child = self.base.fork()
+
+        self.assertEqual(child.render('page', {'name': 'hi'}), 'HI bye')
+
+    def test_fork_inherits_settings(self) -> None:
+        """Test that a fork starts with the parent's settings."""
+        self.base.strict_mode = True
+        self.base.set_escape_function(EscapeFunction.NO_ESCAPE)
+
+        child = self.base.fork()
+
+        self.assertTrue(child.strict_mode)
+        self.assertEqual(child.render_template('{{x}}', {'x': '<b>'}), '<b>')
+
+    def test_child_overrides_are_private(self) -> None:
+        """Test that changes made on a fork do not leak into the parent."""
+        child = self.base.fork()
+
+        child.register_partial('footer', 'ciao')
+        child.register_template('extra', 'x')
+
+        self.assertEqual(child.render('page', {'name': 'a'}), 'A ciao')
+        self.assertEqual(self.base.render('page', {'name': 'a'}), 'A bye')
+        self.assertFalse(self.base.has_template('extra'))
+
+    def test_parent_changes_are_private(self) -> None:
+        """Test that changes made on the parent do not leak into a fork."""
+        child = self.base.fork()
+
+        self.base.unregister_template('page')
+        self.base.strict_mode = True
+
+        self.assertTrue(child.has_template('page'))
+        self.assertFalse(child.strict_mode)
+
+    def test_forks_are_independent(self) -> None:
+        """Test that sibling forks do not see each other's changes."""
+        first = self.base.fork()
+        second = self.base.fork()
+
+        first.register_partial('footer', 'one')
+        second.register_partial('footer', 'two')
+
+        self.assertEqual(first.render('page', {'name': 'a'}), 'A one')
+        self.assertEqual(second.render('page', {'name': 'a'}), 'A two')
+
+    def test_fork_of_fork(self) -> None:
+        """Test that forks can themselves be forked."""
+        child = self.base.fork()
+        child.register_partial('footer', 'child')
+
+        grandchild = child.fork()
+
+        self.assertIsInstance(grandchild, Template)
+        self.assertEqual(grandchild.render('page', {'name': 'a'}), 'A child')
+
+    def test_overrides_apply_to_every_render(self) -> None:
+        """Test that overridden partials are used by all render methods."""
+        child = self.base.fork()
+        child.register_partial('footer', 'ciao')
+        out = io.StringIO()
+
+        child.render_to('page', {'name': 'a'}, out)
+
+        self.assertEqual(out.getvalue(), 'A ciao')
+        self.assertEqual(
+            child.render_many('page', [{'name': 'a'}] * 2), ['A ciao'] * 2
+        )
+        self.assertEqual(child.render_template('[{{> footer}}]', {}), '[ciao]')
+
+    def test_many_overrides_and_removals(self) -> None:
+        """Test overriding and unregistering many templates in a fork."""
+        for i in range(100):
+            self.base.register_partial(f'p{i}', f'base{i}')
+        child = self.base.fork()
+
+        for i in range(100):
+            child.register_partial(f'p{i}', f'child{i}')
+        child.register_template('extra', 'x')
+        child.unregister_template('extra')
+        child.unregister_template('p0')
+
+        self.assertEqual(child.render_template('{{> p99}}', {}), 'child99')
+        self.assertFalse(child.has_template('extra'))
+        self.assertFalse(child.has_template('p0'))
+        self.assertEqual(self.base.render_template('{{> p99}}', {}), 'base99')
+        self.assertTrue(self.base.has_template('p0'))
+
+    def test_settings_keep_overrides(self) -> None:
+        """Test that changing a setting after an override keeps it."""
+        child = self.base.fork()
+        child.register_partial('footer', 'ciao')
+
+        child.strict_mode = True
+
+        self.assertEqual(child.render('page', {'name': 'a'}), 'A ciao')
@@ -0,0 +1,130 @@
+# Copyright 2025 Google LLC
+# SPDX-License-Identifier: Apache-2.0
+
+"""Tests for global data layered under every render."""
+
+import unittest
+from typing import Any
+
+import pytest
+
+from handlebarrz import Template
+
+
+class GlobalsTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.template = Template()
+        self.template.set_global(
+            'catalog', {'items': [{'sku': 'a', 'price': 1}], 'currency': 'EUR'}
+        )
+        self.template.register_template(
+            'price',
+            '{{#each catalog.items}}{{sku}}={{price}}{{@root.catalog.currency}}'
+            ' for {{../name}}{{/each}}',
+        )
+
+    def test_globals_are_visible_to_renders(self) -> None:
+        """Test that globals are readable as top-level keys and via @root."""
+        result = self.template.render('price', {'name': 'Ada'})
+
+        self.assertEqual(result, 'a=1EUR for Ada')
+        self.assertEqual(
+            self.template.render_template('{{catalog.currency}}', {}), 'EUR'
+        )
+        self.assertEqual(
+            self.template._template.render_json('price', '{"name": "Bo"}'),
+            'a=1EUR for Bo',
+        )
+
+    def test_render_data_takes_precedence(self) -> None:
+        """Test that render data shadows a global with the same name."""
+        result = self.template.render(
+            'price', {'name': 'Ada', 'catalog': {'items': [], 'currency': 'X'}}
+        )
+
+        self.assertEqual(result, '')
+
+    def test_update_global(self) -> None:
+        """Test that updating a global only replaces the given keys."""
+        self.template.update_global('catalog', {'currency': 'USD'})
+        self.template.update_global('flags', {'beta': True})
+
+        self.assertEqual(
+            self.template.render('price', {'name': 'Ada'}), 'a=1USD for Ada'
+        )
+        self.assertEqual(
+            self.template.render_template('{{flags.beta}}', {}), 'true'
+        )
+
+    def test_update_non_object_global_raises(self) -> None:
+        """Test that only object globals can be updated."""
+        self.template.set_global('motd', 'hello')
+
+        with pytest.raises(ValueError):
+            self.template.update_global('motd', {'x': 1})
+
+    def test_drop_global(self) -> None:
+        """Test that dropped globals are no longer visible."""
+        self.assertEqual(self.template.global_names(), ['catalog'])
+
+        self.assertTrue(self.template.drop_global('catalog'))
+        self.assertFalse(self.template.drop_global('catalog'))
+
+        self.assertEqual(self.template.global_names(), [])
+        self.assertEqual(self.template.render('price', {'name': 'Ada'}), '')
+
+    def test_forks_share_then_diverge(self) -> None:
+        """Test that forks inherit globals but changes stay private."""
+        child = self.template.fork()
+        child.set_global('catalog', {'items': [], 'currency': 'GBP'})
+
+        self.assertEqual(child.render('price', {'name': 'Ada'}), '')
+        self.assertEqual(
+            self.template.render('price', {'name': 'Ada'}), 'a=1EUR for Ada'
+        )
+
+    def test_projection_with_globals(self) -> None:
+        """Test that globals work together with context projection."""
+        self.template.context_projection = True
+
+        self.assertEqual(
+            self.template.render('price', {'name': 'Ada', 'x': object()}),
+            'a=1EUR for Ada',
+        )
+
+    def test_partial_reads_of_globals(self) -> None:
+        """Test that templates reading part of a global render the same."""
+        source = '{{catalog.currency}}:{{#each catalog.items}}{{sku}}{{/each}}'
+        self.template.register_template('partial_read', source)
+
+        for projection in (False, True):
+            with self.subTest(projection=projection):
+                self.template.context_projection = projection
+                self.assertEqual(
+                    self.template.render('partial_read', {}), 'EUR:a'
+                )
+                self.assertEqual(
+                    self.template.render_template(source, {}), 'EUR:a'
+                )
+
+    def test_context_helpers_see_whole_globals(self) -> None:
+        """Test that helpers receiving the context get globals whole."""
+
+        def keys(
+            params: list[Any], hash: dict[str, Any], ctx: dict[str, Any]
+        ) -> str:
+            return ','.join(sorted(ctx['catalog']))
+
+        self.template.register_helper('keys', keys)
+        self.template.register_template('keys', '{{catalog.currency}} {{keys}}')
+
+        self.assertEqual(self.template.render('keys', {}), 'EUR currency,items')
+
+    def test_unserializable_global_raises(self) -> None:
+        """Test that globals must be JSON serializable."""
+        with pytest.raises(TypeError):
+            self.template.set_global('bad', object())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -235,3 +235,48 @@ class HelpersTest(unittest.TestCase):
             "<script>alert('test');</script>",
             result_helper,
         )
+
+    def test_helper_receives_native_values(self) -> None:
+        """Test that helper arguments keep their Python types."""
+        template = Template()
+        received: list[Any] = []
+
+        def capture_helper(
+            params: list[Any],
+            hash_args: dict[str, Any],
+            context: dict[str, Any],
+        ) -> str:
+            received.extend([params, hash_args])
+            return ''
+
+        template.register_helper('capture', capture_helper)
+        template.register_template(
+            'capture-test', '{{capture 1 2.5 true null obj flag=false n=3}}'
+        )
+        template.render('capture-test', {'obj': {'a': [1, 'b']}})
+
+        params, hash_args = received
+        self.assertEqual(params, [1, 2.5, True, None, {'a': [1, 'b']}])
+        self.assertIsInstance(params[0], int)
+        self.assertEqual(hash_args, {'flag': False, 'n': 3})
+
+    def test_helper_without_context(self) -> None:
+        """Test that helpers registered without context get an empty dict."""
+        template = Template()
+        contexts: list[dict[str, Any]] = []
+
+        def context_helper(
+            params: list[Any],
+            hash_args: dict[str, Any],
+            context: dict[str, Any],
+        ) -> str:
+            contexts.append(context)
+            return str(params[0])
+
+        template.register_helper('echo', context_helper, needs_context=False)
+        template.register_template('echo-test', '{{echo name}}')
+
+        result = template.render('echo-test', {'name': 'John'})
+
+        self.assertEqual(result, 'John')
+        self.assertEqual(contexts, [{}])
@@ -0,0 +1,165 @@
+# Copyright 2025 Google LLC
+# SPDX-License-Identifier: Apache-2.0
+
+"""Tests for resolving partials on demand."""
+
+import unittest
+
+import pytest
+
+from handlebarrz import Template
+
+
+class PartialResolverTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.template = Template()
+        self.partials = {
+            'name': '{{user.name}}',
+            'card': '[{{> name}}]',
+        }
+        self.calls: list[str] = []
+
+    def resolve(self, name: str) -> str | None:
+        self.calls.append(name)
+        return self.partials.get(name)
+
+    def test_resolved_once_on_first_use(self) -> None:
+        """Test that a partial is resolved on first use and then reused."""
+        self.template.set_partial_resolver(self.resolve)
+        self.template.register_template('page', 'Hi {{> name}}')
+        data = {'user': {'name': 'Ada'}}
+
+        self.assertEqual(self.template.render('page', data), 'Hi Ada')
+        self.assertEqual(self.template.render('page', data), 'Hi Ada')
+        self.assertEqual(self.calls, ['name'])
+        stats = self.template.resolved_partial_stats()
+        self.assertEqual(stats['size'], 1)
+        self.assertEqual(stats['capacity'], 256)
+
+    def test_nested_partials(self) -> None:
+        """Test that partials used by resolved partials are resolved too."""
+        self.template.set_partial_resolver(self.resolve)
+        self.template.register_template('page', '{{> card}}')
+
+        self.assertEqual(
+            self.template.render('page', {'user': {'name': 'Ada'}}), '[Ada]'
+        )
+        self.assertEqual(self.calls, ['card', 'name'])
+
+    def test_unknown_partial(self) -> None:
+        """Test that partials the resolver does not find stay missing."""
+        self.template.set_partial_resolver(self.resolve)
+        self.template.register_template('page', '{{> nope}}')
+
+        for _ in range(2):
+            with pytest.raises(ValueError):
+                self.template.render('page', {})
+        self.assertEqual(self.calls, ['nope'])
+
+    def test_ttl_expiry(self) -> None:
+        """Test that partials are resolved again once their TTL expires."""
+        self.template.set_partial_resolver(self.resolve, ttl=0)
+        self.template.register_template('page', '{{> name}}')
+        data = {'user': {'name': 'Ada'}}
+
+        self.template.render('page', data)
+        self.partials['name'] = '{{user.name}}!'
+
+        self.assertEqual(self.template.render('page', data), 'Ada!')
+        self.assertEqual(self.calls, ['name', 'name'])
+
+    def test_size_eviction(self) -> None:
+        """Test that the least recently used partials are evicted."""
+        self.template.set_partial_resolver(self.resolve, max_size=1)
+        self.partials['other'] = 'other'
+        self.template.register_template('a', '{{> name}}')
+        self.template.register_template('b', '{{> other}}')
+        data = {'user': {'name': 'Ada'}}
+
+        self.template.render('a', data)
+        self.template.render('b', data)
+        self.template.render('a', data)
+
+        self.assertEqual(self.calls, ['name', 'other', 'name'])
+        self.assertEqual(self.template.resolved_partial_stats()['evictions'], 2)
+
+    def test_eviction_during_render(self) -> None:
+        """Test that a render keeps partials evicted while resolving."""
+        self.template.set_partial_resolver(self.resolve, max_size=1)
+        self.template.register_template('page', '{{> card}}')
+        data = {'user': {'name': 'Ada'}}
+
+        self.assertEqual(self.template.render('page', data), '[Ada]')
+        self.assertEqual(
+            self.template.render_template('<{{> card}}>', data), '<[Ada]>'
+        )
+        self.assertFalse(self.template.has_template('card'))
+
+    def test_resolved_partials_render_like_registered_ones(self) -> None:
+        """Test that resolved partials are compiled as partials."""
+        source = '{{#each items}}\n  - {{this}}\n{{/each}}\n'
+        page = 'Items:\n  {{> list}}\nend'
+        data = {'items': ['a', 'b']}
+        self.partials['list'] = source
+        self.template.set_partial_resolver(self.resolve)
+        self.template.register_template('page', page)
+        registered = Template()
+        registered.register_partial('list', source)
+        registered.register_template('page', page)
+
+        self.assertEqual(
+            self.template.render('page', data), registered.render('page', data)
+        )
+
+    def test_registered_partials_take_precedence(self) -> None:
+        """Test that explicitly registered partials are never resolved."""
+        self.template.set_partial_resolver(self.resolve)
+        self.template.register_partial('name', 'registered')
+        self.template.register_template('page', '{{> name}}')
+
+        self.assertEqual(self.template.render('page', {}), 'registered')
+        self.assertEqual(self.calls, [])
+
+    def test_invalidate_partials(self) -> None:
+        """Test that invalidated partials are resolved again."""
+        self.template.set_partial_resolver(self.resolve)
+        self.template.register_template('page', '{{> name}}')
+        data = {'user': {'name': 'Ada'}}
+        self.template.render('page', data)
+        self.partials['name'] = 'changed'
+
+        self.assertEqual(self.template.invalidate_partials(['other']), 0)
+        self.assertEqual(self.template.render('page', data), 'Ada')
+        self.assertEqual(self.template.invalidate_partials(), 1)
+        self.assertEqual(self.template.render('page', data), 'changed')
+
+    def test_render_template(self) -> None:
+        """Test that template strings resolve their partials too."""
+        self.template.set_partial_resolver(self.resolve)
+
+        self.assertEqual(
+            self.template.render_template(
+                '<{{> card}}>', {'user': {'name': 'Ada'}}
+            ),
+            '<[Ada]>',
+        )
+
+    def test_clearing_the_resolver(self) -> None:
+        """Test that removing the resolver unregisters resolved partials."""
+        self.template.set_partial_resolver(self.resolve)
+        self.template.register_template('page', '{{> name}}')
+        self.template.render('page', {'user': {'name': 'Ada'}})
+
+        self.template.set_partial_resolver(None)
+
+        with pytest.raises(ValueError):
+            self.template.render('page', {})
+
+    def test_invalid_ttl(self) -> None:
+        """Test that a negative TTL is rejected."""
+        with pytest.raises(ValueError):
+            self.template.set_partial_resolver(self.resolve, ttl=-1)
+
+
+if __name__ == '__main__':
+    unittest.main()
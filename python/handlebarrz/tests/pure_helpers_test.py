@@ -0,0 +1,94 @@
+# Copyright 2025 Google LLC
+# SPDX-License-Identifier: Apache-2.0
+
+"""Tests for caching the results of pure helpers."""
+
+import unittest
+from typing import Any
+
+from handlebarrz import Template
+
+
+class PureHelpersTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.template = Template()
+        self.calls: list[tuple[list[Any], dict[str, Any]]] = []
+
+    def shout(
+        self, params: list[Any], hash: dict[str, Any], ctx: dict[str, Any]
+    ) -> str:
+        self.calls.append((params, hash))
+        suffix = hash.get('suffix', '')
+        return f'{str(params[0]).upper()}{suffix}'
+
+    def test_repeated_calls_are_cached(self) -> None:
+        """Test that a pure helper is called once per distinct arguments."""
+        self.template.register_helper('shout', self.shout, pure=True)
+        self.template.register_template(
+            'page', '{{#each names}}{{shout this}} {{/each}}'
+        )
+
+        result = self.template.render('page', {'names': ['a', 'b', 'a', 'a']})
+        self.template.render('page', {'names': ['b']})
+
+        self.assertEqual(result, 'A B A A ')
+        self.assertEqual(self.calls, [(['a'], {}), (['b'], {})])
+        stats = self.template.helper_cache_stats()['shout']
+        self.assertEqual(stats['hits'], 3)
+        self.assertEqual(stats['misses'], 2)
+        self.assertEqual(stats['size'], 2)
+
+    def test_hash_arguments_are_part_of_the_key(self) -> None:
+        """Test that calls differing only in hash arguments are not shared."""
+        self.template.register_helper('shout', self.shout, pure=True)
+        self.template.register_template(
+            'page', '{{shout "a"}}{{shout "a" suffix="!"}}{{shout "a"}}'
+        )
+
+        self.assertEqual(self.template.render('page', {}), 'AA!A')
+        self.assertEqual(len(self.calls), 2)
+
+    def test_cache_is_bounded(self) -> None:
+        """Test that the least recently used results are evicted."""
+        self.template.register_helper(
+            'shout', self.shout, pure=True, cache_size=1
+        )
+        self.template.register_template('page', '{{shout a}}{{shout b}}')
+
+        self.template.render('page', {'a': 1, 'b': 2})
+        self.template.render('page', {'a': 1, 'b': 2})
+
+        self.assertEqual(len(self.calls), 4)
+        stats = self.template.helper_cache_stats()['shout']
+        self.assertEqual(stats['evictions'], 3)
+        self.assertEqual(stats['capacity'], 1)
+
+    def test_pure_helpers_get_no_context(self) -> None:
+        """Test that pure helpers receive an empty context."""
+        contexts: list[dict[str, Any]] = []
+
+        def peek(
+            params: list[Any], hash: dict[str, Any], ctx: dict[str, Any]
+        ) -> str:
+            contexts.append(ctx)
+            return ''
+
+        self.template.register_helper('peek', peek, pure=True)
+        self.template.register_template('page', '{{peek 1}}')
+        self.template.render('page', {'secret': 1})
+
+        self.assertEqual(contexts, [{}])
+
+    def test_other_helpers_are_not_cached(self) -> None:
+        """Test that helpers are only cached when registered as pure."""
+        self.template.register_helper('shout', self.shout)
+        self.template.register_template('page', '{{shout "a"}}{{shout "a"}}')
+
+        self.template.render('page', {})
+
+        self.assertEqual(len(self.calls), 2)
+        self.assertEqual(self.template.helper_cache_stats(), {})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,103 @@
+# Copyright 2025 Google LLC
+# SPDX-License-Identifier: Apache-2.0
+
+"""Tests for reloading changed template files."""
+
+import os
+import tempfile
+import unittest
+from pathlib import Path
+
+import pytest
+
+from handlebarrz import Template
+
+
+class ReloadIntervalTest(unittest.TestCase):
+    def setUp(self) -> None:
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.dir = Path(tmp.name)
+        self.page = self.write('page.hbs', 'Hello {{name}}!')
+
+        self.template = Template()
+        self.template.register_template_file('page', self.page)
+
+    def write(self, name: str, text: str) -> Path:
+        """Write a file below the temporary directory."""
+        path = self.dir / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(text)
+        stat = path.stat()
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        return path
+
+    def test_disabled_by_default(self) -> None:
+        """Test that files are not checked unless an interval is set."""
+        self.write('page.hbs', 'Hi {{name}}!')
+
+        self.assertIsNone(self.template.reload_interval)
+        self.assertEqual(
+            self.template.render('page', {'name': 'A'}), 'Hello A!'
+        )
+
+    def test_changed_file_is_reloaded(self) -> None:
+        """Test that a changed file is picked up by the next render."""
+        self.template.reload_interval = 0
+        self.assertEqual(
+            self.template.render('page', {'name': 'A'}), 'Hello A!'
+        )
+
+        self.write('page.hbs', 'Hi {{name}}!')
+
+        self.assertEqual(self.template.render('page', {'name': 'A'}), 'Hi A!')
+
+    def test_interval_limits_checks(self) -> None:
+        """Test that files are checked at most once per interval."""
+        self.template.reload_interval = 3600
+        self.template.render('page', {'name': 'A'})
+
+        self.write('page.hbs', 'Hi {{name}}!')
+
+        self.assertEqual(
+            self.template.render('page', {'name': 'A'}), 'Hello A!'
+        )
+
+    def test_directories_are_rescanned(self) -> None:
+        """Test that added and removed directory files are picked up."""
+        self.write('dir/a.hbs', 'A')
+        self.template.register_templates_directory(self.dir / 'dir')
+        self.template.reload_interval = 0
+
+        self.write('dir/b.hbs', 'B')
+        (self.dir / 'dir' / 'a.hbs').unlink()
+
+        self.assertEqual(self.template.render('b', {}), 'B')
+        self.assertFalse(self.template.has_template('a'))
+
+    def test_reregistered_template_is_kept(self) -> None:
+        """Test that templates no longer registered from a file are kept."""
+        self.template.reload_interval = 0
+        self.template.register_template('page', 'inline')
+
+        self.write('page.hbs', 'Hi {{name}}!')
+
+        self.assertEqual(self.template.render('page', {}), 'inline')
+
+    def test_syntax_error_is_raised(self) -> None:
+        """Test that a changed file that does not compile is reported."""
+        self.template.reload_interval = 0
+
+        self.write('page.hbs', 'Hi {{#if}}')
+
+        with pytest.raises(ValueError):
+            self.template.render('page', {'name': 'A'})
+
+    def test_invalid_interval(self) -> None:
+        """Test that a negative interval is rejected."""
+        with pytest.raises(ValueError):
+            self.template.reload_interval = -1
+
+
+if __name__ == '__main__':
+    unittest.main()
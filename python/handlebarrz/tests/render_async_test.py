@@ -0,0 +1,87 @@
+# Copyright 2025 Google LLC
+# SPDX-License-Identifier: Apache-2.0
+
+"""Tests for rendering on the native worker pool from asyncio."""
+
+import asyncio
+import unittest
+from typing import Any
+
+from handlebarrz import Template
+
+
+class RenderAsyncTest(unittest.IsolatedAsyncioTestCase):
+    def setUp(self) -> None:
+        self.template = Template()
+        self.template.register_template('greet', 'Hello {{name}}!')
+
+    async def test_render_async(self) -> None:
+        """Test that render_async resolves to the rendered string."""
+        result = await self.template.render_async('greet', {'name': 'World'})
+
+        self.assertEqual(result, 'Hello World!')
+
+    async def test_concurrent_renders(self) -> None:
+        """Test that many concurrent renders each get their own result."""
+        results = await asyncio.gather(
+            *(
+                self.template.render_async('greet', {'name': str(i)})
+                for i in range(200)
+            )
+        )
+
+        self.assertEqual(results, [f'Hello {i}!' for i in range(200)])
+
+    async def test_missing_template(self) -> None:
+        """Test that render errors are raised when awaited."""
+        with self.assertRaises(ValueError):
+            await self.template.render_async('missing', {})
+
+    async def test_unserializable_data(self) -> None:
+        """Test that unserializable data raises TypeError."""
+        with self.assertRaises(TypeError):
+            await self.template.render_async('greet', {'name': object()})
+
+    async def test_python_helper(self) -> None:
+        """Test that Python helpers can be called from worker threads."""
+
+        def shout(
+            params: list[Any], hash: dict[str, Any], ctx: dict[str, Any]
+        ) -> str:
+            return str(params[0]).upper()
+
+        self.template.register_helper('shout', shout, needs_context=False)
+        self.template.register_template('loud', '{{shout name}}')
+
+        result = await self.template.render_async('loud', {'name': 'hey'})
+
+        self.assertEqual(result, 'HEY')
+
+    async def test_render_many_async(self) -> None:
+        """Test that batches are rendered in order."""
+        contexts = ({'name': str(i)} for i in range(50))
+
+        results = await self.template.render_many_async(
+            'greet', contexts, parallel=True
+        )
+
+        self.assertEqual(results, [f'Hello {i}!' for i in range(50)])
+
+    async def test_render_many_async_error(self) -> None:
+        """Test that batch render errors are raised when awaited."""
+        with self.assertRaises(ValueError):
+            await self.template.render_many_async('missing', [{}])
+
+    async def test_cancelled_render(self) -> None:
+        """Test that cancelling a pending render leaves the loop usable."""
+        task = asyncio.create_task(
+            self.template.render_async('greet', {'name': 'x'})
+        )
+        task.cancel()
+
+        with self.assertRaises(asyncio.CancelledError):
+            await task
+        self.assertEqual(
+            await self.template.render_async('greet', {'name': 'y'}),
+            'Hello y!',
+        )
@@ -0,0 +1,73 @@
+# Copyright 2025 Google LLC
+# SPDX-License-Identifier: Apache-2.0
+
+"""Tests for rendering a template against many contexts in one call."""
+
+import unittest
+from typing import Any
+
+import pytest
+
+from handlebarrz import Template
+
+
+class RenderManyTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.template = Template()
+        self.template.register_template('greet', 'Hello {{name}}!')
+
+    def test_render_many(self) -> None:
+        """Test that each context is rendered in order."""
+        contexts = [{'name': 'Ada'}, {'name': 'Grace'}, {'name': 'Linus'}]
+
+        result = self.template.render_many('greet', contexts)
+
+        self.assertEqual(result, ['Hello Ada!', 'Hello Grace!', 'Hello Linus!'])
+
+    def test_render_many_empty(self) -> None:
+        """Test that an empty batch renders to an empty list."""
+        self.assertEqual(self.template.render_many('greet', []), [])
+
+    def test_render_many_accepts_iterables(self) -> None:
+        """Test that generators are accepted as the batch."""
+        contexts = ({'name': str(i)} for i in range(3))
+
+        result = self.template.render_many('greet', contexts)
+
+        self.assertEqual(result, ['Hello 0!', 'Hello 1!', 'Hello 2!'])
+
+    def test_render_many_parallel(self) -> None:
+        """Test that parallel rendering preserves order."""
+        contexts = [{'name': str(i)} for i in range(1000)]
+
+        result = self.template.render_many('greet', contexts, parallel=True)
+
+        self.assertEqual(result, [f'Hello {i}!' for i in range(1000)])
+
+    def test_render_many_parallel_with_python_helper(self) -> None:
+        """Test that batches with Python helpers still render correctly."""
+
+        def upper(
+            params: list[Any], hash: dict[str, Any], ctx: dict[str, Any]
+        ) -> str:
+            return str(params[0]).upper()
+
+        self.template.register_helper('upper', upper)
+        self.template.register_template('shout', '{{upper name}}')
+        contexts = [{'name': f'n{i}'} for i in range(50)]
+
+        result = self.template.render_many('shout', contexts, parallel=True)
+
+        self.assertEqual(result, [f'N{i}' for i in range(50)])
+
+    def test_render_many_missing_template(self) -> None:
+        """Test that rendering a missing template raises ValueError."""
+        with pytest.raises(ValueError):
+            self.template.render_many('missing', [{}])
+
+    def test_render_many_strict_mode_error(self) -> None:
+        """Test that a failure for any context raises ValueError."""
+        self.template.strict_mode = True
+
+        with pytest.raises(ValueError):
+            self.template.render_many('greet', [{'name': 'a'}, {}])
@@ -0,0 +1,143 @@
+# Copyright 2025 Google LLC
+# SPDX-License-Identifier: Apache-2.0
+
+"""Tests for saving and loading template snapshots."""
+
+import os
+import tempfile
+import unittest
+from pathlib import Path
+
+import pytest
+
+from handlebarrz import Template
+
+
+class SnapshotTest(unittest.TestCase):
+    def setUp(self) -> None:
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.dir = Path(tmp.name)
+        self.snapshot = self.dir / 'templates.snapshot'
+
+        self.file = self.dir / 'page.hbs'
+        self.file.write_text('<p>{{> footer}}</p>')
+
+        self.template = Template()
+        self.template.register_template('greeting', 'Hello {{name}}!')
+        self.template.register_partial('footer', 'bye')
+        self.template.register_template_file('page', self.file)
+
+    def test_round_trip(self) -> None:
+        """Test that a loaded snapshot renders like the original engine."""
+        self.assertEqual(self.template.save_snapshot(self.snapshot), 3)
+
+        loaded = Template()
+        self.assertEqual(loaded.load_snapshot(self.snapshot), 3)
+
+        self.assertEqual(
+            loaded.render('greeting', {'name': 'World'}), 'Hello World!'
+        )
+        self.assertEqual(loaded.render('page', {}), '<p>bye</p>')
+
+    def test_partials_are_loaded_as_partials(self) -> None:
+        """Test that loaded partials render like registered partials."""
+        self.template.register_partial(
+            'list', '{{#each items}}\n  - {{this}}\n{{/each}}\n'
+        )
+        self.template.register_template('items', 'Items:\n  {{> list}}\nend')
+        self.template.save_snapshot(self.snapshot)
+        data = {'items': ['a', 'b']}
+
+        loaded = Template()
+        loaded.load_snapshot(self.snapshot)
+
+        self.assertEqual(
+            loaded.render('items', data), self.template.render('items', data)
+        )
+
+    def test_unregistered_templates_are_not_saved(self) -> None:
+        """Test that unregistered templates are left out of snapshots."""
+        self.template.unregister_template('greeting')
+
+        self.assertEqual(self.template.save_snapshot(self.snapshot), 2)
+
+        loaded = Template()
+        loaded.load_snapshot(self.snapshot)
+        self.assertFalse(loaded.has_template('greeting'))
+
+    def test_changed_file_is_recompiled(self) -> None:
+        """Test that entries are invalidated when their file changes."""
+        self.template.save_snapshot(self.snapshot)
+        self.file.write_text('<div>{{> footer}}</div>')
+
+        loaded = Template()
+        loaded.load_snapshot(self.snapshot)
+
+        self.assertEqual(loaded.render('page', {}), '<div>bye</div>')
+
+    def test_unchanged_file_is_not_read(self) -> None:
+        """Test that files with the stored size and mtime are trusted."""
+        self.template.save_snapshot(self.snapshot)
+        stat = self.file.stat()
+        self.file.write_text('<b>{{> footer}}</b>')
+        os.utime(self.file, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+
+        loaded = Template()
+        loaded.load_snapshot(self.snapshot)
+
+        self.assertEqual(loaded.render('page', {}), '<p>bye</p>')
+
+    def test_no_temporary_files_are_left(self) -> None:
+        """Test that saving replaces the snapshot without leftovers."""
+        self.template.save_snapshot(self.snapshot)
+        self.template.save_snapshot(self.snapshot)
+
+        self.assertEqual(
+            sorted(path.name for path in self.dir.iterdir()),
+            ['page.hbs', 'templates.snapshot'],
+        )
+
+    def test_missing_file_uses_snapshot(self) -> None:
+        """Test that the stored source is used if the file is gone."""
+        self.template.save_snapshot(self.snapshot)
+        self.file.unlink()
+
+        loaded = Template()
+        loaded.load_snapshot(self.snapshot)
+
+        self.assertEqual(loaded.render('page', {}), '<p>bye</p>')
+
+    def test_loaded_snapshot_can_be_saved_again(self) -> None:
+        """Test that a snapshot can be re-saved from a loaded engine."""
+        self.template.save_snapshot(self.snapshot)
+        loaded = Template()
+        loaded.load_snapshot(self.snapshot)
+        resaved = self.dir / 'resaved.snapshot'
+
+        loaded.save_snapshot(resaved)
+
+        self.assertEqual(resaved.read_bytes(), self.snapshot.read_bytes())
+
+    def test_corrupt_snapshot(self) -> None:
+        """Test that corrupt snapshots are rejected without registering."""
+        self.template.save_snapshot(self.snapshot)
+        data = self.snapshot.read_bytes()
+        self.snapshot.write_bytes(data.replace(b'Hello', b'Jello'))
+
+        loaded = Template()
+        with pytest.raises(ValueError, match='corrupt'):
+            loaded.load_snapshot(self.snapshot)
+        self.assertFalse(loaded.has_template('footer'))
+
+    def test_not_a_snapshot(self) -> None:
+        """Test that arbitrary files are rejected."""
+        self.file.write_text('not a snapshot')
+
+        with pytest.raises(ValueError):
+            Template().load_snapshot(self.file)
+
+    def test_missing_snapshot(self) -> None:
+        """Test that loading a missing snapshot raises FileNotFoundError."""
+        with pytest.raises(FileNotFoundError):
+            Template().load_snapshot(self.dir / 'missing.snapshot')
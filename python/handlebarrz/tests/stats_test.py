@@ -0,0 +1,92 @@
+# Copyright 2025 Google LLC
+# SPDX-License-Identifier: Apache-2.0
+
+"""Tests for per-template render statistics."""
+
+import io
+import unittest
+from typing import Any
+
+import pytest
+
+from handlebarrz import Template
+
+
+def shout(params: list[Any], hash: dict[str, Any], ctx: dict[str, Any]) -> str:
+    """Helper that upper-cases its first parameter."""
+    return str(params[0]).upper()
+
+
+class StatsTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.template = Template()
+        self.template.register_helper('shout', shout, needs_context=False)
+        self.template.register_template('page', '{{shout name}}!')
+        self.template.register_template('plain', '{{name}}')
+
+    def test_empty_before_rendering(self) -> None:
+        """Test that only rendered templates are reported."""
+        self.assertEqual(self.template.stats(), {})
+
+    def test_renders_are_counted(self) -> None:
+        """Test that renders, output size and helper calls are counted."""
+        self.template.render('page', {'name': 'ada'})
+        self.template.render_many('page', [{'name': 'a'}, {'name': 'b'}])
+        self.template.render('plain', {'name': 'x'})
+        self.template.register_template('native', '{{#if name}}{{name}}{{/if}}')
+        self.template.render('native', {'name': 'x'})
+
+        stats = self.template.stats()
+
+        page = stats['page']
+        self.assertEqual(page['renders'], 3)
+        self.assertEqual(page['errors'], 0)
+        self.assertEqual(page['output_bytes'], len('ADA!A!B!'))
+        self.assertEqual(page['python_helper_calls'], 3)
+        self.assertGreaterEqual(page['total_ns'], page['max_ns'])
+        self.assertGreaterEqual(page['total_ns'], page['python_helper_ns'])
+        self.assertEqual(stats['plain']['python_helper_calls'], 0)
+        self.assertEqual(stats['native']['python_helper_calls'], 0)
+
+    def test_errors_are_counted(self) -> None:
+        """Test that failed renders are counted as errors."""
+        self.template.register_template('broken', '{{> missing}}')
+
+        with pytest.raises(ValueError):
+            self.template.render('broken', {})
+
+        self.assertEqual(self.template.stats()['broken']['errors'], 1)
+
+    def test_streamed_output_is_counted(self) -> None:
+        """Test that streaming renders count the bytes written."""
+        out = io.StringIO()
+
+        self.template.render_to('plain', {'name': 'streamed'}, out)
+
+        self.assertEqual(self.template.stats()['plain']['output_bytes'], 8)
+
+    def test_reset(self) -> None:
+        """Test that resetting returns the counters and starts over."""
+        self.template.render('plain', {'name': 'x'})
+
+        self.assertEqual(self.template.stats(reset=True)['plain']['renders'], 1)
+        self.assertEqual(self.template.stats(), {})
+
+    def test_unknown_templates_are_not_counted(self) -> None:
+        """Test that rendering an unregistered name adds no entry."""
+        with pytest.raises(ValueError):
+            self.template.render('missing', {})
+        with pytest.raises(ValueError):
+            self.template.render_many('missing', [{}])
+
+        self.assertEqual(self.template.stats(), {})
+
+    def test_template_strings_are_not_counted(self) -> None:
+        """Test that `render_template` renders are not counted."""
+        self.template.render_template('{{name}}', {'name': 'x'})
+
+        self.assertEqual(self.template.stats(), {})
+
+
+if __name__ == '__main__':
+    unittest.main()
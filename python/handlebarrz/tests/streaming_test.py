@@ -0,0 +1,102 @@
+# Copyright 2025 Google LLC
+# SPDX-License-Identifier: Apache-2.0
+
+"""Tests for streaming render output."""
+
+import io
+import unittest
+
+import pytest
+
+from handlebarrz import Template
+
+TEMPLATE = '{{#each items}}{{this}},{{/each}}'
+
+
+class RecordingWriter:
+    """Writer that records every chunk it is given."""
+
+    def __init__(self) -> None:
+        self.chunks: list[str] = []
+
+    def write(self, chunk: str) -> None:
+        self.chunks.append(chunk)
+
+
+class FailingWriter:
+    """Writer that always raises."""
+
+    def write(self, chunk: str) -> None:
+        raise OSError('disk full')
+
+
+class StreamingTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.template = Template()
+        self.template.register_template('list', TEMPLATE)
+        self.data = {'items': [f'item-{i}' for i in range(1000)]}
+        self.expected = self.template.render('list', self.data)
+
+    def test_render_to_file_like(self) -> None:
+        """Test that render_to writes the full output to a text stream."""
+        out = io.StringIO()
+
+        self.template.render_to('list', self.data, out)
+
+        self.assertEqual(out.getvalue(), self.expected)
+
+    def test_render_to_chunks(self) -> None:
+        """Test that render_to writes in chunks of at least chunk_size."""
+        writer = RecordingWriter()
+
+        self.template.render_to('list', self.data, writer, chunk_size=100)
+
+        self.assertGreater(len(writer.chunks), 1)
+        self.assertEqual(''.join(writer.chunks), self.expected)
+        for chunk in writer.chunks[:-1]:
+            self.assertGreaterEqual(len(chunk.encode()), 100)
+
+    def test_render_to_non_ascii(self) -> None:
+        """Test that multi-byte characters are never split across chunks."""
+        writer = RecordingWriter()
+        data = {'items': ['héllo wörld ✓'] * 200}
+
+        self.template.render_to('list', data, writer, chunk_size=7)
+
+        self.assertEqual(
+            ''.join(writer.chunks), self.template.render('list', data)
+        )
+
+    def test_render_to_writer_error_propagates(self) -> None:
+        """Test that exceptions from the writer are raised unchanged."""
+        with pytest.raises(OSError, match='disk full'):
+            self.template.render_to('list', self.data, FailingWriter())
+
+    def test_render_to_missing_template(self) -> None:
+        """Test that rendering a missing template raises ValueError."""
+        with pytest.raises(ValueError):
+            self.template.render_to('missing', {}, io.StringIO())
+
+    def test_render_iter(self) -> None:
+        """Test that render_iter yields the output in chunks."""
+        chunks = list(self.template.render_iter('list', self.data, 100))
+
+        self.assertGreater(len(chunks), 1)
+        self.assertEqual(''.join(chunks), self.expected)
+
+    def test_render_iter_close_early(self) -> None:
+        """Test that closing the iterator early stops the render."""
+        chunks = self.template.render_iter('list', self.data, 10)
+
+        self.assertTrue(next(chunks))
+        chunks.close()
+
+    def test_render_iter_error(self) -> None:
+        """Test that render errors are raised by the iterator."""
+        with pytest.raises(ValueError):
+            list(self.template.render_iter('missing', {}))
+
+    def test_render_iter_type_error(self) -> None:
+        """Test that unserializable data raises TypeError."""
+        with pytest.raises(TypeError):
+            list(self.template.render_iter('list', {'items': [object()]}))
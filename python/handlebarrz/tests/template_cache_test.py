@@ -0,0 +1,85 @@
+# Copyright 2025 Google LLC
+# SPDX-License-Identifier: Apache-2.0
+
+"""Tests for the compiled template cache used by `render_template`."""
+
+import unittest
+from typing import Any
+
+from handlebarrz import Template
+
+
+class TemplateCacheTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.template = Template()
+
+    def test_repeated_source_hits_cache(self) -> None:
+        """Test that rendering the same source twice reuses the template."""
+        first = self.template.render_template('Hi {{name}}', {'name': 'a'})
+        second = self.template.render_template('Hi {{name}}', {'name': 'b'})
+
+        self.assertEqual((first, second), ('Hi a', 'Hi b'))
+        stats = self.template.template_cache_stats()
+        self.assertEqual(stats['misses'], 1)
+        self.assertEqual(stats['hits'], 1)
+        self.assertEqual(stats['size'], 1)
+
+    def test_capacity_bounds_cache(self) -> None:
+        """Test that the least recently used sources are evicted."""
+        self.template.template_cache_capacity = 2
+
+        for i in range(5):
+            self.template.render_template(f'{i} {{{{x}}}}', {'x': i})
+
+        stats = self.template.template_cache_stats()
+        self.assertEqual(self.template.template_cache_capacity, 2)
+        self.assertEqual(stats['size'], 2)
+        self.assertEqual(stats['evictions'], 3)
+
+    def test_zero_capacity_disables_cache(self) -> None:
+        """Test that a capacity of zero disables caching."""
+        self.template.template_cache_capacity = 0
+
+        self.template.render_template('{{x}}', {'x': 1})
+        self.template.render_template('{{x}}', {'x': 1})
+
+        stats = self.template.template_cache_stats()
+        self.assertEqual(stats['hits'], 0)
+        self.assertEqual(stats['size'], 0)
+
+    def test_cache_cleared_when_helpers_change(self) -> None:
+        """Test that registering a helper invalidates cached templates."""
+        self.template.render_template('{{x}}', {'x': 1})
+
+        def noop(
+            params: list[Any], hash: dict[str, Any], ctx: dict[str, Any]
+        ) -> str:
+            return ''
+
+        self.template.register_helper('noop', noop)
+
+        self.assertEqual(self.template.template_cache_stats()['size'], 0)
+
+    def test_cache_cleared_when_partials_change(self) -> None:
+        """Test that cached templates see newly registered partials."""
+        self.template.register_partial('p', 'one')
+        self.assertEqual(self.template.render_template('{{> p}}', {}), 'one')
+
+        self.template.register_partial('p', 'two')
+
+        self.assertEqual(self.template.render_template('{{> p}}', {}), 'two')
+
+    def test_clear_template_cache(self) -> None:
+        """Test that the cache can be cleared explicitly."""
+        self.template.render_template('{{x}}', {'x': 1})
+
+        self.template.clear_template_cache()
+
+        self.assertEqual(self.template.template_cache_stats()['size'], 0)
+
+    def test_syntax_error_is_not_cached(self) -> None:
+        """Test that invalid sources raise and are not cached."""
+        with self.assertRaises(ValueError):
+            self.template.render_template('{{#if x}}', {})
+
+        self.assertEqual(self.template.template_cache_stats()['size'], 0)
@@ -0,0 +1,128 @@
+# Copyright 2025 Google LLC
+# SPDX-License-Identifier: Apache-2.0
+
+"""Tests for registering and rescanning template directories."""
+
+import os
+import tempfile
+import unittest
+from pathlib import Path
+
+import pytest
+
+from handlebarrz import Template
+
+NO_CHANGES: dict[str, list[str]] = {'added': [], 'changed': [], 'removed': []}
+
+
+class TemplatesDirectoryTest(unittest.TestCase):
+    def setUp(self) -> None:
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.dir = Path(tmp.name)
+        self.write('greeting.hbs', 'Hello {{name}}!')
+        self.write('emails/welcome.hbs', 'Welcome {{> greeting}}')
+        self.write('notes.txt', 'not a template')
+        self.write('.hidden.hbs', 'hidden')
+
+        self.template = Template()
+
+    def write(self, name: str, text: str) -> Path:
+        """Write a file below the templates directory."""
+        path = self.dir / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(text)
+        return path
+
+    def touch_later(self, path: Path) -> None:
+        """Move the modification time of a file forward."""
+        stat = path.stat()
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+    def test_register_directory(self) -> None:
+        """Test that templates are registered by relative path."""
+        changes = self.template.register_templates_directory(self.dir)
+
+        self.assertEqual(
+            changes,
+            {
+                'added': ['emails/welcome', 'greeting'],
+                'changed': [],
+                'removed': [],
+            },
+        )
+        self.assertEqual(
+            self.template.render('emails/welcome', {'name': 'Ann'}),
+            'Welcome Hello Ann!',
+        )
+        self.assertFalse(self.template.has_template('notes'))
+        self.assertFalse(self.template.has_template('.hidden'))
+
+    def test_custom_extension(self) -> None:
+        """Test that only files with the given extension are registered."""
+        changes = self.template.register_templates_directory(self.dir, '.txt')
+
+        self.assertEqual(changes['added'], ['notes'])
+
+    def test_rescan_without_changes(self) -> None:
+        """Test that rescanning an unchanged directory reports nothing."""
+        self.template.register_templates_directory(self.dir)
+
+        changes = self.template.register_templates_directory(self.dir)
+
+        self.assertEqual(changes, NO_CHANGES)
+
+    def test_rescan_reports_changes(self) -> None:
+        """Test that added, changed and removed files are detected."""
+        self.template.register_templates_directory(self.dir)
+        greeting = self.write('greeting.hbs', 'Hi {{name}}!')
+        self.touch_later(greeting)
+        self.write('farewell.hbs', 'Bye')
+        (self.dir / 'emails' / 'welcome.hbs').unlink()
+
+        changes = self.template.register_templates_directory(self.dir)
+
+        self.assertEqual(
+            changes,
+            {
+                'added': ['farewell'],
+                'changed': ['greeting'],
+                'removed': ['emails/welcome'],
+            },
+        )
+        self.assertEqual(
+            self.template.render('greeting', {'name': 'Bo'}), 'Hi Bo!'
+        )
+        self.assertFalse(self.template.has_template('emails/welcome'))
+
+    def test_touched_file_with_same_content(self) -> None:
+        """Test that a file touched without changes is not recompiled."""
+        self.template.register_templates_directory(self.dir)
+        self.touch_later(self.dir / 'greeting.hbs')
+
+        changes = self.template.register_templates_directory(self.dir)
+
+        self.assertEqual(changes, NO_CHANGES)
+
+    def test_unregistered_template_is_restored(self) -> None:
+        """Test that a rescan re-registers templates removed by hand."""
+        self.template.register_templates_directory(self.dir)
+        self.template.unregister_template('greeting')
+
+        changes = self.template.register_templates_directory(self.dir)
+
+        self.assertEqual(changes['changed'], ['greeting'])
+        self.assertTrue(self.template.has_template('greeting'))
+
+    def test_syntax_error_registers_nothing(self) -> None:
+        """Test that a syntax error leaves the registry untouched."""
+        self.write('broken.hbs', '{{#if x}}')
+
+        with pytest.raises(ValueError, match='broken'):
+            self.template.register_templates_directory(self.dir)
+        self.assertFalse(self.template.has_template('greeting'))
+
+    def test_missing_directory(self) -> None:
+        """Test that a missing directory raises FileNotFoundError."""
+        with pytest.raises(FileNotFoundError):
+            self.template.register_templates_directory(self.dir / 'missing')
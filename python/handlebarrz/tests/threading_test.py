@@ -0,0 +1,108 @@
+# Copyright 2025 Google LLC
+# SPDX-License-Identifier: Apache-2.0
+
+"""Tests for rendering from multiple threads."""
+
+import sys
+import sysconfig
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+from handlebarrz import Template
+
+
+class ThreadedRenderTest(unittest.TestCase):
+    def test_concurrent_renders(self) -> None:
+        """Test that concurrent renders produce the expected output."""
+        template = Template()
+        template.register_template(
+            'list', '{{#each items}}{{this}},{{/each}}{{name}}'
+        )
+
+        def render(i: int) -> str:
+            return template.render(
+                'list', {'items': list(range(i % 10)), 'name': f'n{i}'}
+            )
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            results = list(pool.map(render, range(200)))
+
+        for i, result in enumerate(results):
+            expected = ''.join(f'{j},' for j in range(i % 10)) + f'n{i}'
+            self.assertEqual(result, expected)
+
+    def test_concurrent_renders_with_python_helper(self) -> None:
+        """Test that Python helpers work while the GIL is released."""
+        template = Template()
+
+        def shout(
+            params: list[Any], hash: dict[str, Any], ctx: dict[str, Any]
+        ) -> str:
+            return str(params[0]).upper()
+
+        template.register_helper('shout', shout)
+        template.register_template(
+            'greet', '{{#each names}}{{shout this}} {{/each}}'
+        )
+
+        def render(i: int) -> str:
+            return template.render('greet', {'names': [f'a{i}', f'b{i}']})
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            results = list(pool.map(render, range(100)))
+
+        for i, result in enumerate(results):
+            self.assertEqual(result, f'A{i} B{i} ')
+
+    def test_renders_while_registering(self) -> None:
+        """Stress concurrent renders while templates are being registered."""
+        template = Template()
+        template.register_partial('footer', 'v0')
+        template.register_template('page', '{{name}}|{{> footer}}')
+        stop = threading.Event()
+        errors: list[BaseException] = []
+
+        def register() -> None:
+            i = 0
+            while not stop.is_set():
+                i += 1
+                template.register_partial('footer', f'v{i}')
+                template.register_template(f'extra{i % 50}', f'{{{{x}}}}{i}')
+                template.unregister_template(f'extra{(i + 25) % 50}')
+
+        def render(i: int) -> str:
+            try:
+                result = template.render('page', {'name': f'n{i}'})
+                template.render_template('{{name}}', {'name': i})
+                return result
+            except BaseException as e:
+                errors.append(e)
+                raise
+
+        writers = [threading.Thread(target=register) for _ in range(2)]
+        for writer in writers:
+            writer.start()
+        try:
+            with ThreadPoolExecutor(max_workers=8) as pool:
+                results = list(pool.map(render, range(2000)))
+        finally:
+            stop.set()
+            for writer in writers:
+                writer.join()
+
+        self.assertEqual(errors, [])
+        for i, result in enumerate(results):
+            name, footer = result.split('|')
+            self.assertEqual(name, f'n{i}')
+            self.assertRegex(footer, r'^v\d+$')
+
+    @unittest.skipUnless(
+        sysconfig.get_config_var('Py_GIL_DISABLED'),
+        'requires a free-threaded Python build',
+    )
+    def test_import_keeps_gil_disabled(self) -> None:
+        """Test that importing the native module does not enable the GIL."""
+        gil_enabled = sys._is_gil_enabled()  # type: ignore[attr-defined]
+        self.assertFalse(gil_enabled)